@@ -25,7 +25,19 @@ ANIMAL_IDENTIFIER_MAP = {
     "bear": "bear",
     "crocodile": "crocodile",
     "tiger": "tiger",
-    "elephant": "elephant"
+    "elephant": "elephant",
+    # plural labels (td.desc on the tile page)
+    "rats": "rat",
+    "spiders": "spider",
+    "snakes": "snake",
+    "bats": "bat",
+    "boars": "wild boar",
+    "wild boars": "wild boar",
+    "wolves": "wolf",
+    "bears": "bear",
+    "crocodiles": "crocodile",
+    "tigers": "tiger",
+    "elephants": "elephant"
 }
 
 def get_animal_power(animal_name: str) -> float:
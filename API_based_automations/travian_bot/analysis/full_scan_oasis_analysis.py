@@ -1,41 +1,38 @@
 # analysis/oasis_extractor.py
 
 import os
-import json
 from datetime import datetime
-from math import sqrt
 
 from core.database_json_scan_utils import save_json_scan  # <- use the helper we built
+from core.map_grid_store import load_scan
+from core.spatial_index import travian_distance
 
 def distance(x1, y1, x2, y2):
-    return sqrt((x2 - x1)**2 + (y2 - y1)**2)
+    return travian_distance(x1, y1, x2, y2)
 
 def extract_unoccupied_oases(scan_path):
     """
-    Loads a full map scan JSON and extracts unoccupied oases,
-    saving them neatly into the corresponding coordinates folder.
+    Loads a full map scan (the .grid store when present, else the JSON export)
+    and extracts unoccupied oases, saving them neatly into the corresponding
+    coordinates folder.
     """
-    with open(scan_path, "r") as f:
-        scan = json.load(f)
-
-    tiles = scan.get("tiles", {})
-    metadata = scan.get("metadata", {})
+    store = load_scan(scan_path)
+    metadata = store.metadata or {}
     center_raw = metadata.get("center_coordinates", "(0,0)")
     center_x, center_y = map(int, center_raw.strip("()").split(","))
 
     village_coords_folder = f"({center_x}_{center_y})"
 
-    print(f"[+] Loaded {len(tiles)} tiles from scan at {village_coords_folder}")
+    print(f"[+] Loaded {len(store)} tiles from scan at {village_coords_folder}")
 
     unoccupied_oases = {}
     occupied_oases = {}
 
-    for coords, tile_info in tiles.items():
+    for x, y, tile_info in store.iter_tiles():
+        coords = f"{x}_{y}"
         if tile_info.get("type") == "empty":
-            title = tile_info.get("raw_title", "").lower().strip()
+            title = (tile_info.get("raw_title") or "").lower().strip()
             if title.startswith("unoccupied oasis"):
-                x_str, y_str = coords.split("_")
-                x, y = int(x_str), int(y_str)
                 dist = distance(center_x, center_y, x, y)
                 tile_info["scanned_from"] = {
                     "center_x": center_x,
@@ -45,6 +42,7 @@ def extract_unoccupied_oases(scan_path):
                 unoccupied_oases[coords] = tile_info
             elif "oasis" in title and not title.startswith("unoccupied oasis"):
                 occupied_oases[coords] = tile_info
+    store.close()
 
     print(f"[+] Unoccupied oases found: {len(unoccupied_oases)}")
     print(f"[+] Occupied oases found: {len(occupied_oases)}")
@@ -3,10 +3,31 @@ from .base import BaseTileAnalysis, TileType
 from .oasis import OasisAnalysis
 from .village import VillageAnalysis
 from .valley import ValleyAnalysis
+from .fast import analyze_tile_fast
 
 def analyze_tile(html: str, coordinates: tuple) -> Dict[str, Any]:
     """
     Analyze a tile's HTML content and return structured information.
+
+    Uses the single-pass extractor; falls back to the BeautifulSoup reference
+    implementation if the fast path fails on unexpected markup.
+    
+    Args:
+        html: The HTML content of the tile
+        coordinates: Tuple of (x, y) coordinates
+        
+    Returns:
+        Dictionary containing analyzed tile information
+    """
+    try:
+        return analyze_tile_fast(html, coordinates)
+    except Exception:
+        return analyze_tile_reference(html, coordinates)
+
+def analyze_tile_reference(html: str, coordinates: tuple) -> Dict[str, Any]:
+    """
+    Reference implementation of analyze_tile on top of the BeautifulSoup analyzers.
+    Kept for parity checks against the single-pass extractor.
     
     Args:
         html: The HTML content of the tile
@@ -0,0 +1,428 @@
+"""Single-pass tile-details extractor.
+
+The reference analyzers (BaseTileAnalysis + Oasis/Village/ValleyAnalysis) build
+a full BeautifulSoup tree and then run a dozen ``soup.find`` lookups over it,
+several of them twice (``get_tile_type`` is re-evaluated by ``get_animals`` and
+``get_owner_info``). This module tokenizes the fragment once with the stdlib
+``HTMLParser`` (the same tokenizer bs4's ``html.parser`` builder uses) and only
+materialises small node trees for the handful of elements the analysis reads:
+the title, the ``th``/``td`` owner pair and the ``table`` blocks by id. The
+queries below mirror the reference methods one-to-one so the result dict is
+identical; ``analyze_tile_reference`` stays available for parity checks.
+"""
+from __future__ import annotations
+
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+from .base import TileType
+
+# Tags bs4 treats as empty elements (never pushed on the open-tag stack)
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link",
+    "menuitem", "meta", "param", "source", "track", "wbr", "basefont", "bgsound",
+    "command", "frame", "image", "isindex", "nextid", "spacer",
+})
+_TABLE_IDS = frozenset({
+    "distance", "distribution", "reports", "troop_info", "village_info",
+    "population", "buildings", "founding",
+})
+_ASCII_SPACES = " \t\n\r\f"
+
+
+class _Node:
+    __slots__ = ("tag", "classes", "attrs", "children")
+
+    def __init__(self, tag: str, attrs: Dict[str, str]) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = (attrs.get("class") or "").split()
+        self.children: List[Any] = []
+
+
+def _text(node: _Node) -> str:
+    parts: List[str] = []
+    stack = [node]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, str):
+            parts.append(cur)
+        else:
+            stack.extend(reversed(cur.children))
+    return "".join(parts)
+
+
+def _text_stripped(node: _Node) -> str:
+    """Equivalent of bs4 ``get_text(strip=True)``."""
+    parts: List[str] = []
+    stack = [node]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, str):
+            s = cur.strip()
+            if s:
+                parts.append(s)
+        else:
+            stack.extend(reversed(cur.children))
+    return "".join(parts)
+
+
+def _string(node: _Node) -> Optional[str]:
+    """Equivalent of bs4 ``.string`` (single child chain down to one string)."""
+    while len(node.children) == 1:
+        child = node.children[0]
+        if isinstance(child, str):
+            return child
+        node = child
+    return None
+
+
+def _iter(node: _Node):
+    """Descendant elements in document order (excluding the node itself)."""
+    stack = list(reversed([c for c in node.children if not isinstance(c, str)]))
+    while stack:
+        cur = stack.pop()
+        yield cur
+        stack.extend(reversed([c for c in cur.children if not isinstance(c, str)]))
+
+
+def _find(node: _Node, tag: str, cls: Optional[str] = None) -> Optional[_Node]:
+    for el in _iter(node):
+        if el.tag == tag and (cls is None or cls in el.classes):
+            return el
+    return None
+
+
+def _find_all(node: _Node, tag: str) -> List[_Node]:
+    return [el for el in _iter(node) if el.tag == tag]
+
+
+class _TileFragmentParser(HTMLParser):
+    """Tokenizes once and keeps node trees only for the elements the analysis needs."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._stack: List[tuple] = []          # (tag, node-or-None)
+        self._open_counts: Dict[str, int] = {}
+        self._pending: List[str] = []
+        self.title_node: Optional[_Node] = None
+        self.tile_classes: Optional[List[str]] = None
+        self.valley_marker = False
+        self.owner_found = False
+        self.owner_td: Optional[_Node] = None
+        self._await_owner_td = False
+        self.tables: Dict[str, _Node] = {}
+
+    # --- bs4-compatible text buffering ---
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        s = "".join(self._pending)
+        self._pending = []
+        parent = self._stack[-1][1] if self._stack else None
+        if parent is None:
+            return
+        if not s.strip(_ASCII_SPACES):
+            s = "\n" if "\n" in s else " "
+        parent.children.append(s)
+
+    def handle_data(self, data: str) -> None:
+        if self._stack and self._stack[-1][1] is not None:
+            self._pending.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        # bs4 keeps comments as children: they break ``.string`` but add no text
+        self._flush()
+        if self._stack and self._stack[-1][1] is not None:
+            self._stack[-1][1].children.append(_Node("#comment", {}))
+
+    # --- element handling ---
+
+    def _open(self, tag: str, attrs_list) -> Optional[_Node]:
+        self._flush()
+        attrs = {k: (v if v is not None else "") for k, v in attrs_list}
+        parent = self._stack[-1][1] if self._stack else None
+        node: Optional[_Node] = None
+        if parent is not None:
+            node = _Node(tag, attrs)
+            parent.children.append(node)
+
+        if tag == "h1" and self.title_node is None:
+            if "titleInHeader" in (attrs.get("class") or "").split():
+                node = node or _Node(tag, attrs)
+                self.title_node = node
+        elif tag == "div" and self.tile_classes is None and attrs.get("id") == "tileDetails":
+            self.tile_classes = (attrs.get("class") or "").split()
+        elif tag == "span" and not self.valley_marker:
+            if " ".join((attrs.get("class") or "").split()) == "a arrow disabled" and attrs.get("title") == "0/3 settlers available":
+                self.valley_marker = True
+        elif tag == "table":
+            tid = attrs.get("id")
+            if tid in _TABLE_IDS and tid not in self.tables:
+                node = node or _Node(tag, attrs)
+                self.tables[tid] = node
+        elif tag == "th" and not self.owner_found:
+            node = node or _Node(tag, attrs)
+        elif tag == "td" and self._await_owner_td:
+            node = node or _Node(tag, attrs)
+            self.owner_td = node
+            self._await_owner_td = False
+        return node
+
+    def handle_starttag(self, tag, attrs):
+        node = self._open(tag, attrs)
+        if tag in _VOID_TAGS:
+            return
+        self._stack.append((tag, node))
+        self._open_counts[tag] = self._open_counts.get(tag, 0) + 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if not self._open_counts.get(tag):
+            return
+        while self._stack:
+            name, node = self._stack.pop()
+            self._open_counts[name] -= 1
+            if name == "th" and node is not None and not self.owner_found:
+                self._resolve_th(node)
+            if name == tag:
+                break
+
+    def _resolve_th(self, node: _Node) -> None:
+        if _string(node) == "Owner":
+            self.owner_found = True
+            self._await_owner_td = True
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+        # Unclosed candidates still count (bs4 closes them at end of document)
+        for name, node in reversed(self._stack):
+            if name == "th" and node is not None and not self.owner_found:
+                self._resolve_th(node)
+
+
+# --- queries mirroring the reference analyzers ---------------------------
+
+def _tile_type(p: _TileFragmentParser, title: str) -> TileType:
+    if p.tile_classes is None:
+        return TileType.WILDERNESS
+    tile_class = p.tile_classes
+    if "Abandoned valley" in title and p.valley_marker:
+        return TileType.EMPTY_VALLEY
+    owner_text = _text(p.owner_td) if (p.owner_found and p.owner_td is not None) else None
+    if "oasis" in tile_class:
+        if owner_text is not None and owner_text.strip():
+            return TileType.OCCUPIED_OASIS
+        return TileType.UNOCCUPIED_OASIS
+    if "village" in tile_class:
+        if owner_text is not None and "Natars" in owner_text:
+            return TileType.NATAR_VILLAGE
+        return TileType.USER_VILLAGE
+    return TileType.WILDERNESS
+
+
+def _distance(p: _TileFragmentParser) -> Optional[float]:
+    table = p.tables.get("distance")
+    if table is None:
+        return None
+    cell = _find(table, "td", "bold")
+    if cell is None:
+        return None
+    try:
+        return float(_text(cell).split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def _distribution_rows(table: _Node):
+    for row in _find_all(table, "tr"):
+        icon = _find(row, "i")
+        val = _find(row, "td", "val")
+        desc = _find(row, "td", "desc")
+        if icon and val and desc:
+            yield (icon.classes[0] if icon.classes else ""), val
+
+
+def _assign_resource(target: Dict[str, int], resource_class: str, value: int) -> None:
+    if "r1" in resource_class:
+        target["wood"] = value
+    elif "r2" in resource_class:
+        target["clay"] = value
+    elif "r3" in resource_class:
+        target["iron"] = value
+    elif "r4" in resource_class:
+        target["crop"] = value
+
+
+def _resource_bonuses(p: _TileFragmentParser) -> Dict[str, int]:
+    bonuses = {"wood": 0, "clay": 0, "iron": 0, "crop": 0}
+    table = p.tables.get("distribution")
+    if table is None:
+        return bonuses
+    for resource_class, val in _distribution_rows(table):
+        try:
+            bonus = int(_text(val).strip().replace("‭", "").replace("‬", "").rstrip("%"))
+        except ValueError:
+            continue
+        _assign_resource(bonuses, resource_class, bonus)
+    return bonuses
+
+
+def _land_distribution(p: _TileFragmentParser) -> Dict[str, int]:
+    fields = {"wood": 0, "clay": 0, "iron": 0, "crop": 0}
+    table = p.tables.get("distribution")
+    if table is None:
+        return fields
+    for resource_class, val in _distribution_rows(table):
+        try:
+            count = int(_text(val).strip())
+        except ValueError:
+            continue
+        _assign_resource(fields, resource_class, count)
+    return fields
+
+
+def _attack_reports(p: _TileFragmentParser) -> List[Dict[str, str]]:
+    reports: List[Dict[str, str]] = []
+    table = p.tables.get("reports")
+    if table is None:
+        return reports
+    for row in _find_all(table, "tr"):
+        report = {}
+        for cls in ("type", "attacker", "time"):
+            cell = _find(row, "td", cls)
+            if cell is not None:
+                report[cls] = _text(cell).strip()
+        if report:
+            reports.append(report)
+    return reports
+
+
+def _animals(p: _TileFragmentParser) -> Optional[Dict[str, int]]:
+    table = p.tables.get("troop_info")
+    if table is None:
+        return None
+    animals: Dict[str, int] = {}
+    for row in _find_all(table, "tr"):
+        img = _find(row, "img")
+        cols = _find_all(row, "td")
+        if img and len(cols) >= 2:
+            name = (img.attrs.get("alt") or "").strip().lower()
+            count_text = _text_stripped(cols[1]).replace("‭", "").replace("‬", "")
+            try:
+                animals[name] = int(count_text)
+            except ValueError:
+                continue
+    return animals if animals else None
+
+
+def _owner_info(p: _TileFragmentParser) -> Optional[Dict[str, str]]:
+    table = p.tables.get("village_info")
+    if table is None:
+        return None
+    owner_info: Dict[str, str] = {}
+    tribe_row = _find(table, "tr", "first")
+    if tribe_row is not None:
+        tribe_cell = _find(tribe_row, "td")
+        if tribe_cell is not None:
+            owner_info["tribe"] = _text(tribe_cell).strip()
+    alliance_row = _find(table, "tr")
+    if alliance_row is not None:
+        alliance_cell = _find(alliance_row, "td")
+        if alliance_cell is not None:
+            link = _find(alliance_cell, "a")
+            owner_info["alliance"] = _text(link if link is not None else alliance_cell).strip()
+    return owner_info if owner_info else None
+
+
+def _population(p: _TileFragmentParser) -> Optional[int]:
+    table = p.tables.get("population")
+    if table is None:
+        return None
+    cell = _find(table, "td", "val")
+    if cell is None:
+        return None
+    try:
+        return int(_text(cell).strip())
+    except ValueError:
+        return None
+
+
+def _buildings(p: _TileFragmentParser) -> Dict[str, int]:
+    buildings: Dict[str, int] = {}
+    table = p.tables.get("buildings")
+    if table is None:
+        return buildings
+    for row in _find_all(table, "tr"):
+        name_cell = _find(row, "td", "name")
+        level_cell = _find(row, "td", "level")
+        if name_cell and level_cell:
+            try:
+                buildings[_text(name_cell).strip()] = int(_text(level_cell).strip())
+            except ValueError:
+                continue
+    return buildings
+
+
+def _founding_info(p: _TileFragmentParser) -> Optional[Dict[str, str]]:
+    table = p.tables.get("founding")
+    if table is None:
+        return None
+    info: Dict[str, str] = {}
+    for cls in ("requirements", "cost"):
+        cell = _find(table, "td", cls)
+        if cell is not None:
+            info[cls] = _text(cell).strip()
+    return info if info else None
+
+
+def analyze_tile_fast(html: str, coordinates: tuple) -> Dict[str, Any]:
+    """Single-pass equivalent of ``analyze_tile_reference``."""
+    parser = _TileFragmentParser()
+    parser.feed(html or "")
+    parser.close()
+
+    title = _text(parser.title_node).strip() if parser.title_node is not None else ""
+    tile_type = _tile_type(parser, title)
+    landscape = None
+    if parser.tile_classes is not None:
+        landscape = next((c.split("-")[1] for c in parser.tile_classes if c.startswith("landscape-")), None)
+
+    result: Dict[str, Any] = {
+        "coordinates": coordinates,
+        "type": tile_type.value,
+        "title": title,
+        "landscape_type": landscape,
+        "distance": _distance(parser),
+    }
+
+    if tile_type in (TileType.UNOCCUPIED_OASIS, TileType.OCCUPIED_OASIS):
+        result.update({
+            "resource_bonuses": _resource_bonuses(parser),
+            "attack_reports": _attack_reports(parser),
+        })
+        if tile_type == TileType.UNOCCUPIED_OASIS:
+            result["animals"] = _animals(parser)
+        else:
+            result["owner_info"] = _owner_info(parser)
+    elif tile_type in (TileType.USER_VILLAGE, TileType.NATAR_VILLAGE):
+        result.update({
+            "owner_info": _owner_info(parser),
+            "population": _population(parser),
+            "buildings": _buildings(parser),
+            "attack_reports": _attack_reports(parser),
+        })
+    elif tile_type == TileType.EMPTY_VALLEY:
+        land = _land_distribution(parser)
+        result.update({
+            "land_distribution": land,
+            "total_fields": sum(land.values()),
+            "founding_info": _founding_info(parser),
+            "attack_reports": _attack_reports(parser),
+        })
+    return result
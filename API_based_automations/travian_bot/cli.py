@@ -6,7 +6,7 @@ import logging
 from identity_handling.login import login
 from identity_handling.identity_helper import load_villages_from_identity
 from core.travian_api import TravianAPI
-from core.full_map_scanner import full_map_scan
+from core.full_map_scanner import full_map_scan, incremental_map_scan
 from analysis.full_scan_oasis_analysis import extract_unoccupied_oases
 
 
@@ -40,8 +40,12 @@ def cmd_scan(args):
     radius = int(args.radius or 25)
     print("\n🔍 Starting map scan...")
     print(f"\n✅ Selected village: {v['village_name']} at ({vx},{vy})")
-    print(f"[+] Starting full map scan around ({vx}, {vy}) with radius {radius}...")
-    path = full_map_scan(api, vx, vy, radius)
+    if args.incremental:
+        print(f"[+] Starting incremental map rescan around ({vx}, {vy}) with radius {radius}...")
+        path = incremental_map_scan(api, vx, vy, radius)
+    else:
+        print(f"[+] Starting full map scan around ({vx}, {vy}) with radius {radius}...")
+        path = full_map_scan(api, vx, vy, radius)
     print(f"\n✅ Scan saved to: {path}")
     if args.extract:
         print("[+] Extracting unoccupied oases from scan data...")
@@ -60,6 +64,7 @@ def main(argv=None):
     p_scan.add_argument("--radius", type=int, default=25, help="Scan radius (default 25)")
     p_scan.add_argument("--fast", action="store_true", help="Disable humanizer delays during scan")
     p_scan.add_argument("--extract", action="store_true", help="Extract unoccupied oases after scan")
+    p_scan.add_argument("--incremental", action="store_true", help="Only refetch tiles whose previous scan expired")
     p_scan.set_defaults(func=cmd_scan)
 
     args = parser.parse_args(argv)
@@ -121,6 +121,25 @@ class Settings:
     PROCESS_RALLY_RETURNS: bool = True
     RALLY_MATCH_TOLERANCE_SEC: float = 120.0
     RALLY_RETURN_TIMEOUT_SEC: float = 900.0
+    REPORT_STORE_ENABLE: bool = False
+    REPORT_STORE_PATH: str = "database/reports/reports.sqlite3"
+    REPORT_INGEST_MAX_PER_CYCLE: int = 20
+    PARSE_POOL_WORKERS: int = 0  # 0 = CPUs - 1, 1 = serial
+    PARSE_POOL_MIN_BATCH: int = 16
+    PARSE_POOL_CHUNK_SIZE: int = 8
+    LEARNING_STORE_BACKEND: str = "sqlite"
+    LEARNING_WRITER_BATCH_SEC: float = 0.5
+    LEARNING_HISTORY_MAX_PER_KEY: int = 50
+
+    # Metrics aggregator (in-memory, flushed periodically / per cycle)
+    METRICS_FLUSH_INTERVAL_SEC: float = 30.0
+    METRICS_JOURNAL_ENABLE: bool = False
+
+    # Incremental map rescan: max tile age per class before a refetch
+    MAP_RESCAN_OASIS_MAX_AGE_SEC: float = 21600.0
+    MAP_RESCAN_VILLAGE_MAX_AGE_SEC: float = 86400.0
+    MAP_RESCAN_VALLEY_MAX_AGE_SEC: float = 604800.0
+    MAP_RESCAN_OTHER_MAX_AGE_SEC: float = 604800.0
 
     # Credentials (optional; can be prompted interactively if empty)
     TRAVIAN_EMAIL: str = ""
@@ -148,6 +167,22 @@ class Settings:
     HUMAN_IDLE_LOOKAROUND_PAGES: list[str] | None = None
     HUMAN_IDLE_JITTER_MIN: float = 0.4
     HUMAN_IDLE_JITTER_MAX: float = 1.3
+    # Per-cycle page cache (dorf1 etc. fetched once per village per cycle)
+    PAGE_CACHE_ENABLE: bool = True
+    PAGE_CACHE_MAX_AGE_SEC: float = 120.0
+    # Per-endpoint request instrumentation (network time vs humanizer sleep)
+    REQUEST_STATS_ENABLE: bool = True
+    REQUEST_STATS_EXPORT: str = "json"  # json | prometheus | both | off
+    REQUEST_STATS_PATH: str = "database/request_stats.json"
+    REQUEST_STATS_PROM_PATH: str = "database/request_stats.prom"
+    REQUEST_STATS_FLUSH_INTERVAL_SEC: float = 60.0
+    CYCLE_PROFILE_ENABLE: bool = True
+    CYCLE_PROFILE_WINDOW: int = 50
+    CYCLE_PROFILE_PATH: str = "database/cycle_profile.jsonl"
+    SCHEDULER_ENABLE: bool = True
+    SCHEDULER_MIN_WAKE_SEC: float = 15.0
+    SCHEDULER_EVENT_GRACE_SEC: float = 5.0
+    SCHEDULER_POLL_SEC: float = 10.0
     HUMAN_SUSPICION_SLEEP_MIN: float = 90.0
     HUMAN_SUSPICION_SLEEP_MAX: float = 240.0
     SHUFFLE_VILLAGE_ORDER: bool = True    # randomize village order per cycle
@@ -229,6 +264,14 @@ class Settings:
     OASIS_COOLDOWN_ON_LOST_SEC: int = 1800
     OASIS_EARLY_EXIT_IF_INSUFFICIENT: bool = True
     OASIS_MAX_INSUFFICIENT_SKIPS: int = 10
+    OASIS_RAID_MODE: str = "nearest"  # nearest | loot_per_hour
+    OASIS_OPTIMIZER_TIME_BUDGET_MS: float = 20.0
+    OASIS_ANIMALS_CACHE_TTL_SEC: int = 600
+    OASIS_ANIMALS_CACHE_MAX_ENTRIES: int = 5000
+    ESCORT_SIMULATOR_ENABLE: bool = True
+    ESCORT_MAX_LOSS_PCT: float = 0.15  # max expected attacker loss (0..1) for an escort to count as winning
+    ESCORT_MAX_UNITS: int = 50
+    ESCORT_HERO_MOUNTED: bool = False
     OASIS_ALWAYS_NEAREST_ONLY: bool = False
 
     def as_dict(self) -> dict:
@@ -258,6 +301,21 @@ class Settings:
             "PROCESS_RALLY_RETURNS": self.PROCESS_RALLY_RETURNS,
             "RALLY_MATCH_TOLERANCE_SEC": self.RALLY_MATCH_TOLERANCE_SEC,
             "RALLY_RETURN_TIMEOUT_SEC": self.RALLY_RETURN_TIMEOUT_SEC,
+            "REPORT_STORE_ENABLE": self.REPORT_STORE_ENABLE,
+            "REPORT_STORE_PATH": self.REPORT_STORE_PATH,
+            "REPORT_INGEST_MAX_PER_CYCLE": self.REPORT_INGEST_MAX_PER_CYCLE,
+            "PARSE_POOL_WORKERS": self.PARSE_POOL_WORKERS,
+            "PARSE_POOL_MIN_BATCH": self.PARSE_POOL_MIN_BATCH,
+            "PARSE_POOL_CHUNK_SIZE": self.PARSE_POOL_CHUNK_SIZE,
+            "LEARNING_STORE_BACKEND": self.LEARNING_STORE_BACKEND,
+            "LEARNING_WRITER_BATCH_SEC": self.LEARNING_WRITER_BATCH_SEC,
+            "LEARNING_HISTORY_MAX_PER_KEY": self.LEARNING_HISTORY_MAX_PER_KEY,
+            "METRICS_FLUSH_INTERVAL_SEC": self.METRICS_FLUSH_INTERVAL_SEC,
+            "METRICS_JOURNAL_ENABLE": self.METRICS_JOURNAL_ENABLE,
+            "MAP_RESCAN_OASIS_MAX_AGE_SEC": self.MAP_RESCAN_OASIS_MAX_AGE_SEC,
+            "MAP_RESCAN_VILLAGE_MAX_AGE_SEC": self.MAP_RESCAN_VILLAGE_MAX_AGE_SEC,
+            "MAP_RESCAN_VALLEY_MAX_AGE_SEC": self.MAP_RESCAN_VALLEY_MAX_AGE_SEC,
+            "MAP_RESCAN_OTHER_MAX_AGE_SEC": self.MAP_RESCAN_OTHER_MAX_AGE_SEC,
             "TRAVIAN_EMAIL": self.TRAVIAN_EMAIL,
             "TRAVIAN_PASSWORD": "***" if self.TRAVIAN_PASSWORD else "",
             "TRAVIAN_X_VERSION": self.TRAVIAN_X_VERSION,
@@ -276,6 +334,20 @@ class Settings:
             "HUMAN_IDLE_LOOKAROUND_PAGES": self.HUMAN_IDLE_LOOKAROUND_PAGES or [],
             "HUMAN_IDLE_JITTER_MIN": self.HUMAN_IDLE_JITTER_MIN,
             "HUMAN_IDLE_JITTER_MAX": self.HUMAN_IDLE_JITTER_MAX,
+            "PAGE_CACHE_ENABLE": self.PAGE_CACHE_ENABLE,
+            "PAGE_CACHE_MAX_AGE_SEC": self.PAGE_CACHE_MAX_AGE_SEC,
+            "REQUEST_STATS_ENABLE": self.REQUEST_STATS_ENABLE,
+            "REQUEST_STATS_EXPORT": self.REQUEST_STATS_EXPORT,
+            "REQUEST_STATS_PATH": self.REQUEST_STATS_PATH,
+            "REQUEST_STATS_PROM_PATH": self.REQUEST_STATS_PROM_PATH,
+            "REQUEST_STATS_FLUSH_INTERVAL_SEC": self.REQUEST_STATS_FLUSH_INTERVAL_SEC,
+            "CYCLE_PROFILE_ENABLE": self.CYCLE_PROFILE_ENABLE,
+            "CYCLE_PROFILE_WINDOW": self.CYCLE_PROFILE_WINDOW,
+            "CYCLE_PROFILE_PATH": self.CYCLE_PROFILE_PATH,
+            "SCHEDULER_ENABLE": self.SCHEDULER_ENABLE,
+            "SCHEDULER_MIN_WAKE_SEC": self.SCHEDULER_MIN_WAKE_SEC,
+            "SCHEDULER_EVENT_GRACE_SEC": self.SCHEDULER_EVENT_GRACE_SEC,
+            "SCHEDULER_POLL_SEC": self.SCHEDULER_POLL_SEC,
             "HUMAN_SUSPICION_SLEEP_MIN": self.HUMAN_SUSPICION_SLEEP_MIN,
             "HUMAN_SUSPICION_SLEEP_MAX": self.HUMAN_SUSPICION_SLEEP_MAX,
             "SHUFFLE_VILLAGE_ORDER": self.SHUFFLE_VILLAGE_ORDER,
@@ -337,6 +409,14 @@ class Settings:
             "OASIS_COOLDOWN_ON_LOST_SEC": self.OASIS_COOLDOWN_ON_LOST_SEC,
             "OASIS_EARLY_EXIT_IF_INSUFFICIENT": self.OASIS_EARLY_EXIT_IF_INSUFFICIENT,
             "OASIS_MAX_INSUFFICIENT_SKIPS": self.OASIS_MAX_INSUFFICIENT_SKIPS,
+            "OASIS_RAID_MODE": self.OASIS_RAID_MODE,
+            "OASIS_OPTIMIZER_TIME_BUDGET_MS": self.OASIS_OPTIMIZER_TIME_BUDGET_MS,
+            "OASIS_ANIMALS_CACHE_TTL_SEC": self.OASIS_ANIMALS_CACHE_TTL_SEC,
+            "OASIS_ANIMALS_CACHE_MAX_ENTRIES": self.OASIS_ANIMALS_CACHE_MAX_ENTRIES,
+            "ESCORT_SIMULATOR_ENABLE": self.ESCORT_SIMULATOR_ENABLE,
+            "ESCORT_MAX_LOSS_PCT": self.ESCORT_MAX_LOSS_PCT,
+            "ESCORT_MAX_UNITS": self.ESCORT_MAX_UNITS,
+            "ESCORT_HERO_MOUNTED": self.ESCORT_HERO_MOUNTED,
             "OASIS_ALWAYS_NEAREST_ONLY": self.OASIS_ALWAYS_NEAREST_ONLY,
         }
 
@@ -402,6 +482,25 @@ def load_settings(env_prefix: str = "") -> Settings:
     s.PROCESS_RALLY_RETURNS = _as_bool(g("PROCESS_RALLY_RETURNS", s.PROCESS_RALLY_RETURNS), s.PROCESS_RALLY_RETURNS)
     s.RALLY_MATCH_TOLERANCE_SEC = _as_float(g("RALLY_MATCH_TOLERANCE_SEC", s.RALLY_MATCH_TOLERANCE_SEC), s.RALLY_MATCH_TOLERANCE_SEC)
     s.RALLY_RETURN_TIMEOUT_SEC = _as_float(g("RALLY_RETURN_TIMEOUT_SEC", s.RALLY_RETURN_TIMEOUT_SEC), s.RALLY_RETURN_TIMEOUT_SEC)
+    s.REPORT_STORE_ENABLE = _as_bool(g("REPORT_STORE_ENABLE", s.REPORT_STORE_ENABLE), s.REPORT_STORE_ENABLE)
+    s.REPORT_STORE_PATH = _as_str(g("REPORT_STORE_PATH", s.REPORT_STORE_PATH), s.REPORT_STORE_PATH)
+    s.REPORT_INGEST_MAX_PER_CYCLE = _as_int(g("REPORT_INGEST_MAX_PER_CYCLE", s.REPORT_INGEST_MAX_PER_CYCLE), s.REPORT_INGEST_MAX_PER_CYCLE)
+    s.PARSE_POOL_WORKERS = _as_int(g("PARSE_POOL_WORKERS", s.PARSE_POOL_WORKERS), s.PARSE_POOL_WORKERS)
+    s.PARSE_POOL_MIN_BATCH = _as_int(g("PARSE_POOL_MIN_BATCH", s.PARSE_POOL_MIN_BATCH), s.PARSE_POOL_MIN_BATCH)
+    s.PARSE_POOL_CHUNK_SIZE = _as_int(g("PARSE_POOL_CHUNK_SIZE", s.PARSE_POOL_CHUNK_SIZE), s.PARSE_POOL_CHUNK_SIZE)
+    s.LEARNING_STORE_BACKEND = _as_str(g("LEARNING_STORE_BACKEND", s.LEARNING_STORE_BACKEND), s.LEARNING_STORE_BACKEND)
+    s.LEARNING_WRITER_BATCH_SEC = _as_float(g("LEARNING_WRITER_BATCH_SEC", s.LEARNING_WRITER_BATCH_SEC), s.LEARNING_WRITER_BATCH_SEC)
+    s.LEARNING_HISTORY_MAX_PER_KEY = _as_int(g("LEARNING_HISTORY_MAX_PER_KEY", s.LEARNING_HISTORY_MAX_PER_KEY), s.LEARNING_HISTORY_MAX_PER_KEY)
+
+    # Metrics aggregator
+    s.METRICS_FLUSH_INTERVAL_SEC = _as_float(g("METRICS_FLUSH_INTERVAL_SEC", s.METRICS_FLUSH_INTERVAL_SEC), s.METRICS_FLUSH_INTERVAL_SEC)
+    s.METRICS_JOURNAL_ENABLE = _as_bool(g("METRICS_JOURNAL_ENABLE", s.METRICS_JOURNAL_ENABLE), s.METRICS_JOURNAL_ENABLE)
+
+    # Incremental map rescan
+    s.MAP_RESCAN_OASIS_MAX_AGE_SEC = _as_float(g("MAP_RESCAN_OASIS_MAX_AGE_SEC", s.MAP_RESCAN_OASIS_MAX_AGE_SEC), s.MAP_RESCAN_OASIS_MAX_AGE_SEC)
+    s.MAP_RESCAN_VILLAGE_MAX_AGE_SEC = _as_float(g("MAP_RESCAN_VILLAGE_MAX_AGE_SEC", s.MAP_RESCAN_VILLAGE_MAX_AGE_SEC), s.MAP_RESCAN_VILLAGE_MAX_AGE_SEC)
+    s.MAP_RESCAN_VALLEY_MAX_AGE_SEC = _as_float(g("MAP_RESCAN_VALLEY_MAX_AGE_SEC", s.MAP_RESCAN_VALLEY_MAX_AGE_SEC), s.MAP_RESCAN_VALLEY_MAX_AGE_SEC)
+    s.MAP_RESCAN_OTHER_MAX_AGE_SEC = _as_float(g("MAP_RESCAN_OTHER_MAX_AGE_SEC", s.MAP_RESCAN_OTHER_MAX_AGE_SEC), s.MAP_RESCAN_OTHER_MAX_AGE_SEC)
 
     # Credentials
     s.TRAVIAN_EMAIL = _as_str(g("TRAVIAN_EMAIL", s.TRAVIAN_EMAIL), s.TRAVIAN_EMAIL)
@@ -427,6 +526,20 @@ def load_settings(env_prefix: str = "") -> Settings:
     s.HUMAN_IDLE_MAX_INTERVAL = _as_float(g("HUMAN_IDLE_MAX_INTERVAL", s.HUMAN_IDLE_MAX_INTERVAL), s.HUMAN_IDLE_MAX_INTERVAL)
     s.HUMAN_IDLE_JITTER_MIN = _as_float(g("HUMAN_IDLE_JITTER_MIN", s.HUMAN_IDLE_JITTER_MIN), s.HUMAN_IDLE_JITTER_MIN)
     s.HUMAN_IDLE_JITTER_MAX = _as_float(g("HUMAN_IDLE_JITTER_MAX", s.HUMAN_IDLE_JITTER_MAX), s.HUMAN_IDLE_JITTER_MAX)
+    s.PAGE_CACHE_ENABLE = _as_bool(g("PAGE_CACHE_ENABLE", s.PAGE_CACHE_ENABLE), s.PAGE_CACHE_ENABLE)
+    s.PAGE_CACHE_MAX_AGE_SEC = _as_float(g("PAGE_CACHE_MAX_AGE_SEC", s.PAGE_CACHE_MAX_AGE_SEC), s.PAGE_CACHE_MAX_AGE_SEC)
+    s.REQUEST_STATS_ENABLE = _as_bool(g("REQUEST_STATS_ENABLE", s.REQUEST_STATS_ENABLE), s.REQUEST_STATS_ENABLE)
+    s.REQUEST_STATS_EXPORT = _as_str(g("REQUEST_STATS_EXPORT", s.REQUEST_STATS_EXPORT), s.REQUEST_STATS_EXPORT)
+    s.REQUEST_STATS_PATH = _as_str(g("REQUEST_STATS_PATH", s.REQUEST_STATS_PATH), s.REQUEST_STATS_PATH)
+    s.REQUEST_STATS_PROM_PATH = _as_str(g("REQUEST_STATS_PROM_PATH", s.REQUEST_STATS_PROM_PATH), s.REQUEST_STATS_PROM_PATH)
+    s.REQUEST_STATS_FLUSH_INTERVAL_SEC = _as_float(g("REQUEST_STATS_FLUSH_INTERVAL_SEC", s.REQUEST_STATS_FLUSH_INTERVAL_SEC), s.REQUEST_STATS_FLUSH_INTERVAL_SEC)
+    s.CYCLE_PROFILE_ENABLE = _as_bool(g("CYCLE_PROFILE_ENABLE", s.CYCLE_PROFILE_ENABLE), s.CYCLE_PROFILE_ENABLE)
+    s.CYCLE_PROFILE_WINDOW = _as_int(g("CYCLE_PROFILE_WINDOW", s.CYCLE_PROFILE_WINDOW), s.CYCLE_PROFILE_WINDOW)
+    s.CYCLE_PROFILE_PATH = _as_str(g("CYCLE_PROFILE_PATH", s.CYCLE_PROFILE_PATH), s.CYCLE_PROFILE_PATH)
+    s.SCHEDULER_ENABLE = _as_bool(g("SCHEDULER_ENABLE", s.SCHEDULER_ENABLE), s.SCHEDULER_ENABLE)
+    s.SCHEDULER_MIN_WAKE_SEC = _as_float(g("SCHEDULER_MIN_WAKE_SEC", s.SCHEDULER_MIN_WAKE_SEC), s.SCHEDULER_MIN_WAKE_SEC)
+    s.SCHEDULER_EVENT_GRACE_SEC = _as_float(g("SCHEDULER_EVENT_GRACE_SEC", s.SCHEDULER_EVENT_GRACE_SEC), s.SCHEDULER_EVENT_GRACE_SEC)
+    s.SCHEDULER_POLL_SEC = _as_float(g("SCHEDULER_POLL_SEC", s.SCHEDULER_POLL_SEC), s.SCHEDULER_POLL_SEC)
     s.HUMAN_SUSPICION_SLEEP_MIN = _as_float(g("HUMAN_SUSPICION_SLEEP_MIN", s.HUMAN_SUSPICION_SLEEP_MIN), s.HUMAN_SUSPICION_SLEEP_MIN)
     s.HUMAN_SUSPICION_SLEEP_MAX = _as_float(g("HUMAN_SUSPICION_SLEEP_MAX", s.HUMAN_SUSPICION_SLEEP_MAX), s.HUMAN_SUSPICION_SLEEP_MAX)
     idle_pages = g("HUMAN_IDLE_LOOKAROUND_PAGES", s.HUMAN_IDLE_LOOKAROUND_PAGES or []) or []
@@ -511,6 +624,14 @@ def load_settings(env_prefix: str = "") -> Settings:
     s.OASIS_COOLDOWN_ON_LOST_SEC = _as_int(g("OASIS_COOLDOWN_ON_LOST_SEC", s.OASIS_COOLDOWN_ON_LOST_SEC), s.OASIS_COOLDOWN_ON_LOST_SEC)
     s.OASIS_EARLY_EXIT_IF_INSUFFICIENT = _as_bool(g("OASIS_EARLY_EXIT_IF_INSUFFICIENT", s.OASIS_EARLY_EXIT_IF_INSUFFICIENT), s.OASIS_EARLY_EXIT_IF_INSUFFICIENT)
     s.OASIS_MAX_INSUFFICIENT_SKIPS = _as_int(g("OASIS_MAX_INSUFFICIENT_SKIPS", s.OASIS_MAX_INSUFFICIENT_SKIPS), s.OASIS_MAX_INSUFFICIENT_SKIPS)
+    s.OASIS_RAID_MODE = _as_str(g("OASIS_RAID_MODE", s.OASIS_RAID_MODE), s.OASIS_RAID_MODE)
+    s.OASIS_OPTIMIZER_TIME_BUDGET_MS = _as_float(g("OASIS_OPTIMIZER_TIME_BUDGET_MS", s.OASIS_OPTIMIZER_TIME_BUDGET_MS), s.OASIS_OPTIMIZER_TIME_BUDGET_MS)
+    s.OASIS_ANIMALS_CACHE_TTL_SEC = _as_int(g("OASIS_ANIMALS_CACHE_TTL_SEC", s.OASIS_ANIMALS_CACHE_TTL_SEC), s.OASIS_ANIMALS_CACHE_TTL_SEC)
+    s.OASIS_ANIMALS_CACHE_MAX_ENTRIES = _as_int(g("OASIS_ANIMALS_CACHE_MAX_ENTRIES", s.OASIS_ANIMALS_CACHE_MAX_ENTRIES), s.OASIS_ANIMALS_CACHE_MAX_ENTRIES)
+    s.ESCORT_SIMULATOR_ENABLE = _as_bool(g("ESCORT_SIMULATOR_ENABLE", s.ESCORT_SIMULATOR_ENABLE), s.ESCORT_SIMULATOR_ENABLE)
+    s.ESCORT_MAX_LOSS_PCT = _as_float(g("ESCORT_MAX_LOSS_PCT", s.ESCORT_MAX_LOSS_PCT), s.ESCORT_MAX_LOSS_PCT)
+    s.ESCORT_MAX_UNITS = _as_int(g("ESCORT_MAX_UNITS", s.ESCORT_MAX_UNITS), s.ESCORT_MAX_UNITS)
+    s.ESCORT_HERO_MOUNTED = _as_bool(g("ESCORT_HERO_MOUNTED", s.ESCORT_HERO_MOUNTED), s.ESCORT_HERO_MOUNTED)
     try:
         s.OASIS_ALWAYS_NEAREST_ONLY = _as_bool(g("OASIS_ALWAYS_NEAREST_ONLY", s.OASIS_ALWAYS_NEAREST_ONLY), s.OASIS_ALWAYS_NEAREST_ONLY)
     except Exception:
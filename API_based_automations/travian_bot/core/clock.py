@@ -0,0 +1,114 @@
+from __future__ import annotations
+import threading
+import time as _time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+
+# Process-wide clock for scheduling decisions (due times, pauses, quiet windows,
+# limiter budgets, ETA sleeps). Production uses the system clock; a replay or a
+# test installs a VirtualClock, whose sleep() advances virtual time instantly,
+# so a day of scheduling runs in seconds.
+#
+# Network timing (request latency, write-behind batching) keeps using the real
+# clock: those measure this machine, not the game.
+
+
+class SystemClock:
+    """Wall clock: time.time() / time.monotonic() / time.sleep()."""
+
+    virtual = False
+
+    def now(self) -> float:
+        return _time.time()
+
+    def monotonic(self) -> float:
+        return _time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            _time.sleep(seconds)
+
+
+class VirtualClock:
+    """Simulated clock: sleep() moves time forward without waiting.
+
+    Meant for single-driver replays (the Full Auto loop without its helper
+    threads); concurrent sleepers would each advance the shared time.
+    """
+
+    virtual = True
+
+    def __init__(self, start: Optional[float] = None) -> None:
+        self._lock = threading.Lock()
+        self._now = float(_time.time() if start is None else start)
+        self._start = self._now
+        self.slept = 0.0        # total virtual seconds spent in sleep()
+
+    def now(self) -> float:
+        with self._lock:
+            return self._now
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self._now - self._start
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.advance(seconds)
+            with self._lock:
+                self.slept += float(seconds)
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self._now += max(0.0, float(seconds))
+
+
+_CLOCK: SystemClock | VirtualClock = SystemClock()
+
+
+def get_clock() -> SystemClock | VirtualClock:
+    return _CLOCK
+
+
+def set_clock(clock: SystemClock | VirtualClock | None) -> None:
+    """Install a clock for the whole process (None restores the system clock)."""
+    global _CLOCK
+    _CLOCK = clock if clock is not None else SystemClock()
+
+
+@contextmanager
+def use(clock: SystemClock | VirtualClock) -> Iterator[SystemClock | VirtualClock]:
+    previous = _CLOCK
+    set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
+
+
+def now() -> float:
+    """Epoch seconds on the active clock (drop-in for time.time())."""
+    return _CLOCK.now()
+
+
+def monotonic() -> float:
+    return _CLOCK.monotonic()
+
+
+def sleep(seconds: float) -> None:
+    """Sleep on the active clock (instant under a VirtualClock)."""
+    _CLOCK.sleep(seconds)
+
+
+def is_virtual() -> bool:
+    return bool(getattr(_CLOCK, "virtual", False))
+
+
+def datetime_now() -> datetime:
+    """Local datetime on the active clock (drop-in for datetime.now())."""
+    return datetime.fromtimestamp(_CLOCK.now())
+
+
+def strftime(fmt: str) -> str:
+    return _time.strftime(fmt, _time.localtime(_CLOCK.now()))
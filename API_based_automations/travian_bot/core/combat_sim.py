@@ -0,0 +1,208 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from analysis.animal_to_power_mapping import ANIMAL_IDENTIFIER_MAP
+from core.combat_stats import ANIMAL_CODES, ANIMAL_STATS, DEFAULT_TRIBE_ID, UNIT_STATS
+
+try:
+    from config.config import settings as _cfg
+except Exception:
+    class _CfgFallback:
+        ESCORT_SIMULATOR_ENABLE = True
+        ESCORT_MAX_LOSS_PCT = 0.15
+        ESCORT_MAX_UNITS = 50
+        ESCORT_HERO_MOUNTED = False
+    _cfg = _CfgFallback()
+
+# Battle estimate for raids on oases (nature defends: no morale, no wall, no
+# village base defence). One call evaluates a whole grid of oasis garrisons ×
+# escort compositions; per-composition attack splits and per-oasis defence
+# values are computed once, so the inner loop is a few float operations.
+#
+#   attack   A = infantry attack + cavalry attack (+ hero)
+#   defence  D = Dinf · (infantry share of A) + Dcav · (cavalry share of A)
+#   exponent K = 2 · (1.8592 − N^0.015), clamped to [1.2578, 1.5]; N = all units in the fight
+#   raid     winner loses x/(1+x), loser 1/(1+x), with x = (weaker/stronger)^K
+#   attack   winner loses x, loser loses everything
+#
+# Animals are resolved by unit class (u31..u40) or a known name; a garrison
+# with an animal that resolves to neither has no estimate (None), never zero.
+
+_HERO_UPKEEP = 6
+
+
+@dataclass(slots=True)
+class Composition:
+    """Escort troops per local slot (t1..t10) plus an optional hero attack value."""
+    units: dict[str, int]
+    hero_attack: float = 0.0
+    hero_mounted: bool = False
+    attack_inf: float = field(init=False, default=0.0)
+    attack_cav: float = field(init=False, default=0.0)
+    count: int = field(init=False, default=0)
+    upkeep: int = field(init=False, default=0)
+
+
+@dataclass(slots=True)
+class Outcome:
+    win: bool
+    attacker_loss_pct: float    # 0..1 of the attacking units
+    defender_loss_pct: float    # 0..1 of the animals
+
+
+def _canonical_animal(name: str) -> Optional[str]:
+    key = str(name or "").strip().lower()
+    if key.startswith("unit "):
+        key = key[5:].strip()
+    key = ANIMAL_CODES.get(key) or ANIMAL_IDENTIFIER_MAP.get(key, key)
+    return key if key in ANIMAL_STATS else None
+
+
+def oasis_defence(animals) -> Optional[tuple[float, float, int]]:
+    """(defence vs infantry, defence vs cavalry, animal count) for [(name, count)] or {name: count}.
+
+    Names may be unit codes ("u31") or animal names; None if any animal cannot be resolved.
+    """
+    items = animals.items() if isinstance(animals, dict) else (animals or [])
+    d_inf = d_cav = 0.0
+    n = 0
+    for name, count in items:
+        try:
+            count = int(count)
+        except Exception:
+            return None
+        if count <= 0:
+            continue
+        canonical = _canonical_animal(name)
+        if canonical is None:
+            return None
+        stats = ANIMAL_STATS[canonical]
+        d_inf += stats[1] * count
+        d_cav += stats[2] * count
+        n += count
+    return d_inf, d_cav, n
+
+
+def prepare(comp: Composition, tribe_id: int) -> Composition:
+    """Fill the attack split, unit count and upkeep of a composition for one tribe."""
+    table = UNIT_STATS.get(int(tribe_id or DEFAULT_TRIBE_ID), UNIT_STATS[DEFAULT_TRIBE_ID])
+    a_inf = a_cav = 0.0
+    count = upkeep = 0
+    for code, n in (comp.units or {}).items():
+        stats = table.get(code)
+        if not stats or int(n) <= 0:
+            continue
+        atk, _di, _dc, is_cav, _carry, unit_upkeep = stats
+        if is_cav:
+            a_cav += atk * n
+        else:
+            a_inf += atk * n
+        count += int(n)
+        upkeep += unit_upkeep * int(n)
+    if comp.hero_attack > 0:
+        if comp.hero_mounted:
+            a_cav += comp.hero_attack
+        else:
+            a_inf += comp.hero_attack
+        count += 1
+        upkeep += _HERO_UPKEEP
+    comp.attack_inf, comp.attack_cav, comp.count, comp.upkeep = a_inf, a_cav, count, upkeep
+    return comp
+
+
+def _exponent(total_units: int) -> float:
+    k = 2.0 * (1.8592 - max(1, total_units) ** 0.015)
+    return min(1.5, max(1.2578, k))
+
+
+def simulate_batch(oases: list, compositions: list[Composition], tribe_id: int,
+                   raid: bool = True) -> list[Optional[list[Outcome]]]:
+    """Outcome grid [oasis][composition]; `oases` are animal lists as returned by get_oasis_info.
+
+    The row is None for an oasis whose garrison cannot be resolved (see oasis_defence).
+    """
+    comps = [prepare(c, tribe_id) for c in compositions]
+    # Per-composition constants hoisted out of the grid
+    attack = [c.attack_inf + c.attack_cav for c in comps]
+    inf_share = [(c.attack_inf / a) if a > 0 else 1.0 for c, a in zip(comps, attack)]
+    counts = [c.count for c in comps]
+    grid: list[Optional[list[Outcome]]] = []
+    for animals in oases:
+        defence = oasis_defence(animals)
+        if defence is None:
+            grid.append(None)
+            continue
+        d_inf, d_cav, n_def = defence
+        row: list[Outcome] = []
+        for a, share, n_att in zip(attack, inf_share, counts):
+            if a <= 0:
+                row.append(Outcome(n_def == 0, 0.0 if n_def == 0 else 1.0, 0.0))
+                continue
+            if n_def == 0:
+                row.append(Outcome(True, 0.0, 0.0))
+                continue
+            d = d_inf * share + d_cav * (1.0 - share)
+            k = _exponent(n_att + n_def)
+            win = a > d
+            x = (min(a, d) / max(a, d)) ** k
+            if raid:
+                winner_loss, loser_loss = x / (1.0 + x), 1.0 / (1.0 + x)
+            else:
+                winner_loss, loser_loss = x, 1.0
+            if win:
+                row.append(Outcome(True, winner_loss, loser_loss))
+            else:
+                row.append(Outcome(False, loser_loss, winner_loss))
+        grid.append(row)
+    return grid
+
+
+def single_unit_candidates(available_by_t: dict[str, int], tribe_id: int,
+                           priority: Optional[Iterable[str]] = None,
+                           max_units: int = 50, hero_attack: float = 0.0,
+                           hero_mounted: bool = False) -> list[Composition]:
+    """Hero alone plus hero + 1..N of every available attacking unit type (capped by the bank)."""
+    table = UNIT_STATS.get(int(tribe_id or DEFAULT_TRIBE_ID), UNIT_STATS[DEFAULT_TRIBE_ID])
+    order = list(priority or []) + [f"t{i}" for i in range(1, 11)]
+    seen: set[str] = set()
+    out = [Composition({}, hero_attack, hero_mounted)]
+    for code in order:
+        if code in seen:
+            continue
+        seen.add(code)
+        stats = table.get(code)
+        have = int(available_by_t.get(code, 0) or 0)
+        if not stats or stats[0] <= 0 or have <= 0:
+            continue
+        for n in range(1, min(have, max(1, int(max_units))) + 1):
+            out.append(Composition({code: n}, hero_attack, hero_mounted))
+    return out
+
+
+def cheapest_winning(animals, candidates: list[Composition], tribe_id: int,
+                     max_loss_pct: Optional[float] = None,
+                     raid: bool = True) -> Optional[tuple[Composition, Outcome]]:
+    """Lowest-upkeep candidate that wins with attacker losses within the bound (None if none does).
+
+    Ties go to fewer losses, then to the earlier candidate (escort priority order).
+    Also None when the garrison cannot be resolved; check oasis_defence() first to tell the two apart.
+    """
+    if max_loss_pct is None:
+        max_loss_pct = float(getattr(_cfg, "ESCORT_MAX_LOSS_PCT", 0.15))
+    row = simulate_batch([animals], candidates, tribe_id, raid=raid)[0]
+    if row is None:
+        return None
+    best = None
+    for idx, (comp, res) in enumerate(zip(candidates, row)):
+        if not res.win or res.attacker_loss_pct > max_loss_pct:
+            continue
+        key = (comp.upkeep, round(res.attacker_loss_pct, 4), idx)
+        if best is None or key < best[0]:
+            best = (key, comp, res)
+    return (best[1], best[2]) if best else None
+
+
+def enabled() -> bool:
+    return bool(getattr(_cfg, "ESCORT_SIMULATOR_ENABLE", True))
+
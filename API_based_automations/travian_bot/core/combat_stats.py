@@ -1,29 +1,65 @@
-# Lightweight troop attack table per tribe for Travian T4.6
+# Troop and animal stat tables for Travian T4.6
 # Tribe ids: 1=Romans, 2=Teutons, 3=Gauls, 4=Huns, 5=Egyptians
 
-TROOP_ATTACK = {
+# Full unit table per tribe: (attack, defense vs infantry, defense vs cavalry, cavalry?, carry, upkeep)
+UNIT_STATS = {
     1: {  # Romans
-        "t1": 40, "t2": 30, "t3": 70, "t4": 0,  "t5": 120, "t6": 180,
-        "t7": 60,  "t8": 75,  "t9": 50,  "t10": 0,
+        "t1": (40, 35, 50, False, 50, 1), "t2": (30, 65, 35, False, 20, 1), "t3": (70, 40, 25, False, 50, 1),
+        "t4": (0, 20, 10, True, 0, 2), "t5": (120, 65, 50, True, 100, 3), "t6": (180, 80, 105, True, 70, 4),
+        "t7": (60, 30, 75, False, 0, 3), "t8": (75, 60, 10, False, 0, 6), "t9": (50, 40, 30, False, 0, 5),
+        "t10": (0, 80, 80, False, 3000, 1),
     },
     2: {  # Teutons (Germans)
-        "t1": 40, "t2": 10, "t3": 60, "t4": 0,  "t5": 55,  "t6": 150,
-        "t7": 65,  "t8": 50,  "t9": 40,  "t10": 0,
+        "t1": (40, 20, 5, False, 60, 1), "t2": (10, 35, 60, False, 40, 1), "t3": (60, 30, 30, False, 50, 1),
+        "t4": (0, 10, 5, True, 0, 1), "t5": (55, 100, 40, True, 110, 2), "t6": (150, 50, 75, True, 80, 3),
+        "t7": (65, 30, 80, False, 0, 3), "t8": (50, 60, 10, False, 0, 6), "t9": (40, 60, 40, False, 0, 4),
+        "t10": (10, 80, 80, False, 3000, 1),
     },
     3: {  # Gauls
-        "t1": 15, "t2": 65, "t3": 0,  "t4": 90, "t5": 45,  "t6": 140,
-        "t7": 50,  "t8": 65,  "t9": 30,  "t10": 0,
+        "t1": (15, 40, 50, False, 35, 1), "t2": (65, 35, 20, False, 45, 1), "t3": (0, 20, 10, True, 0, 2),
+        "t4": (100, 25, 40, True, 75, 2), "t5": (45, 115, 55, True, 35, 2), "t6": (140, 50, 165, True, 65, 3),
+        "t7": (50, 30, 105, False, 0, 3), "t8": (70, 45, 10, False, 0, 6), "t9": (40, 50, 50, False, 0, 4),
+        "t10": (0, 80, 80, False, 3000, 1),
     },
     4: {  # Huns
-        "t1": 40, "t2": 30, "t3": 105, "t4": 115, "t5": 180, "t6": 170,
-        "t7": 60,  "t8": 70,  "t9": 50,  "t10": 0,
+        "t1": (35, 40, 30, False, 50, 1), "t2": (50, 30, 10, False, 30, 1), "t3": (0, 20, 10, True, 0, 2),
+        "t4": (120, 30, 15, True, 75, 2), "t5": (110, 80, 70, True, 105, 2), "t6": (180, 60, 40, True, 80, 3),
+        "t7": (65, 30, 90, False, 0, 3), "t8": (45, 55, 10, False, 0, 6), "t9": (50, 40, 30, False, 0, 4),
+        "t10": (0, 80, 80, False, 3000, 1),
     },
     5: {  # Egyptians
-        "t1": 10, "t2": 20, "t3": 30,  "t4": 0,   "t5": 120, "t6": 150,
-        "t7": 30,  "t8": 55,  "t9": 40,  "t10": 0,
+        "t1": (10, 30, 20, False, 15, 1), "t2": (30, 55, 40, False, 50, 1), "t3": (65, 50, 20, False, 45, 1),
+        "t4": (0, 20, 10, True, 0, 2), "t5": (50, 110, 50, True, 50, 2), "t6": (110, 120, 150, True, 70, 3),
+        "t7": (55, 30, 95, False, 0, 3), "t8": (65, 55, 10, False, 0, 6), "t9": (40, 50, 50, False, 0, 4),
+        "t10": (0, 80, 80, False, 3000, 1),
     },
 }
 
+# Oasis animals (nature tribe): (attack, defense vs infantry, defense vs cavalry, upkeep)
+ANIMAL_STATS = {
+    "rat": (10, 25, 20, 1),
+    "spider": (20, 35, 40, 1),
+    "snake": (60, 40, 60, 1),
+    "bat": (80, 66, 50, 1),
+    "wild boar": (50, 70, 33, 2),
+    "wolf": (100, 80, 70, 2),
+    "bear": (250, 140, 200, 3),
+    "crocodile": (450, 380, 240, 3),
+    "tiger": (200, 170, 250, 3),
+    "elephant": (600, 440, 520, 5),
+}
+
+# Animal unit class on the tile page (<img class="unit u31">); unlike the alt text it does not depend on the game language
+ANIMAL_CODES = {
+    "u31": "rat", "u32": "spider", "u33": "snake", "u34": "bat", "u35": "wild boar",
+    "u36": "wolf", "u37": "bear", "u38": "crocodile", "u39": "tiger", "u40": "elephant",
+}
+
+# Attack-only view kept for the simple escort estimate below
+TROOP_ATTACK = {
+    tribe: {code: stats[0] for code, stats in units.items()} for tribe, units in UNIT_STATS.items()
+}
+
 DEFAULT_TRIBE_ID = 4  # default to Huns if unknown (matches your use case)
 
 
@@ -45,4 +81,4 @@ def estimate_escort_units(required_attack: float, unit_attack: int,
         needed = ceil(max(0.0, float(required_attack)) / float(unit_attack))
         return int(max(min_units, min(needed, max_units)))
     except Exception:
-        return max(1, int(min_units))
\ No newline at end of file
+        return max(1, int(min_units))
@@ -0,0 +1,179 @@
+from __future__ import annotations
+import json
+import math
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+try:
+    from config.config import settings as _cfg
+except Exception:
+    class _CfgFallback:
+        CYCLE_PROFILE_ENABLE = True
+        CYCLE_PROFILE_WINDOW = 50
+        CYCLE_PROFILE_PATH = "database/cycle_profile.jsonl"
+    _cfg = _CfgFallback()
+
+try:
+    from core.request_stats import total_requests as _total_requests
+except Exception:
+    def _total_requests() -> int:
+        return 0
+
+# Phase-level timing for the Full Auto loop. The launcher marks where each phase
+# starts; a phase ends when the next one starts (or at finish()). Every cycle
+# appends one line {ts, total_sec, requests, phases: {name: {sec, requests}}} to
+# a JSONL time series, which is trimmed to the last CYCLE_PROFILE_WINDOW cycles.
+
+_LOCK = threading.RLock()
+_RECENT: deque | None = None
+
+
+def enabled() -> bool:
+    return bool(getattr(_cfg, "CYCLE_PROFILE_ENABLE", True))
+
+
+def _window() -> int:
+    try:
+        return max(1, int(getattr(_cfg, "CYCLE_PROFILE_WINDOW", 50)))
+    except Exception:
+        return 50
+
+
+def _path() -> Path:
+    return Path(str(getattr(_cfg, "CYCLE_PROFILE_PATH", "database/cycle_profile.jsonl")))
+
+
+class CycleProfile:
+    """Spans for one cycle: call phase(name) at each phase start, finish() at the end."""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self._req0 = _total_requests()
+        self.phases: dict[str, dict] = {}
+        self._open: tuple[str, float, int] | None = None
+
+    def phase(self, name: str) -> None:
+        self.stop()
+        self._open = (str(name), time.perf_counter(), _total_requests())
+
+    def stop(self) -> None:
+        if self._open is None:
+            return
+        name, t0, req0 = self._open
+        self._open = None
+        entry = self.phases.setdefault(name, {"sec": 0.0, "requests": 0})
+        entry["sec"] = round(entry["sec"] + (time.perf_counter() - t0), 3)
+        entry["requests"] += max(0, _total_requests() - req0)
+
+    def finish(self) -> dict:
+        self.stop()
+        record = {
+            "ts": int(self.started),
+            "total_sec": round(time.perf_counter() - self._t0, 3),
+            "requests": max(0, _total_requests() - self._req0),
+            "phases": self.phases,
+        }
+        if enabled():
+            _append(record)
+        return record
+
+
+class _NullProfile(CycleProfile):
+    def phase(self, name: str) -> None:
+        pass
+
+    def finish(self) -> dict:
+        return {}
+
+
+def start_cycle() -> CycleProfile:
+    return CycleProfile() if enabled() else _NullProfile()
+
+
+def _load_recent() -> deque:
+    """Last N records, read from disk once per process and kept in memory afterwards."""
+    global _RECENT
+    if _RECENT is None:
+        _RECENT = deque(maxlen=_window())
+        try:
+            p = _path()
+            if p.exists():
+                for line in p.read_text(encoding="utf-8").splitlines():
+                    try:
+                        _RECENT.append(json.loads(line))
+                    except Exception:
+                        continue
+        except Exception:
+            pass
+    return _RECENT
+
+
+def _append(record: dict) -> None:
+    with _LOCK:
+        recent = _load_recent()
+        recent.append(record)
+        p = _path()
+        try:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            with p.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            # Trim the file back to the window once it holds twice as many lines
+            with p.open("r", encoding="utf-8") as fh:
+                n_lines = sum(1 for _ in fh)
+            if n_lines > 2 * _window():
+                tmp = p.with_suffix(p.suffix + ".tmp")
+                tmp.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in recent), encoding="utf-8")
+                tmp.replace(p)
+        except Exception:
+            pass
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def phase_percentiles(last_n: int | None = None) -> dict[str, dict]:
+    """Per phase over the last N cycles: p50/p95 seconds, mean requests and how many cycles ran it."""
+    with _LOCK:
+        records = list(_load_recent())
+    if last_n:
+        records = records[-int(last_n):]
+    samples: dict[str, list[tuple[float, int]]] = {}
+    for rec in records:
+        for name, ph in (rec.get("phases") or {}).items():
+            try:
+                samples.setdefault(name, []).append((float(ph.get("sec", 0.0)), int(ph.get("requests", 0))))
+            except Exception:
+                continue
+    out: dict[str, dict] = {}
+    for name, vals in samples.items():
+        secs = [s for s, _ in vals]
+        out[name] = {
+            "cycles": len(vals),
+            "p50_sec": round(_percentile(secs, 50), 3),
+            "p95_sec": round(_percentile(secs, 95), 3),
+            "requests_avg": round(sum(r for _, r in vals) / len(vals), 1),
+        }
+    return out
+
+
+def render_phase_lines(last_n: int | None = None) -> list[str]:
+    """Cycle report lines, slowest phase (by p95) first."""
+    if not enabled():
+        return []
+    stats = phase_percentiles(last_n)
+    if not stats:
+        return []
+    n = max(v["cycles"] for v in stats.values())
+    lines = [f"- Phases (p50 / p95 over last {n} cycle(s)):"]
+    for name, v in sorted(stats.items(), key=lambda kv: -kv[1]["p95_sec"]):
+        lines.append(
+            f"    • {name}: {v['p50_sec']:.1f}s / {v['p95_sec']:.1f}s, ~{v['requests_avg']:.0f} req"
+        )
+    return lines
@@ -0,0 +1,144 @@
+from __future__ import annotations
+import random
+from dataclasses import dataclass
+from datetime import datetime, time as dtime, timedelta
+from typing import Any, Optional
+
+from core import clock
+
+# Full Auto pacing rules shared by the launcher loop and the time-warp replay
+# (tools/timewarp.py): quiet windows, the daily runtime limiter and the wait
+# between cycles. Everything reads the active clock (core.clock), so a replay
+# under a VirtualClock makes the same decisions as a live run.
+
+
+def today_str(now: Optional[datetime] = None) -> str:
+    return (now or clock.datetime_now()).strftime("%Y-%m-%d")
+
+
+def minutes_until_tomorrow(now: Optional[datetime] = None) -> int:
+    now = now or clock.datetime_now()
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=5, microsecond=0)
+    return int((tomorrow - now).total_seconds() // 60)
+
+
+def parse_quiet_windows(raw) -> list[tuple[dtime, dtime]]:
+    """["00:30-06:15", ...] → [(time(0, 30), time(6, 15)), ...]; malformed entries are skipped."""
+    out = []
+    for w in raw or []:
+        try:
+            a, b = [p.strip() for p in str(w).split('-')]
+            h1, m1 = [int(x) for x in a.split(':')]
+            h2, m2 = [int(x) for x in b.split(':')]
+            out.append((dtime(h1, m1), dtime(h2, m2)))
+        except Exception:
+            continue
+    return out
+
+
+def in_quiet_window(now: datetime, windows: list[tuple[dtime, dtime]]) -> timedelta | None:
+    """Time left in the quiet window containing `now` (windows may wrap past midnight)."""
+    for (s, e) in windows:
+        start = now.replace(hour=s.hour, minute=s.minute, second=0, microsecond=0)
+        end = now.replace(hour=e.hour, minute=e.minute, second=0, microsecond=0)
+        if end <= start:
+            end += timedelta(days=1)
+        if start <= now < end:
+            return end - now
+    return None
+
+
+def quiet_wait_seconds(cfg: Any, now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds to sleep when `now` is inside a QUIET_WINDOWS entry (plus resume jitter), else None."""
+    windows = parse_quiet_windows(getattr(cfg, "QUIET_WINDOWS", []) or [])
+    remaining = in_quiet_window(now or clock.datetime_now(), windows) if windows else None
+    if not remaining:
+        return None
+    jitter_min = float(getattr(cfg, "QUIET_WINDOW_RESUME_JITTER_MIN", 60.0))
+    jitter_max = float(getattr(cfg, "QUIET_WINDOW_RESUME_JITTER_MAX", 240.0))
+    if jitter_max < jitter_min:
+        jitter_max = jitter_min
+    try:
+        extra = random.uniform(jitter_min, jitter_max) if jitter_max > 0 else 0.0
+    except Exception:
+        extra = 0.0
+    return max(0.0, remaining.total_seconds() + extra)
+
+
+def compute_limiter_params(cfg: Any) -> tuple[int, int, int, tuple[int, int]]:
+    """(total minutes allowed today, blocks, block size, (rest min, rest max)) from the limiter settings."""
+    base_total = max(0, int(getattr(cfg, "DAILY_MAX_RUNTIME_MINUTES", 600)))
+    variance = float(getattr(cfg, "DAILY_VARIANCE_PCT", 0.0))
+    if variance > 0:
+        delta = int(base_total * random.uniform(-variance, variance))
+    else:
+        delta = 0
+    total = max(0, base_total + delta)
+    blocks = max(1, int(getattr(cfg, "DAILY_BLOCKS", 3)))
+    # Random block size if configured
+    bmin = int(getattr(cfg, "BLOCK_SIZE_MIN", 0))
+    bmax = int(getattr(cfg, "BLOCK_SIZE_MAX", 0))
+    if bmax > 0 and bmax >= bmin > 0:
+        block_size = random.randint(bmin, bmax)
+    else:
+        block_size = max(1, total // blocks)
+    # Random rest between blocks if configured
+    rmin = int(getattr(cfg, "REST_MIN_MINUTES", 0))
+    rmax = int(getattr(cfg, "REST_MAX_MINUTES", 0))
+    rest_between_blocks = (rmin, rmax) if (rmax >= rmin > 0) else (0, 0)
+    return total, blocks, block_size, rest_between_blocks
+
+
+@dataclass(slots=True)
+class LimiterStep:
+    """Outcome of booking one cycle against the daily budget."""
+    state: dict
+    rest_minutes: int = 0           # rest after a completed block (0 = none)
+    block_done: int = 0             # 1-based number of the block that just completed
+    cap_reached: bool = False
+
+
+def limiter_account(state: dict, elapsed_minutes: int, total_allowed: int, blocks: int,
+                    block_size: int, rest_between_blocks) -> LimiterStep:
+    """Add a cycle's minutes to today's runtime state and decide on block rests / the daily cap."""
+    if state.get("date") != today_str():
+        state = {"date": today_str(), "minutes_used": 0, "total_allowed": int(total_allowed), "block_size": int(block_size)}
+    else:
+        state = dict(state)
+    before = int(state.get("minutes_used", 0))
+    state["minutes_used"] = before + int(elapsed_minutes)
+    step = LimiterStep(state)
+
+    prev_block = before // block_size
+    new_block = state["minutes_used"] // block_size
+    if new_block > prev_block and new_block < blocks:
+        rest_len = 0
+        try:
+            rest_min, rest_max = rest_between_blocks
+            if rest_max >= rest_min and rest_max > 0:
+                rest_len = int(random.randint(int(rest_min), int(rest_max)))
+        except TypeError:
+            if isinstance(rest_between_blocks, int) and rest_between_blocks > 0:
+                rest_len = int(rest_between_blocks)
+        if rest_len > 0:
+            step.rest_minutes = rest_len
+            step.block_done = prev_block + 1
+    step.cap_reached = state["minutes_used"] >= total_allowed
+    return step
+
+
+def cycle_wait_minutes(cfg: Any) -> tuple[int, int]:
+    """(minutes until the next regular cycle, coffee-break minutes included in it)."""
+    jitter_max = int(getattr(cfg, "JITTER_MINUTES", 10))
+    jitter = random.randint(-jitter_max, jitter_max)
+    total = int(getattr(cfg, "WAIT_BETWEEN_CYCLES_MINUTES", 10)) + jitter
+    extra = 0
+    # Occasional coffee break for human-like idle time
+    try:
+        if random.random() < float(getattr(cfg, 'OP_COFFEE_BREAK_PROB', 0.1)):
+            extra = random.randint(int(getattr(cfg, 'OP_COFFEE_BREAK_MIN_MINUTES', 2)),
+                                   int(getattr(cfg, 'OP_COFFEE_BREAK_MAX_MINUTES', 6)))
+            total += extra
+    except Exception:
+        extra = 0
+    return total, extra
@@ -5,9 +5,11 @@ import json
 import glob
 from datetime import datetime
 from core.paths import UNOCCUPIED_OASES_DIR  # We'll set this properly in paths.py
+from core.spatial_index import travian_distance
 
 def calculate_distance(x1, y1, x2, y2):
-    return ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
+    """Distance between two tiles, honouring map wrap-around."""
+    return travian_distance(x1, y1, x2, y2)
 
 def load_latest_unoccupied_oases(village_coords):
     """Load the latest unoccupied oases file for a given village coordinates.
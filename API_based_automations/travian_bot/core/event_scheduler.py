@@ -0,0 +1,190 @@
+from __future__ import annotations
+import heapq
+import itertools
+import json
+import threading
+from pathlib import Path
+
+from core import clock
+
+try:
+    from config.config import settings as _cfg
+except Exception:
+    class _CfgFallback:
+        SCHEDULER_ENABLE = True
+        SCHEDULER_MIN_WAKE_SEC = 15.0
+        SCHEDULER_EVENT_GRACE_SEC = 5.0
+        SCHEDULER_POLL_SEC = 10.0
+        OASIS_EVENT_DRIVEN_WAIT_ENABLE = True
+        LEARNING_ENABLE = True
+        PROCESS_RALLY_RETURNS = True
+    _cfg = _CfgFallback()
+
+# Next-due events for the Full Auto loop. Every subsystem keeps one pending
+# deadline under its own key ("oasis", "rally_return", "hero_return",
+# "build:<village id>"); scheduling a key again replaces its deadline. The loop
+# sleeps until the earliest one (or the regular cycle wait, whichever is first).
+
+_OASIS_DUE_PATH = Path("database/runtime_next_oasis_due.json")
+_PENDING_RALLY_PATH = Path("database/learning/pending_rally.json")
+_HERO_ETA_PATH = Path("database/hero_mission_eta.json")
+
+
+class EventScheduler:
+    """Min-heap of (due_epoch, key) with one live deadline per key (stale entries are skipped lazily)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._heap: list[tuple[float, int, str]] = []
+        self._live: dict[str, tuple[float, int]] = {}
+        self._seq = itertools.count()
+
+    def schedule(self, key: str, due_epoch: float) -> None:
+        with self._lock:
+            seq = next(self._seq)
+            self._live[str(key)] = (float(due_epoch), seq)
+            heapq.heappush(self._heap, (float(due_epoch), seq, str(key)))
+
+    def cancel(self, key: str) -> None:
+        with self._lock:
+            self._live.pop(str(key), None)
+
+    def _drop_stale(self) -> None:
+        """Pop heap entries whose key was rescheduled or cancelled. Caller holds _lock."""
+        while self._heap:
+            due, seq, key = self._heap[0]
+            if self._live.get(key) == (due, seq):
+                return
+            heapq.heappop(self._heap)
+
+    def peek(self) -> tuple[float, str] | None:
+        """Earliest live (due_epoch, key) without removing it."""
+        with self._lock:
+            self._drop_stale()
+            if not self._heap:
+                return None
+            due, _seq, key = self._heap[0]
+            return due, key
+
+    def pop_due(self, now: float | None = None) -> list[tuple[float, str]]:
+        """Remove and return every event due at or before `now`, earliest first."""
+        now = clock.now() if now is None else now
+        out: list[tuple[float, str]] = []
+        with self._lock:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    return out
+                due, _seq, key = heapq.heappop(self._heap)
+                self._live.pop(key, None)
+                out.append((due, key))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._live)
+
+
+_SCHEDULER = EventScheduler()
+
+
+def enabled() -> bool:
+    return bool(getattr(_cfg, "SCHEDULER_ENABLE", True))
+
+
+def schedule(key: str, due_epoch: float) -> None:
+    """Register (or move) the next deadline of a subsystem on the process-wide scheduler."""
+    _SCHEDULER.schedule(key, due_epoch)
+
+
+def cancel(key: str) -> None:
+    _SCHEDULER.cancel(key)
+
+
+def _read_json(path: Path):
+    try:
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        pass
+    return None
+
+
+def _epoch_field(data, name: str) -> float | None:
+    try:
+        value = float(data.get(name) or 0) if isinstance(data, dict) else 0.0
+    except Exception:
+        value = 0.0
+    return value or None
+
+
+def _schedule_or_cancel(key: str, due: float | None, now: float) -> None:
+    if due is not None and due > now:
+        _SCHEDULER.schedule(key, due)
+    else:
+        _SCHEDULER.cancel(key)
+
+
+def refresh_from_disk(now: float | None = None) -> None:
+    """Re-read the deadlines other subsystems persist (they may run in threads or other processes)."""
+    now = clock.now() if now is None else now
+
+    oasis_due = None
+    if bool(getattr(_cfg, "OASIS_EVENT_DRIVEN_WAIT_ENABLE", True)):
+        oasis_due = _epoch_field(_read_json(_OASIS_DUE_PATH), "next_due_epoch")
+    _schedule_or_cancel("oasis", oasis_due, now)
+
+    rally_due = None
+    if bool(getattr(_cfg, "LEARNING_ENABLE", True)) and bool(getattr(_cfg, "PROCESS_RALLY_RETURNS", True)):
+        entries = _read_json(_PENDING_RALLY_PATH)
+        etas = []
+        for e in entries if isinstance(entries, list) else []:
+            # Wake when the raid turns around: returns are only matchable while on the way back
+            try:
+                eta = float(e.get("expected_return_epoch") or 0) - float(e.get("travel_time_sec") or 0)
+            except Exception:
+                continue
+            if eta > now:
+                etas.append(eta)
+        rally_due = min(etas) if etas else None
+    _schedule_or_cancel("rally_return", rally_due, now)
+
+    _schedule_or_cancel("hero_return", _epoch_field(_read_json(_HERO_ETA_PATH), "return_epoch"), now)
+
+
+def next_event(now: float | None = None) -> tuple[float, str] | None:
+    """Earliest future event; events already due were handled by the cycle that just ran."""
+    _SCHEDULER.pop_due(now)
+    return _SCHEDULER.peek()
+
+
+def plan_wait(base_wait_sec: float, now: float | None = None) -> tuple[int, tuple[float, str] | None]:
+    """Seconds to sleep before the next cycle and the event that decided it (None = periodic tick).
+
+    The regular cycle wait stays as a fallback tick; an earlier event shortens it
+    (plus a small grace so the game state has settled), never below SCHEDULER_MIN_WAKE_SEC.
+    """
+    now = clock.now() if now is None else now
+    base = max(0, int(base_wait_sec))
+    if not enabled():
+        return base, None
+    try:
+        refresh_from_disk(now)
+    except Exception:
+        pass
+    ev = next_event(now)
+    if ev is None:
+        return base, None
+    grace = float(getattr(_cfg, "SCHEDULER_EVENT_GRACE_SEC", 5.0) or 0.0)
+    min_wake = float(getattr(_cfg, "SCHEDULER_MIN_WAKE_SEC", 15.0) or 0.0)
+    wait = int(max(min_wake, ev[0] - now + grace))
+    if wait >= base:
+        return base, None
+    return wait, ev
+
+
+def describe(event: tuple[float, str] | None, now: float | None = None) -> str:
+    if event is None:
+        return ""
+    now = clock.now() if now is None else now
+    mm, ss = divmod(max(0, int(event[0] - now)), 60)
+    return f"next {event[1]} in {mm:02d}:{ss:02d}"
@@ -0,0 +1,209 @@
+from __future__ import annotations
+import importlib
+import sys
+import threading
+import time
+from typing import Any, Optional
+
+# Lazy feature registry for the launcher. Menu options and Full Auto features
+# are bound to LazyFeature proxies; a feature's module (and whatever bs4, yaml,
+# tqdm, pyautogui/PIL it pulls in) is imported on first call, not at startup.
+# A feature whose module is missing only fails when it is actually used.
+#
+# `launcher.py --import-profile` installs an import timer before anything else
+# loads and prints a `-X importtime` style breakdown: once at the first menu
+# prompt (cold start) and once more on exit with the features loaded on demand.
+
+FEATURES: dict[str, str] = {
+    # login / api
+    "login": "identity_handling.login:login",
+    "travian_api": "core.travian_api:TravianAPI",
+    "load_villages_from_identity": "identity_handling.identity_helper:load_villages_from_identity",
+    "get_account_tribe_id": "identity_handling.identity_helper:get_account_tribe_id",
+    # farm lists / oasis raids
+    "run_one_farm_list_burst": "raid_list_main:run_one_farm_list_burst",
+    "run_raid_planner": "oasis_raiding_from_scan_list_main:run_raid_planner",
+    "run_farmlists_for_villages": "features.farm_lists.farm_list_runner:run_farmlists_for_villages",
+    "run_empty_oasis_raids": "features.raiding.empty_oasis_raider:run_empty_oasis_raids",
+    "reset_saved_raid_plan": "features.raiding.reset_raid_plan:reset_saved_raid_plan",
+    # hero
+    "run_hero_operations": "features.hero.hero_operations:run_hero_operations",
+    "print_hero_status_summary": "features.hero.hero_operations:print_hero_status_summary",
+    "run_hero_raiding_thread": "features.hero.hero_raiding_thread:run_hero_raiding_thread",
+    "run_hero_adventure_thread": "features.hero.hero_adventure_thread:run_hero_adventure_thread",
+    "maybe_start_adventure": "features.hero.hero_adventure:maybe_start_adventure",
+    "hero_manager": "core.hero_manager:HeroManager",
+    # rally tracker / tasks / detector
+    "get_pending_count": "core.rally_tracker:get_pending_count",
+    "process_pending_returns": "core.rally_tracker:process_pending_returns",
+    "collect_rewards_for_all_villages": "features.tasks.progressive_tasks:collect_rewards_for_all_villages",
+    "count_collectible_rewards": "features.tasks.progressive_tasks:count_collectible_rewards",
+    "run_attack_detector_thread": "features.defense.attack_detector:run_attack_detector_thread",
+    # building / logistics
+    "run_new_village_preset_if_new": "features.build.new_village_preset:run_new_village_preset_if_new",
+    "run_resource_balancer_cycle": "features.build.resource_balancer:run_resource_balancer_cycle",
+    "resource_balancer_profile_path": "features.build.resource_balancer:PROFILE_CONFIG_PATH",
+    "run_resource_router_cycle": "features.logistics.resource_router:run_resource_router_cycle",
+}
+
+_LOCK = threading.RLock()
+_PROXIES: dict[str, "LazyFeature"] = {}
+_LOADED: list[tuple[str, float, int]] = []       # (feature, ms, modules imported), in load order
+
+
+class LazyFeature:
+    """Callable stand-in for a registered function or class; imports its module on first use."""
+
+    __slots__ = ("name", "target", "_obj")
+
+    def __init__(self, name: str, target: str) -> None:
+        self.name = name
+        self.target = target
+        self._obj: Any = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._obj is not None
+
+    def resolve(self) -> Any:
+        obj = self._obj
+        if obj is not None:
+            return obj
+        with _LOCK:
+            if self._obj is None:
+                module_name, _, attr = self.target.partition(":")
+                before = len(sys.modules)
+                t0 = time.perf_counter()
+                module = importlib.import_module(module_name)
+                obj = getattr(module, attr) if attr else module
+                _LOADED.append((self.name, (time.perf_counter() - t0) * 1000.0, len(sys.modules) - before))
+                self._obj = obj
+            return self._obj
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "lazy"
+        return f"<LazyFeature {self.name} -> {self.target} ({state})>"
+
+
+def lazy(name: str) -> LazyFeature:
+    """Proxy for a FEATURES entry (one shared proxy per name)."""
+    with _LOCK:
+        proxy = _PROXIES.get(name)
+        if proxy is None:
+            if name not in FEATURES:
+                raise KeyError(f"Unknown feature: {name}")
+            proxy = _PROXIES[name] = LazyFeature(name, FEATURES[name])
+        return proxy
+
+
+def load(name: str) -> Any:
+    """Import a feature now and return the real object (e.g. a constant rather than a callable)."""
+    return lazy(name).resolve()
+
+
+def loaded_features() -> list[tuple[str, float, int]]:
+    with _LOCK:
+        return list(_LOADED)
+
+
+# --- import profile -------------------------------------------------------
+
+class _TimedLoader:
+    """Wraps a loader for one exec_module call; the module keeps the real loader."""
+
+    def __init__(self, profiler: "_ImportProfiler", loader: Any) -> None:
+        self._profiler = profiler
+        self._loader = loader
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: Any) -> Any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        self._profiler.run(module.__name__, self._loader.exec_module, module)
+
+
+class _ImportProfiler:
+    """Meta-path hook recording self/cumulative import time per module, like `python -X importtime`."""
+
+    def __init__(self) -> None:
+        self.records: list[tuple[str, int, int, int]] = []    # (module, self us, cumulative us, depth)
+        self._local = threading.local()
+
+    def find_spec(self, fullname: str, path: Any = None, target: Any = None) -> Any:
+        for finder in list(sys.meta_path):
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(self, spec.loader)
+            return spec
+        return None
+
+    def run(self, name: str, exec_module: Any, module: Any) -> None:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [0.0]                   # time spent in nested imports
+        stack.append(frame)
+        t0 = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            total = time.perf_counter() - t0
+            stack.pop()
+            if stack:
+                stack[-1][0] += total
+            self.records.append((name, int((total - frame[0]) * 1e6), int(total * 1e6), len(stack)))
+
+
+_PROFILER: Optional[_ImportProfiler] = None
+_PROFILE_T0 = 0.0
+_PROFILE_MARK = 0
+_FEATURE_MARK = 0
+
+
+def enable_import_profile() -> None:
+    """Start timing every import from here on (call before the imports to measure)."""
+    global _PROFILER, _PROFILE_T0
+    if _PROFILER is None:
+        _PROFILER = _ImportProfiler()
+        _PROFILE_T0 = time.perf_counter()
+        sys.meta_path.insert(0, _PROFILER)
+
+
+def import_profile_enabled() -> bool:
+    return _PROFILER is not None
+
+
+def print_import_profile(title: str, top: int = 25) -> None:
+    """Imports since the previous call: the `top` slowest by cumulative time, then totals."""
+    global _PROFILE_MARK, _FEATURE_MARK
+    if _PROFILER is None:
+        return
+    records = _PROFILER.records[_PROFILE_MARK:]
+    _PROFILE_MARK += len(records)
+    elapsed_ms = (time.perf_counter() - _PROFILE_T0) * 1000.0
+    roots = [r for r in records if r[3] == 0]
+    print(f"\n===== IMPORT PROFILE: {title} ({elapsed_ms:.0f} ms since start) =====")
+    print(f"{len(records)} modules, {sum(r[2] for r in roots) / 1000.0:.1f} ms importing")
+    if records:
+        print("import time: self [us] | cumulative | imported package")
+        for name, self_us, cum_us, depth in sorted(records, key=lambda r: r[2], reverse=True)[:top]:
+            print(f"import time: {self_us:>9} | {cum_us:>10} | {'  ' * depth}{name}")
+    feats = loaded_features()[_FEATURE_MARK:]
+    _FEATURE_MARK += len(feats)
+    if feats:
+        print("Features loaded on demand:")
+        for name, ms, modules in feats:
+            print(f"- {name}: {ms:.1f} ms ({modules} new modules)")
@@ -27,8 +27,25 @@ except ImportError:  # pragma: no cover - optional dependency
         def __iter__(self):
             return iter(self._iterable or [])
 
+import glob
+import os
+import time
+
 from bs4 import BeautifulSoup
 from core.database_json_scan_utils import save_json_scan
+from core.map_grid_store import MapGridStore, grid_path_for, load_scan
+from core.paths import FULL_MAP_SCANS_DIR
+from core.spatial_index import travian_distance
+
+try:
+    from config.config import settings as _cfg
+except Exception:
+    class _CfgFallback:
+        MAP_RESCAN_OASIS_MAX_AGE_SEC = 6 * 3600
+        MAP_RESCAN_VILLAGE_MAX_AGE_SEC = 24 * 3600
+        MAP_RESCAN_VALLEY_MAX_AGE_SEC = 7 * 24 * 3600
+        MAP_RESCAN_OTHER_MAX_AGE_SEC = 7 * 24 * 3600
+    _cfg = _CfgFallback()
 
 def parse_tile_html(html):
     soup = BeautifulSoup(html, "html.parser")
@@ -58,7 +75,12 @@ def parse_tile_html(html):
 
     return tile_info
 
-def scan_map_area(api_client, x_start, x_end, y_start, y_end):
+def scan_map_area(api_client, x_start, x_end, y_start, y_end, store=None):
+    """Fetch every tile in the rectangle.
+
+    Results go into ``store`` (a MapGridStore) when given, otherwise into a
+    ``{"x_y": tile_info}`` dict that is returned.
+    """
     scanned_data = {}
     total_tiles = (x_end - x_start + 1) * (y_end - y_start + 1)
 
@@ -68,7 +90,10 @@ def scan_map_area(api_client, x_start, x_end, y_start, y_end):
                 try:
                     html = api_client.get_tile_html(x, y)
                     tile_info = parse_tile_html(html)
-                    scanned_data[f"{x}_{y}"] = tile_info
+                    if store is not None:
+                        store.set_tile(x, y, tile_info)
+                    else:
+                        scanned_data[f"{x}_{y}"] = tile_info
                 except Exception as e:
                     print(f"❌ Error scanning ({x},{y}): {e}")
                 finally:
@@ -80,30 +105,150 @@ def scan_map_area(api_client, x_start, x_end, y_start, y_end):
 
     return scanned_data
 
+def _scan_coords(api_client, coords, store):
+    """Fetch the given tiles (in order) into ``store``; returns the number fetched."""
+    fetched = 0
+    with tqdm(total=len(coords), desc="🗺️  Rescan Progress", unit="tile") as pbar:
+        for x, y in coords:
+            try:
+                html = api_client.get_tile_html(x, y)
+                store.set_tile(x, y, parse_tile_html(html))
+                fetched += 1
+            except Exception as e:
+                print(f"❌ Error scanning ({x},{y}): {e}")
+            finally:
+                pbar.update(1)
+    return fetched
+
+
+def _save_scan(store, village_x, village_y):
+    village_coords_folder = f"({village_x}_{village_y})"
+
+    # JSON export stays the primary path for existing consumers; the .grid
+    # sibling is the compact, memory-mappable copy used by the analysis code.
+    scan_save_path = save_json_scan(
+        data=store.to_json_dict(),
+        filename="full_map_scan.json",
+        with_timestamp=True,
+        subfolder="full_map_scans",
+        coords_folder=village_coords_folder,
+        return_path=True
+    )
+    try:
+        store.save(grid_path_for(scan_save_path))
+    except Exception as exc:
+        logging.getLogger(__name__).warning(f"Could not write grid store for {scan_save_path}: {exc}")
+
+    return scan_save_path
+
+
+def _refresh_class(info):
+    """Bucket a stored tile into a refresh class: oasis, village, valley or other."""
+    if not info:
+        return None
+    title = (info.get("raw_title") or "").lower()
+    tile_type = info.get("type")
+    if "oasis" in title:
+        return "oasis"
+    if tile_type == "village":
+        return "village"
+    if tile_type == "oasis":  # parse_tile_html labels abandoned valleys as "oasis"
+        return "valley"
+    if tile_type in (None, "unknown"):
+        return None
+    return "other"
+
+
+def default_refresh_ages() -> dict:
+    """Max age in seconds per refresh class (oases change often, valleys rarely)."""
+    return {
+        "oasis": float(getattr(_cfg, "MAP_RESCAN_OASIS_MAX_AGE_SEC", 6 * 3600)),
+        "village": float(getattr(_cfg, "MAP_RESCAN_VILLAGE_MAX_AGE_SEC", 24 * 3600)),
+        "valley": float(getattr(_cfg, "MAP_RESCAN_VALLEY_MAX_AGE_SEC", 7 * 24 * 3600)),
+        "other": float(getattr(_cfg, "MAP_RESCAN_OTHER_MAX_AGE_SEC", 7 * 24 * 3600)),
+    }
+
+
+# Fetch order among expired tiles: unknown first, then the classes that matter for raiding
+_REFRESH_PRIORITY = {None: 0, "oasis": 1, "village": 2, "valley": 3, "other": 4}
+
+
+def latest_scan_path(village_x, village_y):
+    """Newest full_map_scan_*.json for a village (the .grid sibling is preferred on load)."""
+    folder = os.path.join(FULL_MAP_SCANS_DIR, f"({village_x}_{village_y})")
+    files = glob.glob(os.path.join(folder, "full_map_scan_*.json"))
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def plan_incremental_rescan(previous, village_x, village_y, scan_radius, refresh_ages=None, now=None):
+    """Build the merged store and the list of tiles that need a refetch.
+
+    Tiles from ``previous`` inside the new area are copied with their original
+    scan time; a tile is due when it is missing, unknown, or older than the max
+    age of its class. Due tiles are ordered by class priority, then distance.
+    """
+    ages = dict(default_refresh_ages())
+    ages.update(refresh_ages or {})
+    now = float(now if now is not None else time.time())
+    metadata = {
+        "description": "Full map scan centered around village",
+        "center_coordinates": f"({village_x},{village_y})",
+        "scan_radius": scan_radius,
+        "scanned_at": int(now),
+    }
+    store = MapGridStore.around(village_x, village_y, scan_radius, metadata)
+    due = []
+    for x in range(village_x - scan_radius, village_x + scan_radius + 1):
+        for y in range(village_y - scan_radius, village_y + scan_radius + 1):
+            info = previous.get_tile(x, y) if previous is not None else None
+            cls = _refresh_class(info)
+            if info is not None:
+                ts = previous.scanned_at(x, y)
+                store.set_tile(x, y, info, ts=ts)
+                if cls is not None and (now - ts) <= ages.get(cls, 0):
+                    continue
+            due.append((_REFRESH_PRIORITY.get(cls, 0), travian_distance(village_x, village_y, x, y), x, y))
+    due.sort()
+    return store, [(x, y) for _, _, x, y in due]
+
+
+def incremental_map_scan(api_client, village_x, village_y, scan_radius=25, refresh_ages=None):
+    """Rescan only tiles whose stored copy is missing or older than its refresh age.
+
+    Falls back to a full scan when no previous scan exists for the village.
+    Returns the path of the merged scan export.
+    """
+    previous_path = latest_scan_path(village_x, village_y)
+    if not previous_path:
+        print("[i] No previous scan found; running a full scan.")
+        return full_map_scan(api_client, village_x, village_y, scan_radius)
+
+    previous = load_scan(previous_path)
+    try:
+        store, due = plan_incremental_rescan(previous, village_x, village_y, scan_radius, refresh_ages)
+    finally:
+        previous.close()
+
+    total = (2 * scan_radius + 1) ** 2
+    print(f"[i] Incremental rescan: {len(due)}/{total} tiles expired; reusing the rest from {os.path.basename(previous_path)}.")
+    if due:
+        _scan_coords(api_client, due, store)
+    return _save_scan(store, village_x, village_y)
+
+
 def full_map_scan(api_client, village_x, village_y, scan_radius=25):
     x_start = village_x - scan_radius
     x_end = village_x + scan_radius
     y_start = village_y - scan_radius
     y_end = village_y + scan_radius
 
-    scanned_tiles = scan_map_area(api_client, x_start, x_end, y_start, y_end)
-
     metadata = {
         "description": "Full map scan centered around village",
         "center_coordinates": f"({village_x},{village_y})",
         "scan_radius": scan_radius,
-        "total_tiles": len(scanned_tiles),
+        "scanned_at": int(time.time()),
     }
+    store = MapGridStore.around(village_x, village_y, scan_radius, metadata)
+    scan_map_area(api_client, x_start, x_end, y_start, y_end, store=store)
 
-    village_coords_folder = f"({village_x}_{village_y})"
-
-    scan_save_path = save_json_scan(
-        data={"metadata": metadata, "tiles": scanned_tiles},
-        filename="full_map_scan.json",
-        with_timestamp=True,
-        subfolder="full_map_scans",
-        coords_folder=village_coords_folder,
-        return_path=True
-    )
-
-    return scan_save_path
+    return _save_scan(store, village_x, village_y)
@@ -1,6 +1,5 @@
 import re
 from bs4 import BeautifulSoup
-import os
 from .hero_runner import try_send_hero_to_oasis
 import logging
 import json
@@ -41,18 +40,8 @@ class HeroManager:
     def _is_known_village(self, village_id: str) -> bool:
         """Check if village_id exists in identity.json."""
         try:
-            current_dir = os.path.dirname(__file__)
-            database_dir = os.path.join(current_dir, '..', 'database')
-            identity_path = os.path.join(database_dir, 'identity.json')
-            identity_path = os.path.abspath(identity_path)
-
-            with open(identity_path, "r", encoding="utf-8") as f:
-                identity = json.load(f)
-            for server in identity.get("travian_identity", {}).get("servers", []):
-                for village in server.get("villages", []):
-                    if str(village.get("village_id")) == str(village_id):
-                        return True
-            return False
+            from identity_handling.identity_helper import is_known_village
+            return is_known_village(village_id)
         except Exception as e:
             logging.error(f"Failed to check village in identity: {e}")
             return False
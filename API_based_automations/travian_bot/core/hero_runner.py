@@ -8,6 +8,7 @@ except Exception:
     settings = _F(); settings.HERO_ATTACK_ESTIMATE = 0; settings.ESCORT_SAFETY_FACTOR = 1.0
 
 from core.combat_stats import get_unit_attack, estimate_escort_units
+from core import combat_sim
 from identity_handling.identity_helper import get_account_tribe_id
 
 def try_send_hero_to_oasis(api, village, oasis, min_power=50, max_power=2000, help=True):
@@ -152,7 +153,43 @@ def try_send_hero_to_oasis(api, village, oasis, min_power=50, max_power=2000, he
             escort_unit = code
             break
 
-    if help:
+    # Battle estimate over all (hero + n × unit) compositions the village can field
+    sim_choice = None
+    use_sim = help and combat_sim.enabled() and bool(oasis_info.get("animals"))
+    if use_sim and combat_sim.oasis_defence(oasis_info["animals"]) is None:
+        logging.info(
+            f"[HeroRaider] Unknown animals {oasis_info['animals']} — no battle estimate, using attack/power sizing."
+        )
+        use_sim = False
+    if use_sim:
+        try:
+            candidates = combat_sim.single_unit_candidates(
+                available_by_t, tribe_id, priority,
+                max_units=int(getattr(settings, "ESCORT_MAX_UNITS", 50)),
+                hero_attack=float(hero_atk or 0),
+                hero_mounted=bool(getattr(settings, "ESCORT_HERO_MOUNTED", False)),
+            )
+            sim_choice = combat_sim.cheapest_winning(oasis_info["animals"], candidates, tribe_id)
+        except Exception as e:
+            logging.debug(f"[HeroRaider] Combat estimate failed, using attack/power sizing: {e}")
+            sim_choice = None
+        if sim_choice is None:
+            logging.info(
+                f"[HeroRaider] ❌ Hero raid skipped — geen escort wint binnen verliesgrens "
+                f"{float(getattr(settings, 'ESCORT_MAX_LOSS_PCT', 0.15)) * 100:.0f}%. — Distance: {distance}, Power: {power}"
+            )
+            return False
+
+    if help and sim_choice is not None:
+        comp, outcome = sim_choice
+        escort_unit, escort_count = next(iter(comp.units.items()), (None, 0))
+        recommended = escort_count
+        logging.info(
+            f"[HeroRaider] Escort planning (sim): tribe={tribe_id} hero_atk≈{hero_atk} animals={oasis_info['animals']} "
+            f"⇒ {escort_unit or 'hero only'}={escort_count}, upkeep={comp.upkeep}, "
+            f"expected loss {outcome.attacker_loss_pct * 100:.1f}%"
+        )
+    elif help:
         if not escort_unit:
             logging.info(
                 f"[HeroRaider] ❌ Hero raid skipped — geen escort beschikbaar (all zero). — Distance: {distance}, Power: {power}"
@@ -191,7 +228,7 @@ def try_send_hero_to_oasis(api, village, oasis, min_power=50, max_power=2000, he
 
     logging.info(f"🚀 Sending hero to oasis at ({oasis['x']},{oasis['y']}) — Power: {power}, Distance: {distance}")
     raid_setup = {}
-    if help:
+    if help and escort_unit:
         raid_setup = {escort_unit: int(escort_count), "t11": 1}
         logging.info(
             f"[HeroRaider] Sending hero + escort: {escort_unit}={escort_count} "
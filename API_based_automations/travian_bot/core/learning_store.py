@@ -1,18 +1,348 @@
 # core/learning_store.py
 from __future__ import annotations
-import json, time
+import atexit, bisect, calendar, functools, json, logging, queue, sqlite3, threading, time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
 
+from core import clock
+
+try:
+    from config.config import settings as _cfg
+except Exception:
+    class _CfgFallback:
+        LEARNING_STORE_BACKEND = "sqlite"
+        LEARNING_WRITER_BATCH_SEC = 0.5
+        LEARNING_HISTORY_MAX_PER_KEY = 50
+    _cfg = _CfgFallback()
+
+
+_DUE_SUBSETS_MAX = 8                # key sets with their own due index (one per village is typical)
+
+
+def _imported_marker(path: Path) -> Path:
+    """Name a JSON store gets once the SQLite backend has imported it."""
+    return path.with_name(path.name + ".imported")
+
+
+class _JsonBackend:
+    """Legacy persistence: the whole store is rewritten as one JSON file per mutation."""
+
+    def __init__(self, path: Path, legacy_path: Path) -> None:
+        self.path = path
+        self.legacy_path = legacy_path
+        self._migrated_from_legacy = False
+
+    def load(self) -> dict:
+        try:
+            if self.path.exists():
+                return json.loads(self.path.read_text(encoding="utf-8")) or {}
+            # Legacy migration path: load old file if present
+            if self.legacy_path.exists():
+                self._migrated_from_legacy = True
+                return json.loads(self.legacy_path.read_text(encoding="utf-8")) or {}
+            if _imported_marker(self.path).exists():
+                logging.warning(
+                    f"[LearningStore] {self.path.name} was imported into the SQLite store; "
+                    f"the JSON backend starts empty (set LEARNING_STORE_BACKEND: sqlite to keep the learned data)."
+                )
+        except Exception:
+            pass
+        return {}
+
+    def save(self, data: dict, key: str | None = None, attempt: dict | None = None) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+        # After successful save to new path, remove legacy file to avoid confusion
+        try:
+            if self._migrated_from_legacy and self.legacy_path.exists():
+                self.legacy_path.unlink()
+                self._migrated_from_legacy = False
+        except Exception:
+            pass
+
+    def save_rows(self, rows: list, attempts: list, snapshot) -> None:
+        """Batched commit from the writer thread; the JSON file can only be rewritten whole."""
+        self.save(snapshot())
+
+
+class _SqliteBackend:
+    """SQLite (WAL) persistence: one row per target plus a capped per-target attempt history.
+
+    A mutation only rewrites the row of the touched target, so the cost of a save
+    no longer grows with the number of known targets. On first use the existing
+    JSON store (or the legacy oasis_stats.json) is imported once and renamed to
+    `<name>.imported`.
+    """
+
+    def __init__(self, db_path: Path, json_path: Path, legacy_path: Path) -> None:
+        self.db_path = db_path
+        self.json_path = json_path
+        self.legacy_path = legacy_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS targets (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                ts TEXT,
+                unit TEXT,
+                recommended INTEGER,
+                sent INTEGER,
+                result TEXT,
+                loss_pct REAL,
+                loot_total INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_history_key ON history(key, id);
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self._conn.commit()
+        self._import_json_once()
+
+    def _import_json_once(self) -> None:
+        """Seed the database from the JSON store the first time it is opened."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'json_imported'").fetchone()
+            if row is not None:
+                return
+            source = None
+            for candidate in (self.json_path, self.legacy_path):
+                if candidate.exists():
+                    source = candidate
+                    break
+            data: dict = {}
+            if source is not None:
+                try:
+                    data = json.loads(source.read_text(encoding="utf-8")) or {}
+                except Exception as exc:
+                    logging.warning(f"[LearningStore] Could not import {source}: {exc}")
+                    data = {}
+            now = time.time()
+            rows = [
+                (str(k), json.dumps(v, ensure_ascii=False), now)
+                for k, v in (data.items() if isinstance(data, dict) else [])
+                if isinstance(v, dict)
+            ]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO targets (key, data, updated) VALUES (?, ?, ?)", rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('json_imported', ?)",
+                (str(source) if source is not None else "",),
+            )
+            self._conn.commit()
+            if rows:
+                logging.info(f"[LearningStore] Imported {len(rows)} target(s) from {source} into {self.db_path.name}.")
+            # Rename the source so the JSON backend never picks up this frozen copy as live data
+            if source is not None:
+                try:
+                    source.replace(_imported_marker(source))
+                except Exception as exc:
+                    logging.warning(f"[LearningStore] Could not rename imported {source}: {exc}")
+
+    def load(self) -> dict:
+        out: dict = {}
+        with self._lock:
+            for key, blob in self._conn.execute("SELECT key, data FROM targets"):
+                try:
+                    out[key] = json.loads(blob)
+                except Exception:
+                    continue
+        return out
+
+    def save(self, data: dict, key: str | None = None, attempt: dict | None = None) -> None:
+        if key is None:
+            rows = [(str(k), json.dumps(v, ensure_ascii=False)) for k, v in data.items()]
+        else:
+            rows = [(str(key), json.dumps(data.get(key, {}), ensure_ascii=False))]
+        self.save_rows(rows, [(str(key), attempt)] if key is not None and attempt else [])
+
+    def save_rows(self, rows: list, attempts: list, snapshot=None) -> None:
+        """Upsert (key, json) rows and append (key, attempt) history (pruned per key) in one transaction."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO targets (key, data, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+                [(k, blob, now) for k, blob in rows],
+            )
+            keep = int(getattr(_cfg, "LEARNING_HISTORY_MAX_PER_KEY", 50) or 0)
+            if attempts and keep > 0:
+                self._conn.executemany(
+                    "INSERT INTO history (key, ts, unit, recommended, sent, result, loss_pct, loot_total) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            str(key),
+                            attempt.get("ts"),
+                            attempt.get("unit"),
+                            attempt.get("recommended"),
+                            attempt.get("sent"),
+                            attempt.get("result"),
+                            attempt.get("loss_pct"),
+                            attempt.get("loot_total"),
+                        )
+                        for key, attempt in attempts
+                    ],
+                )
+                # Keep the newest `keep` rows per touched target
+                self._conn.executemany(
+                    "DELETE FROM history WHERE key = ? AND id <= "
+                    "(SELECT id FROM history WHERE key = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    [(k, k, keep) for k in {str(key) for key, _ in attempts}],
+                )
+            self._conn.commit()
+
+    def close(self) -> None:
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception:
+            pass
+
+
+class _StoreWriter:
+    """Single writer thread: drains queued row snapshots and commits them in batches.
+
+    Mutations are applied to the in-memory data by the caller (under the store
+    lock) and only the disk write is queued, so callers never wait on I/O and
+    rows touched several times within a batch window are written once.
+    """
+
+    def __init__(self, store: "LearningStore", batch_sec: float) -> None:
+        self._store = store
+        self._batch_sec = max(0.0, float(batch_sec))
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="learning-store-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: str | None, blob: str | None, attempt: dict | None) -> None:
+        self._queue.put((key, blob, dict(attempt) if attempt else None))
+
+    def flush(self) -> None:
+        """Block until everything queued so far is on disk."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._batch_sec
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit(batch)
+            except Exception as exc:
+                logging.warning(f"[LearningStore] Batched write of {len(batch)} change(s) failed: {exc}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _commit(self, batch: list) -> None:
+        rows: dict[str, str] = {}
+        attempts: list[tuple[str, dict]] = []
+        full = False
+        for key, blob, attempt in batch:
+            if key is None:
+                full = True
+                continue
+            rows[key] = blob
+            if attempt:
+                attempts.append((key, attempt))
+        store = self._store
+        if full:
+            with store._lock:
+                rows.update({str(k): json.dumps(v, ensure_ascii=False) for k, v in store.data.items()})
+        store._backend.save_rows(list(rows.items()), attempts, store.snapshot)
+
+
+def _locked(fn):
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return fn(self, *args, **kwargs)
+    return wrapper
+
+
 class LearningStore:
-    def __init__(self, path: str = "database/learning/raid_targets_stats.json") -> None:
+    _shared: "LearningStore | None" = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str = "database/learning/raid_targets_stats.json", backend: str | None = None,
+                 writer: bool = False) -> None:
         # Use a generic filename; migrate seamlessly from legacy if present
         self.path = Path(path)
         self.legacy_path = Path("database/learning/oasis_stats.json")
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self.data = {}
-        self._migrated_from_legacy = False
+        if backend is None:
+            backend = str(getattr(_cfg, "LEARNING_STORE_BACKEND", "sqlite") or "sqlite")
+        self.backend_name = backend.strip().lower()
+        self._backend = self._open_backend(self.backend_name)
+        # Due-time index: sorted (eligible_epoch, key), built by configure_due_index()
+        self._due_params: tuple[float, float] | None = None
+        self._due_sorted: list[tuple[float, str]] = []
+        self._due_at: dict[str, float] = {}
+        # Per key-set copies of the index for next_due_at(keys=...), kept in step by _reindex_due
+        self._due_subsets: "OrderedDict[frozenset, list[tuple[float, str]]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._writer: _StoreWriter | None = None
         self._load()
+        if writer:
+            self._writer = _StoreWriter(self, float(getattr(_cfg, "LEARNING_WRITER_BATCH_SEC", 0.5) or 0.0))
+
+    @classmethod
+    def shared(cls) -> "LearningStore":
+        """Process-wide store used by the main loop and the hero thread (created on first use).
+
+        Every thread reads and mutates the same in-memory data, so no update is lost
+        to a stale copy; writes go to disk through one writer thread.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(writer=True)
+            return cls._shared
+
+    @classmethod
+    def flush_shared(cls) -> None:
+        with cls._shared_lock:
+            inst = cls._shared
+        if inst is not None:
+            inst.flush()
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    @_locked
+    def snapshot(self) -> dict:
+        """Deep copy of all targets, consistent with respect to concurrent mutations."""
+        return json.loads(json.dumps(self.data, ensure_ascii=False))
+
+    def _open_backend(self, name: str):
+        if name == "sqlite":
+            try:
+                return _SqliteBackend(self.path.with_suffix(".sqlite3"), self.path, self.legacy_path)
+            except Exception as exc:
+                logging.warning(f"[LearningStore] SQLite backend unavailable ({exc}); falling back to JSON.")
+                self.backend_name = "json"
+        return _JsonBackend(self.path, self.legacy_path)
 
     @staticmethod
     def _normalize_key(key: str | None) -> str | None:
@@ -45,35 +375,37 @@ class LearningStore:
 
     def _load(self) -> None:
         try:
-            if self.path.exists():
-                self.data = json.loads(self.path.read_text(encoding="utf-8"))
-                return
-            # Legacy migration path: load old file if present
-            if self.legacy_path.exists():
-                self.data = json.loads(self.legacy_path.read_text(encoding="utf-8"))
-                self._migrated_from_legacy = True
-                return
+            self.data = self._backend.load() or {}
         except Exception:
             self.data = {}
 
-    def _save(self) -> None:
-        tmp = self.path.with_suffix(".tmp")
-        tmp.write_text(json.dumps(self.data, indent=2, ensure_ascii=False), encoding="utf-8")
-        tmp.replace(self.path)
-        # After successful save to new path, remove legacy file to avoid confusion
-        try:
-            if self._migrated_from_legacy and self.legacy_path.exists():
-                self.legacy_path.unlink()
-                self._migrated_from_legacy = False
-        except Exception:
-            pass
+    def _save(self, key: str | None = None, attempt: dict | None = None) -> None:
+        """Persist the store; with a key only that target (and its new attempt) is written."""
+        with self._lock:
+            if key is None:
+                self._rebuild_due_index()
+            else:
+                self._reindex_due(key)
+            if self._writer is not None:
+                blob = json.dumps(self.data.get(key, {}), ensure_ascii=False) if key is not None else None
+                self._writer.submit(key, blob, attempt)
+                return
+            self._backend.save(self.data, key, attempt)
 
+    def close(self) -> None:
+        self.flush()
+        closer = getattr(self._backend, "close", None)
+        if callable(closer):
+            closer()
+
+    @_locked
     def get_multiplier(self, key: str) -> float:
         k = self._normalize_key(key) or key
         return float(self.data.get(k, {}).get("multiplier", 1.0))
 
+    @_locked
     def record_attempt(self, key: str, unit: str, recommended: int, sent: int, result: str, loss_pct: Optional[float] = None, haul: Optional[dict] = None) -> None:
-        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(clock.now()))
         k = self._normalize_key(key) or key
         s = self.data.setdefault(k, {"multiplier": 1.0, "attempts": 0, "successes": 0, "failures": 0})
         s["attempts"] = int(s.get("attempts", 0)) + 1
@@ -92,14 +424,15 @@ class LearningStore:
             s.pop("priority_until", None)
         # Append to short rolling history for baseline decisions
         hist = s.setdefault("history", [])
-        hist.append({
+        attempt = {
             "ts": now,
             "unit": unit,
             "recommended": recommended,
             "sent": sent,
             "result": result,
             "loss_pct": loss_pct,
-        })
+        }
+        hist.append(dict(attempt))
         # Cap history length
         try:
             max_len = 20
@@ -129,10 +462,12 @@ class LearningStore:
                 agg["crop"] = int(agg.get("crop", 0)) + tr
                 agg["total"] = int(agg.get("total", 0)) + tot
                 s["last_haul"] = {"ts": now, "wood": tw, "clay": tc, "iron": ti, "crop": tr, "total": tot}
+                attempt["loot_total"] = tot
             except Exception:
                 pass
-        self._save()
+        self._save(k, attempt)
 
+    @_locked
     def nudge_multiplier(self, key: str, direction: str, step: float = 0.1, min_mul: float = 0.8, max_mul: float = 2.5) -> float:
         k = self._normalize_key(key) or key
         s = self.data.setdefault(k, {"multiplier": 1.0})
@@ -142,28 +477,31 @@ class LearningStore:
         elif direction == "down":
             m = max(min_mul, m * (1.0 - step))
         s["multiplier"] = round(m, 3)
-        self._save()
+        self._save(k)
         return m
 
+    @_locked
     def set_pause(self, key: str, seconds: float) -> None:
         try:
             k = self._normalize_key(key) or key
             s = self.data.setdefault(k, {"multiplier": 1.0})
-            s["pause_until"] = float(time.time() + max(0.0, seconds))
-            self._save()
+            s["pause_until"] = float(clock.now() + max(0.0, seconds))
+            self._save(k)
         except Exception:
             pass
 
+    @_locked
     def clear_pause(self, key: str) -> None:
         try:
             k = self._normalize_key(key) or key
             entry = self.data.get(k)
             if isinstance(entry, dict) and "pause_until" in entry:
                 entry.pop("pause_until", None)
-                self._save()
+                self._save(k)
         except Exception:
             pass
 
+    @_locked
     def get_pause_until(self, key: str) -> Optional[float]:
         try:
             k = self._normalize_key(key) or key
@@ -172,25 +510,28 @@ class LearningStore:
         except Exception:
             return None
 
+    @_locked
     def set_priority(self, key: str, seconds: float) -> None:
         try:
             k = self._normalize_key(key) or key
             s = self.data.setdefault(k, {"multiplier": 1.0})
-            s["priority_until"] = float(time.time() + max(0.0, seconds))
-            self._save()
+            s["priority_until"] = float(clock.now() + max(0.0, seconds))
+            self._save(k)
         except Exception:
             pass
 
+    @_locked
     def clear_priority(self, key: str) -> None:
         try:
             k = self._normalize_key(key) or key
             entry = self.data.get(k)
             if isinstance(entry, dict) and "priority_until" in entry:
                 entry.pop("priority_until", None)
-                self._save()
+                self._save(k)
         except Exception:
             pass
 
+    @_locked
     def get_priority_until(self, key: str) -> Optional[float]:
         try:
             k = self._normalize_key(key) or key
@@ -199,6 +540,7 @@ class LearningStore:
         except Exception:
             return None
 
+    @_locked
     def get_baseline(self, key: str) -> dict:
         """Return a baseline snapshot for a raid target key '(x,y)'.
 
@@ -237,17 +579,19 @@ class LearningStore:
         return out
 
     # --- Scheduling helpers (optional) ---
+    @_locked
     def set_last_sent(self, key: str, ts: Optional[float] = None) -> None:
         try:
             k = self._normalize_key(key) or key
             if ts is None:
-                ts = time.time()
+                ts = clock.now()
             s = self.data.setdefault(k, {"multiplier": 1.0})
             s["last_sent_ts"] = float(ts)
-            self._save()
+            self._save(k)
         except Exception:
             pass
 
+    @_locked
     def get_last_sent(self, key: str) -> Optional[float]:
         try:
             k = self._normalize_key(key) or key
@@ -255,3 +599,96 @@ class LearningStore:
             return float(v) if v is not None else None
         except Exception:
             return None
+
+    # --- Due-time index ---
+    # Every mutation goes through _save(key), which moves that key in a sorted list
+    # of (eligible_epoch, key). The raider asks for due targets / the next due time
+    # instead of rebuilding baselines and re-parsing timestamps for every target.
+    @_locked
+    def configure_due_index(self, interval_sec: float, lost_cooldown_sec: float = 0.0) -> None:
+        """Enable (or re-parametrize) the index: eligible = max(last_sent + interval, pause end, loss cooldown end)."""
+        params = (float(interval_sec), float(lost_cooldown_sec))
+        if params != self._due_params:
+            self._due_params = params
+            self._rebuild_due_index()
+
+    def _eligible_epoch(self, entry: dict) -> float:
+        interval, lost_cooldown = self._due_params or (0.0, 0.0)
+        at = 0.0
+        try:
+            if entry.get("last_sent_ts") is not None:
+                at = float(entry["last_sent_ts"]) + interval
+            if entry.get("pause_until") is not None:
+                at = max(at, float(entry["pause_until"]))
+            if lost_cooldown > 0 and entry.get("last_result") == "lost" and isinstance(entry.get("last_ts"), str):
+                lost_at = calendar.timegm(time.strptime(entry["last_ts"], "%Y-%m-%dT%H:%M:%SZ"))
+                at = max(at, lost_at + lost_cooldown)
+        except Exception:
+            pass
+        return at
+
+    def _rebuild_due_index(self) -> None:
+        if self._due_params is None:
+            return
+        self._due_at = {
+            k: self._eligible_epoch(v) for k, v in self.data.items() if isinstance(v, dict)
+        }
+        self._due_sorted = sorted((at, k) for k, at in self._due_at.items())
+        self._due_subsets.clear()
+
+    def _reindex_due(self, key: str) -> None:
+        if self._due_params is None:
+            return
+        old = self._due_at.pop(key, None)
+        lists = [self._due_sorted] + [sub for ks, sub in self._due_subsets.items() if key in ks]
+        if old is not None:
+            for lst in lists:
+                i = bisect.bisect_left(lst, (old, key))
+                if i < len(lst) and lst[i] == (old, key):
+                    del lst[i]
+        entry = self.data.get(key)
+        if isinstance(entry, dict):
+            at = self._eligible_epoch(entry)
+            self._due_at[key] = at
+            for lst in lists:
+                bisect.insort(lst, (at, key))
+
+    @_locked
+    def get_due_at(self, key: str) -> Optional[float]:
+        """Epoch from which a target may be raided again; None when the store has never seen it (due now)."""
+        k = self._normalize_key(key) or key
+        return self._due_at.get(k)
+
+    @_locked
+    def due_targets(self, now: Optional[float] = None) -> list[str]:
+        """Known targets that are due at `now`, longest-overdue first."""
+        now = clock.now() if now is None else now
+        end = bisect.bisect_right(self._due_sorted, (now, "\uffff"))
+        return [k for _, k in self._due_sorted[:end]]
+
+    @_locked
+    def next_due_at(self, now: Optional[float] = None, keys=None) -> Optional[float]:
+        """Earliest eligible epoch after `now`, optionally among `keys` only.
+
+        With `keys`, a sorted copy of the index for that key set is built on first
+        use and updated with every mutation afterwards (the last _DUE_SUBSETS_MAX
+        sets are kept), so a repeated call is a hash of the set plus one bisect.
+        """
+        now = clock.now() if now is None else now
+        if keys is None:
+            lst = self._due_sorted
+        else:
+            ks = keys if isinstance(keys, frozenset) else frozenset(keys)
+            lst = self._due_subsets.get(ks)
+            if lst is None:
+                lst = sorted((self._due_at[k], k) for k in ks if k in self._due_at)
+                self._due_subsets[ks] = lst
+                while len(self._due_subsets) > _DUE_SUBSETS_MAX:
+                    self._due_subsets.popitem(last=False)
+            else:
+                self._due_subsets.move_to_end(ks)
+        start = bisect.bisect_right(lst, (now, "\uffff"))
+        return lst[start][0] if start < len(lst) else None
+
+
+atexit.register(LearningStore.flush_shared)
@@ -0,0 +1,324 @@
+# core/map_grid_store.py
+"""Columnar, array-backed store for full map scans.
+
+A scan of radius r holds (2r+1)² tiles. Keeping each tile as a dict keyed by an
+"x_y" string costs several hundred bytes per tile and a full JSON parse on every
+load. This store keeps one small-int column per attribute instead:
+
+- ``type``       uint8   → index into the interned type table
+- ``title``      uint16  → index into the interned title table (raw_title)
+- ``bonus``      uint16  → index into the interned bonus table
+- ``owner``      uint32  → index into the interned owner table
+- ``scanned_at`` uint32  → epoch seconds of the last fetch (0 = never scanned)
+
+Index 0 of every string table is reserved for ``None``. Tiles are addressed by
+``(x - x_min) * height + (y - y_min)`` so lookups are O(1).
+
+On disk a ``.grid`` file holds a magic, a small JSON header (bounds, string
+tables, metadata) and the raw columns. Loading memory-maps the file, so opening
+a 40k-tile scan only touches the pages that are actually read. The JSON
+``{"metadata": ..., "tiles": {...}}`` format stays available via
+``to_json_dict()`` / ``from_json_dict()`` for existing consumers.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Iterator, Optional
+
+GRID_SUFFIX = ".grid"
+_MAGIC = b"TVGRID01"
+_HEADER_LEN = struct.Struct("<I")
+
+# (column name, array typecode); order is the on-disk order
+_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("type", "B"),
+    ("title", "H"),
+    ("bonus", "H"),
+    ("owner", "I"),
+    ("scanned_at", "I"),
+)
+_STRING_COLUMNS = {"type": "type", "title": "raw_title", "bonus": "bonus", "owner": "owner"}
+_COLUMN_LIMITS = {"B": 0xFF, "H": 0xFFFF, "I": 0xFFFFFFFF}
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class MapGridStore:
+    """O(1) (x, y) → tile lookup over a rectangular scan area."""
+
+    def __init__(self, x_min: int, y_min: int, width: int, height: int, metadata: Optional[dict] = None) -> None:
+        self.x_min = int(x_min)
+        self.y_min = int(y_min)
+        self.width = max(0, int(width))
+        self.height = max(0, int(height))
+        self.metadata: dict = dict(metadata or {})
+        size = self.width * self.height
+        self._cols: dict = {name: array(code, bytes(array(code).itemsize * size)) for name, code in _COLUMNS}
+        self._tables: dict[str, list] = {name: [None] for name in _STRING_COLUMNS}
+        self._intern: dict[str, dict] = {name: {} for name in _STRING_COLUMNS}
+        # Rare extra tile keys (e.g. "scanned_from") that do not warrant a column
+        self._extras: dict[str, dict] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._fh = None
+
+    # --- construction -------------------------------------------------
+
+    @classmethod
+    def around(cls, center_x: int, center_y: int, radius: int, metadata: Optional[dict] = None) -> "MapGridStore":
+        r = max(0, int(radius))
+        return cls(int(center_x) - r, int(center_y) - r, 2 * r + 1, 2 * r + 1, metadata)
+
+    @classmethod
+    def from_json_dict(cls, data: dict) -> "MapGridStore":
+        """Build a store from the legacy ``{"metadata": ..., "tiles": {"x_y": {...}}}`` payload."""
+        parsed = []
+        for key, info in (data.get("tiles") or {}).items():
+            try:
+                xs, ys = str(key).split("_")
+                parsed.append((int(xs), int(ys), info))
+            except Exception:
+                continue
+        metadata = data.get("metadata") or {}
+        if not parsed:
+            return cls(0, 0, 0, 0, metadata)
+        xs = [p[0] for p in parsed]
+        ys = [p[1] for p in parsed]
+        store = cls(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1, metadata)
+        scanned_ts = int(metadata.get("scanned_at", 0) or 0)
+        for x, y, info in parsed:
+            if isinstance(info, dict):
+                store.set_tile(x, y, info, ts=scanned_ts or None)
+        return store
+
+    # --- addressing ---------------------------------------------------
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return self.x_min <= x < self.x_min + self.width and self.y_min <= y < self.y_min + self.height
+
+    def _index(self, x: int, y: int) -> int:
+        return (int(x) - self.x_min) * self.height + (int(y) - self.y_min)
+
+    def _intern_value(self, column: str, value) -> int:
+        if value is None:
+            return 0
+        value = str(value)
+        ids = self._intern[column]
+        idx = ids.get(value)
+        if idx is None:
+            table = self._tables[column]
+            idx = len(table)
+            code = dict(_COLUMNS)[column]
+            if idx > _COLUMN_LIMITS[code]:
+                raise OverflowError(f"MapGridStore: too many distinct values for column '{column}'")
+            table.append(value)
+            ids[value] = idx
+        return idx
+
+    def _ensure_writable(self) -> None:
+        """Copy memory-mapped columns into private arrays before the first write."""
+        if self._mmap is None:
+            return
+        mapped = self._cols
+        self._cols = {name: array(code, mapped[name]) for name, code in _COLUMNS}
+        self._release_mapping(mapped)
+
+    # --- tile access --------------------------------------------------
+
+    def set_tile(self, x: int, y: int, info: dict, ts: Optional[float] = None) -> None:
+        if not self.in_bounds(x, y):
+            raise IndexError(f"({x},{y}) outside grid bounds")
+        self._ensure_writable()
+        i = self._index(x, y)
+        for column, key in _STRING_COLUMNS.items():
+            self._cols[column][i] = self._intern_value(column, info.get(key))
+        self._cols["scanned_at"][i] = int(ts if ts is not None else time.time()) or 1
+        extra = {k: v for k, v in info.items() if k not in _STRING_COLUMNS.values()}
+        key = f"{int(x)}_{int(y)}"
+        if extra:
+            self._extras[key] = extra
+        else:
+            self._extras.pop(key, None)
+
+    def has_tile(self, x: int, y: int) -> bool:
+        return self.in_bounds(x, y) and self._cols["scanned_at"][self._index(x, y)] != 0
+
+    def __contains__(self, xy) -> bool:
+        return self.has_tile(*xy)
+
+    def get_tile(self, x: int, y: int) -> Optional[dict]:
+        """Return the tile in the legacy dict shape, or None when it was never scanned."""
+        if not self.has_tile(x, y):
+            return None
+        i = self._index(x, y)
+        info = {key: self._tables[column][self._cols[column][i]] for column, key in _STRING_COLUMNS.items()}
+        extra = self._extras.get(f"{int(x)}_{int(y)}")
+        if extra:
+            info.update(extra)
+        return info
+
+    def tile_type(self, x: int, y: int) -> Optional[str]:
+        if not self.in_bounds(x, y):
+            return None
+        return self._tables["type"][self._cols["type"][self._index(x, y)]]
+
+    def scanned_at(self, x: int, y: int) -> int:
+        """Epoch seconds of the last fetch of (x, y); 0 when never scanned."""
+        if not self.in_bounds(x, y):
+            return 0
+        return int(self._cols["scanned_at"][self._index(x, y)])
+
+    def iter_tiles(self) -> Iterator[tuple[int, int, dict]]:
+        scanned = self._cols["scanned_at"]
+        for i in range(self.width * self.height):
+            if scanned[i]:
+                x = self.x_min + i // self.height
+                y = self.y_min + i % self.height
+                yield x, y, self.get_tile(x, y)
+
+    def __len__(self) -> int:
+        scanned = self._cols["scanned_at"]
+        return sum(1 for i in range(self.width * self.height) if scanned[i])
+
+    # --- persistence --------------------------------------------------
+
+    def to_json_dict(self) -> dict:
+        tiles = {f"{x}_{y}": info for x, y, info in self.iter_tiles()}
+        metadata = dict(self.metadata)
+        metadata["total_tiles"] = len(tiles)
+        return {"metadata": metadata, "tiles": tiles}
+
+    def save(self, path: str | Path) -> Path:
+        """Write header + columns atomically to ``path`` (``.grid``)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = json.dumps({
+            "x_min": self.x_min,
+            "y_min": self.y_min,
+            "width": self.width,
+            "height": self.height,
+            "byteorder": sys.byteorder,
+            "columns": [[name, code] for name, code in _COLUMNS],
+            "tables": self._tables,
+            "extras": self._extras,
+            "metadata": self.metadata,
+        }, ensure_ascii=False).encode("utf-8")
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("wb") as fh:
+            prefix = _MAGIC + _HEADER_LEN.pack(len(header)) + header
+            fh.write(prefix)
+            fh.write(b"\0" * (_pad8(len(prefix)) - len(prefix)))
+            for name, _code in _COLUMNS:
+                raw = self._cols[name].tobytes()
+                fh.write(raw)
+                fh.write(b"\0" * (_pad8(len(raw)) - len(raw)))
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "MapGridStore":
+        """Memory-map a ``.grid`` file; columns are read lazily from the mapping."""
+        path = Path(path)
+        fh = path.open("rb")
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            fh.close()
+            raise
+        try:
+            if mm[:len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"{path} is not a map grid file")
+            (hlen,) = _HEADER_LEN.unpack_from(mm, len(_MAGIC))
+            hstart = len(_MAGIC) + _HEADER_LEN.size
+            header = json.loads(bytes(mm[hstart:hstart + hlen]).decode("utf-8"))
+            if header.get("byteorder", sys.byteorder) != sys.byteorder:
+                raise ValueError(f"{path} was written with a different byte order")
+            store = cls.__new__(cls)
+            store.x_min = int(header["x_min"])
+            store.y_min = int(header["y_min"])
+            store.width = int(header["width"])
+            store.height = int(header["height"])
+            store.metadata = header.get("metadata") or {}
+            store._tables = {name: list(header["tables"].get(name) or [None]) for name in _STRING_COLUMNS}
+            store._intern = {
+                name: {v: i for i, v in enumerate(table) if i and v is not None}
+                for name, table in store._tables.items()
+            }
+            store._extras = header.get("extras") or {}
+            size = store.width * store.height
+            offset = _pad8(hstart + hlen)
+            view = memoryview(mm)
+            cols = {}
+            for name, code in header["columns"]:
+                nbytes = array(code).itemsize * size
+                cols[name] = view[offset:offset + nbytes].cast(code)
+                offset += _pad8(nbytes)
+            store._cols = cols
+            store._mmap = mm
+            store._fh = fh
+            return store
+        except Exception:
+            mm.close()
+            fh.close()
+            raise
+
+    def _release_mapping(self, mapped: dict) -> None:
+        if self._mmap is None:
+            return
+        try:
+            for col in mapped.values():
+                if isinstance(col, memoryview):
+                    col.release()
+            self._mmap.close()
+        except Exception:
+            pass
+        try:
+            if self._fh is not None:
+                self._fh.close()
+        except Exception:
+            pass
+        self._mmap = None
+        self._fh = None
+
+    def close(self) -> None:
+        """Release the memory mapping (no-op for in-memory stores)."""
+        if self._mmap is None:
+            return
+        mapped = self._cols
+        self._cols = {name: array(code) for name, code in _COLUMNS}
+        self.width = self.height = 0
+        self._release_mapping(mapped)
+
+
+def grid_path_for(json_scan_path: str | Path) -> Path:
+    """The ``.grid`` sibling written next to a JSON scan export."""
+    return Path(json_scan_path).with_suffix(GRID_SUFFIX)
+
+
+def load_scan(scan_path: str | Path) -> MapGridStore:
+    """Open a scan by path, preferring the memory-mapped grid over the JSON export."""
+    scan_path = Path(scan_path)
+    grid = scan_path if scan_path.suffix == GRID_SUFFIX else grid_path_for(scan_path)
+    if grid.exists():
+        try:
+            return MapGridStore.load(grid)
+        except Exception:
+            pass
+    json_path = scan_path.with_suffix(".json")
+    with json_path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    # Older exports carry no scan time; the file's mtime is the best estimate
+    metadata = data.setdefault("metadata", {})
+    if not metadata.get("scanned_at"):
+        try:
+            metadata["scanned_at"] = int(json_path.stat().st_mtime)
+        except Exception:
+            pass
+    return MapGridStore.from_json_dict(data)
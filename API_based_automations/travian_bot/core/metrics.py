@@ -1,12 +1,34 @@
 from __future__ import annotations
+import atexit
 import json
+import threading
 import time
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from core import clock
+
+try:
+    from config.config import settings as _cfg
+except Exception:
+    class _CfgFallback:
+        METRICS_FLUSH_INTERVAL_SEC = 30.0
+        METRICS_JOURNAL_ENABLE = False
+    _cfg = _CfgFallback()
+
 _PATH = Path("database/metrics.json")
+_JOURNAL_PATH = Path("database/metrics.journal")
 _ACTIVITY_PATH = Path("database/activity.json")
 
+# Process-wide aggregator: counters live in memory and are flushed to _PATH on
+# snapshot_and_reset(), by a background timer and at interpreter exit.
+_LOCK = threading.RLock()
+_STATE: dict | None = None
+_DIRTY = False
+_FLUSHER: threading.Thread | None = None
+_JOURNAL_FH = None
+_SEQ = 0        # sequence number of the last recorded mutation; metrics.json stores it as "_seq"
+
 
 def _load() -> dict:
     try:
@@ -27,12 +49,153 @@ def _save(data: dict) -> None:
         pass
 
 
+def _journal_enabled() -> bool:
+    return bool(getattr(_cfg, "METRICS_JOURNAL_ENABLE", False))
+
+
+def _apply(d: dict, op: dict) -> None:
+    """Apply one mutation record to the metrics dict (shared by live calls and journal replay)."""
+    kind = op.get("op")
+    if kind == "inc":
+        ctrs = d.setdefault("counters", {})
+        ctrs[op["name"]] = int(ctrs.get(op["name"], 0)) + int(op.get("n", 1))
+    elif kind == "skip":
+        n = int(op.get("n", 1))
+        ctrs = d.setdefault("counters", {})
+        ctrs["raids_skipped"] = int(ctrs.get("raids_skipped", 0)) + n
+        reasons = d.setdefault("skip_reasons", {})
+        reasons[op["reason"]] = int(reasons.get(op["reason"], 0)) + n
+    elif kind == "change":
+        changes = d.setdefault("learning_changes", [])
+        changes.append(op["entry"])
+        # keep only last 100 changes
+        if len(changes) > 100:
+            d["learning_changes"] = changes[-100:]
+    elif kind == "hero":
+        d["hero_status"] = op.get("status")
+    elif kind == "reset":
+        d["counters"] = {}
+        d["skip_reasons"] = {}
+        d["learning_changes"] = []
+    d["_ts"] = op.get("ts", time.time())
+    if "seq" in op:
+        d["_seq"] = max(int(d.get("_seq", 0) or 0), int(op["seq"]))
+
+
+def _replay_journal(d: dict) -> None:
+    """Re-apply mutations journaled after the last flush (e.g. after a crash).
+
+    Entries whose sequence number is already covered by the saved "_seq" were
+    flushed before the crash (save done, truncate not) and are skipped.
+    """
+    try:
+        if not _JOURNAL_PATH.exists():
+            return
+        saved_seq = int(d.get("_seq", 0) or 0)
+        with _JOURNAL_PATH.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    op = json.loads(line)
+                    if "seq" in op and int(op["seq"]) <= saved_seq:
+                        continue
+                    _apply(d, op)
+                except Exception:
+                    # A torn last line from a crash is expected; skip it.
+                    continue
+    except Exception:
+        pass
+
+
+def _journal_append(op: dict) -> None:
+    global _JOURNAL_FH
+    try:
+        if _JOURNAL_FH is None:
+            _JOURNAL_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _JOURNAL_FH = _JOURNAL_PATH.open("a", encoding="utf-8")
+        _JOURNAL_FH.write(json.dumps(op, ensure_ascii=False) + "\n")
+        _JOURNAL_FH.flush()
+    except Exception:
+        pass
+
+
+def _journal_truncate() -> None:
+    global _JOURNAL_FH
+    try:
+        if _JOURNAL_FH is not None:
+            _JOURNAL_FH.close()
+            _JOURNAL_FH = None
+        if _JOURNAL_PATH.exists():
+            _JOURNAL_PATH.unlink()
+    except Exception:
+        pass
+
+
+def _state() -> dict:
+    """Return the in-memory metrics, loading (and replaying the journal) on first use. Caller holds _LOCK."""
+    global _STATE, _SEQ
+    if _STATE is None:
+        _STATE = _load()
+        if _JOURNAL_PATH.exists():
+            _replay_journal(_STATE)
+            _save(_STATE)
+            _journal_truncate()
+        _SEQ = max(_SEQ, int(_STATE.get("_seq", 0) or 0))
+        _start_flusher()
+    return _STATE
+
+
+def _record(op: dict) -> None:
+    global _DIRTY, _SEQ
+    op.setdefault("ts", time.time())
+    with _LOCK:
+        d = _state()
+        _SEQ += 1
+        op["seq"] = _SEQ
+        _apply(d, op)
+        _DIRTY = True
+        if _journal_enabled():
+            _journal_append(op)
+
+
+def flush() -> None:
+    """Write the in-memory metrics to disk if anything changed since the last flush."""
+    global _DIRTY
+    with _LOCK:
+        if _STATE is None or not _DIRTY:
+            return
+        _save(_STATE)
+        _DIRTY = False
+        _journal_truncate()
+
+
+def _flush_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        flush()
+
+
+def _start_flusher() -> None:
+    global _FLUSHER
+    if _FLUSHER is not None:
+        return
+    try:
+        interval = float(getattr(_cfg, "METRICS_FLUSH_INTERVAL_SEC", 30.0) or 0.0)
+    except Exception:
+        interval = 30.0
+    if interval <= 0:
+        return
+    _FLUSHER = threading.Thread(target=_flush_loop, args=(interval,), name="metrics-flush", daemon=True)
+    _FLUSHER.start()
+
+
+atexit.register(flush)
+
+
 def inc_counter(name: str, n: int = 1) -> None:
-    d = _load()
-    ctrs = d.setdefault("counters", {})
-    ctrs[name] = int(ctrs.get(name, 0)) + int(n)
-    d["_ts"] = time.time()
-    _save(d)
+    _record({"op": "inc", "name": name, "n": int(n)})
 
 
 def add_sent(n: int = 1) -> None:
@@ -40,57 +203,40 @@ def add_sent(n: int = 1) -> None:
 
 
 def add_skip(reason: str, n: int = 1) -> None:
-    d = _load()
-    ctrs = d.setdefault("counters", {})
-    ctrs["raids_skipped"] = int(ctrs.get("raids_skipped", 0)) + int(n)
-    reasons = d.setdefault("skip_reasons", {})
-    reasons[reason] = int(reasons.get(reason, 0)) + int(n)
-    d["_ts"] = time.time()
-    _save(d)
+    _record({"op": "skip", "reason": reason, "n": int(n)})
 
 
 def add_learning_change(oasis_key: str, old: float, new: float, direction: str, loss_pct: float | None = None) -> None:
-    d = _load()
-    changes = d.setdefault("learning_changes", [])
-    changes.append({
-        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    _record({"op": "change", "entry": {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(clock.now())),
         "oasis": oasis_key,
         "old": round(float(old), 3),
         "new": round(float(new), 3),
         "dir": direction,
         "loss_pct": None if loss_pct is None else round(float(loss_pct), 3),
-    })
-    # keep only last 100 changes
-    if len(changes) > 100:
-        d["learning_changes"] = changes[-100:]
-    d["_ts"] = time.time()
-    _save(d)
+    }})
 
 
 def set_hero_status_summary(status: dict) -> None:
-    d = _load()
-    d["hero_status"] = status
-    d["_ts"] = time.time()
-    _save(d)
+    _record({"op": "hero", "status": status})
 
 
 def snapshot_and_reset() -> dict:
     """Return current metrics snapshot and reset counters and changes.
     Leaves hero_status intact to show last known status.
     """
-    d = _load()
-    snap = {
-        "counters": d.get("counters", {}).copy(),
-        "skip_reasons": d.get("skip_reasons", {}).copy(),
-        "learning_changes": d.get("learning_changes", []).copy(),
-        "hero_status": d.get("hero_status", None),
-    }
-    # reset
-    d["counters"] = {}
-    d["skip_reasons"] = {}
-    d["learning_changes"] = []
-    d["_ts"] = time.time()
-    _save(d)
+    global _DIRTY
+    with _LOCK:
+        d = _state()
+        snap = {
+            "counters": dict(d.get("counters", {})),
+            "skip_reasons": dict(d.get("skip_reasons", {})),
+            "learning_changes": list(d.get("learning_changes", [])),
+            "hero_status": d.get("hero_status", None),
+        }
+        _apply(d, {"op": "reset", "ts": time.time()})
+        _DIRTY = True
+        flush()
     return snap
 
 
@@ -0,0 +1,99 @@
+from __future__ import annotations
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Sequence
+
+try:
+    from config.config import settings as _cfg
+except Exception:
+    class _CfgFallback:
+        PARSE_POOL_WORKERS = 0
+        PARSE_POOL_MIN_BATCH = 16
+        PARSE_POOL_CHUNK_SIZE = 8
+    _cfg = _CfgFallback()
+
+# CPU-bound HTML parsing (BeautifulSoup) for backlogs of pages, farmed out to a
+# process pool in chunks. Results come back in input order, so callers can zip
+# them with whatever they fetched. Small batches, a disabled pool or a broken
+# pool all fall back to parsing in the calling thread.
+#
+# The pool uses the "spawn" start method: the bot runs helper threads (hero,
+# flushers), and forking a process that holds their locks is not safe. Workers
+# are started once and reused; `fn` must be a module-level function.
+
+_LOCK = threading.Lock()
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS = 0
+
+
+def workers() -> int:
+    """Configured worker count; 0 = one less than the number of CPUs, 1 = always serial."""
+    try:
+        n = int(getattr(_cfg, "PARSE_POOL_WORKERS", 0))
+    except Exception:
+        n = 0
+    if n <= 0:
+        n = max(1, (os.cpu_count() or 1) - 1)
+    return n
+
+
+def _get_pool(n: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_WORKERS
+    with _LOCK:
+        if _POOL is None or _POOL_WORKERS != n:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context("spawn"))
+            _POOL_WORKERS = n
+        return _POOL
+
+
+def shutdown() -> None:
+    global _POOL
+    with _LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+atexit.register(shutdown)
+
+
+def _safe(fn: Callable[[Any], Any], item: Any) -> Any:
+    try:
+        return fn(item)
+    except Exception:
+        return None
+
+
+def _call(args: tuple[Callable[[Any], Any], Any]) -> Any:
+    fn, item = args
+    return _safe(fn, item)
+
+
+def parse_many(fn: Callable[[Any], Any], items: Sequence[Any], *, max_workers: int | None = None,
+               chunk_size: int | None = None, min_batch: int | None = None) -> list[Any]:
+    """[fn(item) for item in items], in order, using the process pool for large batches.
+
+    An item whose parse raises yields None, so one bad page never shifts or drops
+    the other results.
+    """
+    items = list(items)
+    n = workers() if max_workers is None else max(1, int(max_workers))
+    if min_batch is None:
+        min_batch = int(getattr(_cfg, "PARSE_POOL_MIN_BATCH", 16) or 0)
+    if n <= 1 or len(items) < max(2, min_batch):
+        return [_safe(fn, item) for item in items]
+    if chunk_size is None:
+        chunk_size = int(getattr(_cfg, "PARSE_POOL_CHUNK_SIZE", 8) or 1)
+    try:
+        pool = _get_pool(n)
+        return list(pool.map(_call, [(fn, item) for item in items], chunksize=max(1, chunk_size)))
+    except Exception as exc:
+        logging.debug(f"[ParsePool] Pool unavailable ({exc}); parsing {len(items)} page(s) serially.")
+        shutdown()
+        return [_safe(fn, item) for item in items]
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
+import bisect
 import json
 import logging
 import re
-import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from bs4 import BeautifulSoup
 
+from core import clock
 from core.learning_store import LearningStore
 from core.metrics import add_learning_change
 
@@ -28,11 +29,20 @@ LOG = logging.getLogger("travian")
 PENDING_FILE = Path("database/learning/pending_rally.json")
 
 
+# Parsed pending list, reused while the file is unchanged (keyed on mtime + size)
+_PENDING_CACHE: Dict[str, Any] = {"stamp": None, "entries": []}
+
+
 def _load_pending() -> List[Dict[str, Any]]:
     if not PENDING_FILE.exists():
         return []
     try:
-        return json.loads(PENDING_FILE.read_text(encoding="utf-8")) or []
+        st = PENDING_FILE.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        if _PENDING_CACHE["stamp"] != stamp:
+            _PENDING_CACHE["entries"] = json.loads(PENDING_FILE.read_text(encoding="utf-8")) or []
+            _PENDING_CACHE["stamp"] = stamp
+        return list(_PENDING_CACHE["entries"])
     except Exception:
         return []
 
@@ -42,6 +52,7 @@ def _save_pending(entries: List[Dict[str, Any]]) -> None:
     tmp = PENDING_FILE.with_suffix(".tmp")
     tmp.write_text(json.dumps(entries, indent=2, ensure_ascii=False), encoding="utf-8")
     tmp.replace(PENDING_FILE)
+    _PENDING_CACHE["stamp"] = None
 
 
 def enqueue_pending_raid(
@@ -71,7 +82,7 @@ def enqueue_pending_raid(
             if travel_time_sec is not None
             else None
         ),
-        "created": float(time.time()),
+        "created": float(clock.now()),
         "unit_code": "mixed",
         "source": source,
     }
@@ -141,7 +152,7 @@ def _schedule_immediate_retry(
     except Exception:
         priority_window = 300.0
 
-    now = time.time()
+    now = clock.now()
     try:
         offset = interval if interval > 0 else 60.0
         ls.set_last_sent(norm_target, ts=now - offset - 1.0)
@@ -344,7 +355,7 @@ def _fetch_rally_returns(api, village_id: int) -> Dict[str, Any]:
     soup = BeautifulSoup(html, "html.parser")
     server_epoch = _extract_server_epoch(soup)
     if server_epoch is None:
-        server_epoch = time.time()
+        server_epoch = clock.now()
     returns: List[RallyReturn] = []
     for table in soup.select("table.troop_details.inReturn"):
         entry = _parse_return_table(table, server_epoch)
@@ -357,8 +368,81 @@ def get_pending_count() -> int:
     return len(_load_pending())
 
 
+def _window_open_epoch(item: Dict[str, Any], tolerance: float) -> float:
+    """Earliest moment the raid can show up as a return (troops turned around at the target).
+
+    Entries without a travel time have no known window and are always checked.
+    """
+    try:
+        expected = float(item.get("expected_return_epoch") or 0)
+        travel = float(item.get("travel_time_sec") or 0)
+    except Exception:
+        return float("-inf")
+    if expected <= 0:
+        return float("-inf")
+    return expected - travel - tolerance
+
+
+def _index_pending(pendings: List[Dict[str, Any]], tolerance: float) -> Dict[int, List[tuple[float, int]]]:
+    """Positions of pending raids per village, sorted by the epoch their return window opens."""
+    index: Dict[int, List[tuple[float, int]]] = {}
+    for pos, item in enumerate(pendings):
+        try:
+            village_id = int(item.get("village_id", 0) or 0)
+        except Exception:
+            village_id = 0
+        index.setdefault(village_id, []).append((_window_open_epoch(item, tolerance), pos))
+    for entries in index.values():
+        entries.sort()
+    return index
+
+
+class _ReturnIndex:
+    """Unmatched rally returns of one village: per target, sorted by arrival epoch."""
+
+    def __init__(self, returns: List[RallyReturn]) -> None:
+        self.returns = returns
+        self._by_target: Dict[str, tuple[List[float], List[RallyReturn]]] = {}
+        for entry in sorted(returns, key=lambda r: r.arrival_epoch):
+            etas, entries = self._by_target.setdefault(entry.target, ([], []))
+            etas.append(float(entry.arrival_epoch))
+            entries.append(entry)
+
+    def candidates(self, target: Optional[str]) -> List[RallyReturn]:
+        if target:
+            return list(self._by_target.get(target, ([], []))[1])
+        return [r for r in self.returns if not getattr(r, "_matched", False)]
+
+    def nearest(self, target: str, expected: float, tolerance: float) -> Optional[RallyReturn]:
+        """Return arriving closest to the expected epoch (within tolerance), found by bisect."""
+        etas, entries = self._by_target.get(target, ([], []))
+        i = bisect.bisect_left(etas, expected)
+        best: Optional[int] = None
+        for j in (i - 1, i):
+            if 0 <= j < len(etas) and abs(etas[j] - expected) <= tolerance:
+                if best is None or abs(etas[j] - expected) < abs(etas[best] - expected):
+                    best = j
+        return entries[best] if best is not None else None
+
+    def consume(self, entry: RallyReturn) -> None:
+        entry._matched = True  # type: ignore[attr-defined]
+        bucket = self._by_target.get(entry.target)
+        if not bucket:
+            return
+        etas, entries = bucket
+        for j in range(bisect.bisect_left(etas, float(entry.arrival_epoch)), len(etas)):
+            if entries[j] is entry:
+                del etas[j]
+                del entries[j]
+                return
+
+
 def process_pending_returns(api, *, verbose: bool = False) -> int:
-    """Match pending raids against rally overview returns and update learning."""
+    """Match pending raids against rally overview returns and update learning.
+
+    Only villages with at least one raid whose return window has opened are
+    fetched, and only those raids are matched; the rest of the list is untouched.
+    """
     if not bool(getattr(settings, "LEARNING_ENABLE", True)):
         return 0
 
@@ -369,52 +453,59 @@ def process_pending_returns(api, *, verbose: bool = False) -> int:
     tolerance = float(getattr(settings, "RALLY_MATCH_TOLERANCE_SEC", 120.0))
     expiry = float(getattr(settings, "RALLY_RETURN_TIMEOUT_SEC", 900.0))
 
-    remaining: List[Dict[str, Any]] = []
+    now = clock.now()
+    done: set[int] = set()
     processed = 0
-    cache: Dict[int, Dict[str, Any]] = {}
-    ls = LearningStore()
+    ls: Optional[LearningStore] = None
 
-    for item in pendings:
-        village_id = int(item.get("village_id", 0) or 0)
+    for village_id, entries in _index_pending(pendings, tolerance).items():
         if village_id <= 0:
+            done.update(pos for _, pos in entries)  # unusable entry, drop it
             continue
-        if village_id not in cache:
-            try:
-                cache[village_id] = _fetch_rally_returns(api, village_id)
-            except Exception as exc:
-                LOG.warning(f"[RallyTracker] Failed to fetch rally overview for village {village_id}: {exc}")
-                cache[village_id] = {"server_epoch": time.time(), "returns": []}
-        data = cache.get(village_id) or {"server_epoch": time.time(), "returns": []}
-        server_epoch = float(data.get("server_epoch", time.time()))
-        returns = data.get("returns", [])
-        match = _match_pending(item, returns, tolerance, server_epoch)
-        if match:
-            processed += 1
-            info = _apply_learning(ls, item, match, verbose=verbose)
-            source = str(item.get("source") or (item.get("meta", {}) if isinstance(item.get("meta"), dict) else {}).get("source") or "oasis").lower()
-            if info.get("carry_full") and source == "oasis":
-                _schedule_immediate_retry(api, ls, match.target, village_id=village_id)
-            pause_until = info.get("pause_until")
-            if pause_until:
-                try:
-                    remain = max(0.0, float(pause_until) - time.time())
-                    logging.info(
-                        "[RallyTracker] Paused %s for %.1f minute(s) after losses.",
-                        match.target,
-                        remain / 60.0,
-                    )
-                except Exception:
-                    logging.info("[RallyTracker] Paused %s after losses.", match.target)
-            match._matched = True  # mark for future filtering
+        opened = bisect.bisect_right(entries, (now, len(pendings)))
+        if opened == 0:
             continue
-        expected = item.get("expected_return_epoch")
-        if expected and server_epoch >= float(expected) + expiry:
-            processed += 1
-            _handle_timeout(ls, item, verbose=verbose)
-            continue
-        remaining.append(item)
-
-    _save_pending(remaining)
+        try:
+            data = _fetch_rally_returns(api, village_id)
+        except Exception as exc:
+            LOG.warning(f"[RallyTracker] Failed to fetch rally overview for village {village_id}: {exc}")
+            data = {"server_epoch": clock.now(), "returns": []}
+        server_epoch = float(data.get("server_epoch", clock.now()))
+        returns = _ReturnIndex(data.get("returns", []))
+        if ls is None:
+            ls = LearningStore.shared()
+
+        for _, pos in entries[:opened]:
+            item = pendings[pos]
+            match = _match_pending(item, returns, tolerance, server_epoch)
+            if match:
+                processed += 1
+                done.add(pos)
+                returns.consume(match)
+                info = _apply_learning(ls, item, match, verbose=verbose)
+                source = str(item.get("source") or (item.get("meta", {}) if isinstance(item.get("meta"), dict) else {}).get("source") or "oasis").lower()
+                if info.get("carry_full") and source == "oasis":
+                    _schedule_immediate_retry(api, ls, match.target, village_id=village_id)
+                pause_until = info.get("pause_until")
+                if pause_until:
+                    try:
+                        remain = max(0.0, float(pause_until) - clock.now())
+                        logging.info(
+                            "[RallyTracker] Paused %s for %.1f minute(s) after losses.",
+                            match.target,
+                            remain / 60.0,
+                        )
+                    except Exception:
+                        logging.info("[RallyTracker] Paused %s after losses.", match.target)
+                continue
+            expected = item.get("expected_return_epoch")
+            if expected and server_epoch >= float(expected) + expiry:
+                processed += 1
+                done.add(pos)
+                _handle_timeout(ls, item, verbose=verbose)
+
+    if done:
+        _save_pending([item for pos, item in enumerate(pendings) if pos not in done])
     return processed
 
 
@@ -424,28 +515,24 @@ def _normalize_key(key: Optional[str]) -> Optional[str]:
 
 def _match_pending(
     item: Dict[str, Any],
-    returns: List[RallyReturn],
+    returns: "_ReturnIndex",
     tolerance: float,
     server_epoch: float,
 ) -> Optional[RallyReturn]:
     norm_target = _normalize_key(item.get("target"))
     expected = item.get("expected_return_epoch")
-    candidate: Optional[RallyReturn] = None
-    best_diff: Optional[float] = None
 
-    # Filter returns that are not already matched and share same target if available
-    candidates = []
-    for entry in returns:
-        if getattr(entry, "_matched", False):
-            continue
-        if norm_target and entry.target != norm_target:
-            continue
-        candidates.append(entry)
+    if expected and norm_target:
+        return returns.nearest(norm_target, float(expected), tolerance)
 
+    # Unmatched returns, restricted to the same target when known
+    candidates = returns.candidates(norm_target)
     if not candidates:
         return None
 
     if expected:
+        candidate: Optional[RallyReturn] = None
+        best_diff: Optional[float] = None
         for entry in candidates:
             diff = abs(float(entry.arrival_epoch) - float(expected))
             if best_diff is None or diff < best_diff:
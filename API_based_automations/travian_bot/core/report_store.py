@@ -0,0 +1,344 @@
+from __future__ import annotations
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any, Optional
+
+from bs4 import BeautifulSoup
+
+from core import parse_pool
+
+try:
+    from config.config import settings as _cfg
+except Exception:
+    class _CfgFallback:
+        REPORT_STORE_ENABLE = False
+        REPORT_STORE_PATH = "database/reports/reports.sqlite3"
+        REPORT_INGEST_MAX_PER_CYCLE = 20
+    _cfg = _CfgFallback()
+
+# Incremental report ingestion. Each cycle the report overview is listed, paging
+# back until the stored high-water mark is reached (at most _MAX_PAGES pages);
+# every report with an id above the mark is fetched exactly once, parsed into a
+# row (target coords, units sent/lost, bounty, time) and stored in SQLite with
+# an index on (x, y). Coordinate lookups are then local
+# queries instead of list + page + detail requests.
+#
+# Off by default: every fetched detail page costs a request and marks the
+# report read in the game. The first pass (no mark yet) only takes the newest
+# reports instead of the whole listed history.
+
+_MAX_PAGES = 10                         # overview pages listed per pass when catching up
+_MAX_FETCH_TRIES = 3                    # a report that keeps failing is skipped after this many passes
+_FETCH_FAILURES: dict[int, int] = {}
+
+_COORD_RE = re.compile(r"\(\s*(-?\d{1,3})\s*\|\s*(-?\d{1,3})\s*\)")
+_STRIP = dict.fromkeys(map(ord, "\u200e\u200f\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069"), None)
+_DASHES = ("\u2212", "\u2010", "\u2011", "\u2012", "\u2013", "\u2014")
+
+
+def enabled() -> bool:
+    return bool(getattr(_cfg, "REPORT_STORE_ENABLE", False))
+
+
+def _clean(text: str) -> str:
+    text = (text or "").translate(_STRIP)
+    for ch in _DASHES:
+        text = text.replace(ch, "-")
+    return text
+
+
+def report_id_of(href_or_id: str) -> tuple[Optional[str], Optional[int]]:
+    """('6401237|abcd', 6401237) from an overview href or a raw id; (None, None) if absent."""
+    raw = str(href_or_id or "")
+    rid = None
+    if "id=" in raw:
+        try:
+            rid = (urllib.parse.parse_qs(urllib.parse.urlsplit(raw).query).get("id") or [None])[0]
+        except Exception:
+            rid = None
+    elif raw:
+        rid = raw
+    if not rid:
+        return None, None
+    m = re.match(r"\s*(\d+)", rid)
+    return rid, (int(m.group(1)) if m else None)
+
+
+def _coords(node: Any) -> Optional[tuple[int, int]]:
+    if node is None:
+        return None
+    m = _COORD_RE.search(_clean(node.get_text(" ", strip=True) if hasattr(node, "get_text") else str(node)))
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def _int(text: str) -> int:
+    digits = re.sub(r"[^\d]", "", _clean(text))
+    return int(digits) if digits else 0
+
+
+def _unit_rows(section: Any) -> tuple[list[str], list[list[int]]]:
+    """Unit codes from the icon row and the count rows below it (sent, lost, ...)."""
+    codes: list[str] = []
+    rows: list[list[int]] = []
+    for body in section.find_all("tbody", class_=lambda c: c and "units" in c):
+        icons = body.find_all("img", class_=lambda c: c and "unit" in c)
+        if icons and not codes:
+            for img in icons:
+                code = next((cls for cls in img.get("class", []) if re.fullmatch(r"u(\d+|hero)", cls)), None)
+                codes.append(code or "")
+            continue
+        cells = body.find_all("td")
+        if cells:
+            rows.append([_int(td.get_text()) for td in cells])
+    return codes, rows
+
+
+def _bounty(section: Any) -> tuple[dict, bool]:
+    for node in section.find_all(["tbody", "div", "table"], class_=lambda c: c and ("goods" in c or "infos" in c)):
+        label = node.find("th")
+        label_txt = label.get_text(" ", strip=True).lower() if label else ""
+        values = [_int(v.get_text()) for v in node.select("span.value")]
+        if len(values) < 4 and any(w in label_txt for w in ("bounty", "buit", "beute", "butin")):
+            values = [int(n) for n in re.findall(r"\d{1,7}", _clean(node.get_text(" ")))]
+        if len(values) >= 4:
+            icon = node.find("i", class_=lambda c: c and "carry" in c)
+            carry_full = bool(icon and any(cls == "full" or cls.endswith("full") for cls in icon.get("class", [])))
+            wood, clay, iron, crop = values[:4]
+            return {"wood": wood, "clay": clay, "iron": iron, "crop": crop}, carry_full
+    return {}, False
+
+
+def parse_report_html(html: str) -> dict:
+    """Structured fields of an attack/raid report detail page (missing parts stay empty)."""
+    soup = BeautifulSoup(html or "", "html.parser")
+    attacker = soup.select_one(".role.attacker, #attacker, table.attacker") or soup
+    defender = soup.select_one(".role.defender, #defender, table.defender")
+    coords = _coords(defender) or _coords(soup.select_one(".troopHeadline, .subject, h1")) or _coords(soup)
+
+    codes, rows = _unit_rows(attacker)
+    sent: dict[str, int] = {}
+    lost: dict[str, int] = {}
+    for target, row in zip((sent, lost), rows[:2]):
+        for code, n in zip(codes, row):
+            if code and n > 0:
+                target[code] = n
+    bounty, carry_full = _bounty(attacker)
+
+    ts_node = soup.select_one("div.time .header.text, div.time, .dat")
+    return {
+        "x": coords[0] if coords else None,
+        "y": coords[1] if coords else None,
+        "time": _clean(ts_node.get_text(" ", strip=True)) if ts_node else None,
+        "sent": sent,
+        "lost": lost,
+        "sent_total": sum(n for c, n in sent.items() if c != "uhero"),
+        "lost_total": sum(n for c, n in lost.items() if c != "uhero"),
+        "bounty": bounty,
+        "bounty_total": sum(bounty.values()),
+        "carry_full": carry_full,
+    }
+
+
+def report_row(num: Optional[int], rid: Optional[str], href: str, parsed: dict) -> dict:
+    """A parsed report in the shape ReportStore returns rows (`ingested` is None: not stored)."""
+    row = {"num": num, "rid": rid, "id": rid, "href": href}
+    row.update(parsed)
+    row["carry_full"] = bool(row.get("carry_full"))
+    row["ingested"] = None
+    return row
+
+
+class ReportStore:
+    """Parsed reports in SQLite (WAL), keyed by the numeric report id, indexed by target coords."""
+
+    def __init__(self, db_path: Path) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS reports (
+                num INTEGER PRIMARY KEY,
+                rid TEXT,
+                href TEXT,
+                x INTEGER,
+                y INTEGER,
+                time TEXT,
+                sent TEXT,
+                lost TEXT,
+                sent_total INTEGER,
+                lost_total INTEGER,
+                bounty TEXT,
+                bounty_total INTEGER,
+                carry_full INTEGER,
+                ingested REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_reports_xy ON reports(x, y, num);
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self._conn.commit()
+
+    def high_water(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'high_water'").fetchone()
+        try:
+            return int(row[0]) if row else 0
+        except Exception:
+            return 0
+
+    def add(self, num: int, rid: str, href: str, parsed: dict) -> None:
+        """Store one parsed report and move the high-water mark up to its id."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports (num, rid, href, x, y, time, sent, lost, sent_total, lost_total, "
+                "bounty, bounty_total, carry_full, ingested) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    int(num), rid, href, parsed.get("x"), parsed.get("y"), parsed.get("time"),
+                    json.dumps(parsed.get("sent") or {}), json.dumps(parsed.get("lost") or {}),
+                    int(parsed.get("sent_total") or 0), int(parsed.get("lost_total") or 0),
+                    json.dumps(parsed.get("bounty") or {}), int(parsed.get("bounty_total") or 0),
+                    1 if parsed.get("carry_full") else 0, time.time(),
+                ),
+            )
+            self._conn.execute(
+                "INSERT INTO meta (name, value) VALUES ('high_water', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = MAX(CAST(value AS INTEGER), CAST(excluded.value AS INTEGER))",
+                (str(int(num)),),
+            )
+            self._conn.commit()
+
+    def advance(self, num: int) -> None:
+        """Move the high-water mark past a report without storing it."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (name, value) VALUES ('high_water', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = MAX(CAST(value AS INTEGER), CAST(excluded.value AS INTEGER))",
+                (str(int(num)),),
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _row(cur: sqlite3.Cursor, row: tuple) -> dict:
+        out = {d[0]: v for d, v in zip(cur.description, row)}
+        for k in ("sent", "lost", "bounty"):
+            try:
+                out[k] = json.loads(out.get(k) or "{}")
+            except Exception:
+                out[k] = {}
+        out["carry_full"] = bool(out.get("carry_full"))
+        out["id"] = out.get("rid")
+        return out
+
+    def for_coords(self, x: int, y: int, limit: int = 10) -> list[dict]:
+        """Newest reports about (x|y) first."""
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT * FROM reports WHERE x = ? AND y = ? ORDER BY num DESC LIMIT ?",
+                (int(x), int(y), int(limit)),
+            )
+            return [self._row(cur, r) for r in cur.fetchall()]
+
+    def latest_for(self, x: int, y: int) -> Optional[dict]:
+        rows = self.for_coords(x, y, limit=1)
+        return rows[0] if rows else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0])
+
+
+_STORE: Optional[ReportStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> ReportStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ReportStore(Path(str(getattr(_cfg, "REPORT_STORE_PATH", "database/reports/reports.sqlite3"))))
+        return _STORE
+
+
+def ingest(api, tab: int | None = 1, max_items: int = 50, max_fetch: int | None = None) -> int:
+    """List the overview and fetch/parse every report above the high-water mark.
+
+    Overview pages are listed newest first until one shows an id at or below the
+    mark, so a burst of reports larger than one page is not skipped. New reports
+    are taken oldest first, so a per-cycle cap (REPORT_INGEST_MAX_PER_CYCLE)
+    leaves the rest for the next pass without skipping any. On the first pass (no
+    mark yet) only the newest `max_fetch` reports are taken. If the mark is still
+    not reached after _MAX_PAGES pages, the reports in between are out of reach and
+    the gap is logged. A report whose detail page fails _MAX_FETCH_TRIES passes in
+    a row is skipped. Large batches are parsed on the process pool (core.parse_pool).
+    Returns how many were stored.
+    """
+    store = get_store()
+    hwm = store.high_water()
+    if max_fetch is None:
+        max_fetch = int(getattr(_cfg, "REPORT_INGEST_MAX_PER_CYCLE", 20) or 0)
+    fresh: dict[int, tuple[str, str]] = {}
+    reached = hwm <= 0
+    for page in range(1, _MAX_PAGES + 1):
+        added = 0
+        for href in api.list_report_links(tab=tab, max_items=max_items, page=page):
+            rid, num = report_id_of(href)
+            if not rid or num is None:
+                continue
+            if num <= hwm:
+                reached = True
+            elif num not in fresh:
+                fresh[num] = (rid, href)
+                added += 1
+        if reached and hwm > 0:
+            break
+        if not added or (hwm <= 0 and len(fresh) >= max_fetch):
+            break  # last page (or a server ignoring ?page), or enough for the first pass
+    else:
+        if not reached and fresh:
+            logging.warning(
+                f"[Reports] High-water mark {hwm} not reached within {_MAX_PAGES} overview pages; "
+                f"reports between {hwm} and {min(fresh)} are skipped."
+            )
+    # Network first (serial, humanized by the API), then one parse stage for the whole batch
+    todo = sorted(fresh)
+    todo = todo[-max_fetch:] if (hwm <= 0 and max_fetch > 0) else todo[: max(0, max_fetch)]
+    fetched: list[tuple[int, str, str, str]] = []
+    skipped: list[int] = []
+    for num in todo:
+        rid, href = fresh[num]
+        html = api.fetch_report_detail(href)
+        if not html:
+            tries = _FETCH_FAILURES.get(num, 0) + 1
+            if tries < _MAX_FETCH_TRIES:
+                _FETCH_FAILURES[num] = tries
+                break  # keep the mark below this id so it is retried next pass
+            _FETCH_FAILURES.pop(num, None)
+            logging.info(f"[Reports] Report {rid} failed {tries}× (deleted?); skipping it.")
+            skipped.append(num)
+            continue
+        _FETCH_FAILURES.pop(num, None)
+        fetched.append((num, rid, href, html))
+    parsed_all = parse_pool.parse_many(parse_report_html, [html for *_, html in fetched])
+    for (num, rid, href, _html), parsed in zip(fetched, parsed_all):
+        if parsed is None:
+            logging.debug(f"[Reports] Could not parse report {rid}; stored without details.")
+        store.add(num, rid, href, parsed or {})
+    for num in skipped:
+        store.advance(num)
+    return len(fetched)
+
+
+def latest_for(x: int, y: int) -> Optional[dict]:
+    return get_store().latest_for(x, y)
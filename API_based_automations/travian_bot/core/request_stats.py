@@ -0,0 +1,270 @@
+from __future__ import annotations
+import atexit
+import json
+import re
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+try:
+    from config.config import settings as _cfg
+except Exception:
+    class _CfgFallback:
+        REQUEST_STATS_ENABLE = True
+        REQUEST_STATS_EXPORT = "json"
+        REQUEST_STATS_PATH = "database/request_stats.json"
+        REQUEST_STATS_PROM_PATH = "database/request_stats.prom"
+        REQUEST_STATS_FLUSH_INTERVAL_SEC = 60.0
+    _cfg = _CfgFallback()
+
+# Per-endpoint request instrumentation. TravianAPI records every HTTP call here
+# with the network time (the real session.request call only) and the humanizer
+# think-time that preceded it, so a cycle can be split into network vs waiting.
+
+# Latency histogram upper bounds in seconds (Prometheus "le" buckets; +Inf implied)
+BUCKETS_SEC = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Query keys that select a different page on the same path (everything else is an id/token)
+_KEEP_QUERY = ("gid", "tt", "s", "t")
+_HISTORY_LEN = 120
+
+_LOCK = threading.RLock()
+_ENDPOINTS: dict[str, dict] = {}
+_STARTED = time.time()
+_HISTORY: list[dict] = []
+_LAST_TOTALS = {"requests": 0, "network_sec": 0.0, "sleep_sec": 0.0, "bytes": 0}
+_FLUSHER: threading.Thread | None = None
+_TOTAL_REQUESTS = 0
+
+
+def enabled() -> bool:
+    return bool(getattr(_cfg, "REQUEST_STATS_ENABLE", True))
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Stable label for a request: method + path with ids collapsed and only page-selecting query keys."""
+    try:
+        parts = urllib.parse.urlsplit(str(url))
+        path = re.sub(r"/\d+(?=/|$)", "/:id", parts.path or "/")
+        query = urllib.parse.parse_qs(parts.query)
+        kept = [f"{k}={query[k][0]}" for k in _KEEP_QUERY if k in query]
+        label = path + ("?" + "&".join(kept) if kept else "")
+    except Exception:
+        label = "?"
+    return f"{str(method or 'GET').upper()} {label}"
+
+
+def _new_entry() -> dict:
+    return {
+        "count": 0,
+        "errors": 0,
+        "status": {},
+        "bytes": 0,
+        "network_sec": 0.0,
+        "network_max_sec": 0.0,
+        "sleep_sec": 0.0,
+        "buckets": [0] * (len(BUCKETS_SEC) + 1),
+    }
+
+
+def record_request(
+    method: str,
+    url: str,
+    status: int | None,
+    network_sec: float,
+    nbytes: int = 0,
+    sleep_sec: float = 0.0,
+    error: bool = False,
+) -> None:
+    if not enabled():
+        return
+    global _TOTAL_REQUESTS
+    key = endpoint_key(method, url)
+    net = max(0.0, float(network_sec))
+    with _LOCK:
+        _TOTAL_REQUESTS += 1
+        e = _ENDPOINTS.get(key)
+        if e is None:
+            e = _ENDPOINTS[key] = _new_entry()
+        e["count"] += 1
+        if error or status is None or int(status) >= 400:
+            e["errors"] += 1
+        code = "error" if status is None else str(int(status))
+        e["status"][code] = e["status"].get(code, 0) + 1
+        e["bytes"] += max(0, int(nbytes or 0))
+        e["network_sec"] += net
+        e["network_max_sec"] = max(e["network_max_sec"], net)
+        e["sleep_sec"] += max(0.0, float(sleep_sec))
+        idx = len(BUCKETS_SEC)
+        for i, bound in enumerate(BUCKETS_SEC):
+            if net <= bound:
+                idx = i
+                break
+        e["buckets"][idx] += 1
+        _start_flusher()
+
+
+def total_requests() -> int:
+    """Monotonic request counter (not cleared by reset); cheap enough to sample per phase."""
+    return _TOTAL_REQUESTS
+
+
+def _totals(endpoints: dict) -> dict:
+    return {
+        "requests": sum(e["count"] for e in endpoints.values()),
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "network_sec": round(sum(e["network_sec"] for e in endpoints.values()), 3),
+        "sleep_sec": round(sum(e["sleep_sec"] for e in endpoints.values()), 3),
+        "bytes": sum(e["bytes"] for e in endpoints.values()),
+    }
+
+
+def snapshot() -> dict:
+    """In-process view: totals plus per-endpoint stats (counts, status codes, latency buckets)."""
+    with _LOCK:
+        endpoints = {k: json.loads(json.dumps(v)) for k, v in _ENDPOINTS.items()}
+        history = list(_HISTORY)
+    for e in endpoints.values():
+        e["network_avg_sec"] = round(e["network_sec"] / e["count"], 4) if e["count"] else 0.0
+        e["network_sec"] = round(e["network_sec"], 4)
+        e["sleep_sec"] = round(e["sleep_sec"], 4)
+    return {
+        "since": _STARTED,
+        "ts": time.time(),
+        "buckets_sec": list(BUCKETS_SEC),
+        "totals": _totals(endpoints),
+        "endpoints": endpoints,
+        "history": history,
+    }
+
+
+def reset() -> None:
+    global _STARTED
+    with _LOCK:
+        _ENDPOINTS.clear()
+        _HISTORY.clear()
+        _LAST_TOTALS.update({"requests": 0, "network_sec": 0.0, "sleep_sec": 0.0, "bytes": 0})
+        _STARTED = time.time()
+
+
+def _roll_history() -> None:
+    """Append the delta since the previous flush to the rolling history. Caller holds _LOCK."""
+    totals = _totals(_ENDPOINTS)
+    delta = {k: round(totals[k] - _LAST_TOTALS.get(k, 0), 3) for k in ("requests", "network_sec", "sleep_sec", "bytes")}
+    if delta["requests"] <= 0:
+        return
+    delta["ts"] = time.time()
+    _HISTORY.append(delta)
+    del _HISTORY[:-_HISTORY_LEN]
+    _LAST_TOTALS.update({k: totals[k] for k in _LAST_TOTALS})
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(path)
+    except Exception:
+        pass
+
+
+def _prom_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", " ")
+
+
+def render_prometheus(snap: dict | None = None) -> str:
+    """Prometheus text exposition (for node_exporter's textfile collector)."""
+    snap = snap or snapshot()
+    lines = [
+        "# HELP travian_http_requests_total HTTP requests by endpoint and status.",
+        "# TYPE travian_http_requests_total counter",
+    ]
+    for key, e in sorted(snap["endpoints"].items()):
+        ep = _prom_label(key)
+        for code, n in sorted(e["status"].items()):
+            lines.append(f'travian_http_requests_total{{endpoint="{ep}",status="{code}"}} {n}')
+    lines += [
+        "# HELP travian_http_network_seconds Network time per request (humanizer sleep excluded).",
+        "# TYPE travian_http_network_seconds histogram",
+    ]
+    for key, e in sorted(snap["endpoints"].items()):
+        ep = _prom_label(key)
+        cumulative = 0
+        for bound, n in zip(list(snap["buckets_sec"]) + ["+Inf"], e["buckets"]):
+            cumulative += n
+            lines.append(f'travian_http_network_seconds_bucket{{endpoint="{ep}",le="{bound}"}} {cumulative}')
+        lines.append(f'travian_http_network_seconds_sum{{endpoint="{ep}"}} {e["network_sec"]}')
+        lines.append(f'travian_http_network_seconds_count{{endpoint="{ep}"}} {e["count"]}')
+    lines += [
+        "# HELP travian_http_response_bytes_total Response body bytes by endpoint.",
+        "# TYPE travian_http_response_bytes_total counter",
+    ]
+    for key, e in sorted(snap["endpoints"].items()):
+        lines.append(f'travian_http_response_bytes_total{{endpoint="{_prom_label(key)}"}} {e["bytes"]}')
+    lines += [
+        "# HELP travian_humanizer_sleep_seconds_total Think-time slept before requests, by endpoint.",
+        "# TYPE travian_humanizer_sleep_seconds_total counter",
+    ]
+    for key, e in sorted(snap["endpoints"].items()):
+        lines.append(f'travian_humanizer_sleep_seconds_total{{endpoint="{_prom_label(key)}"}} {e["sleep_sec"]}')
+    return "\n".join(lines) + "\n"
+
+
+def flush() -> None:
+    """Write the configured export(s): rolling JSON and/or Prometheus textfile."""
+    if not enabled():
+        return
+    mode = str(getattr(_cfg, "REQUEST_STATS_EXPORT", "json") or "off").strip().lower()
+    if mode in ("off", "none", ""):
+        return
+    with _LOCK:
+        if not _ENDPOINTS:
+            return
+        _roll_history()
+    snap = snapshot()
+    if mode in ("json", "both"):
+        path = Path(str(getattr(_cfg, "REQUEST_STATS_PATH", "database/request_stats.json")))
+        _atomic_write(path, json.dumps(snap, indent=2, ensure_ascii=False))
+    if mode in ("prometheus", "prom", "both"):
+        path = Path(str(getattr(_cfg, "REQUEST_STATS_PROM_PATH", "database/request_stats.prom")))
+        _atomic_write(path, render_prometheus(snap))
+
+
+def _flush_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        flush()
+
+
+def _start_flusher() -> None:
+    global _FLUSHER
+    if _FLUSHER is not None:
+        return
+    try:
+        interval = float(getattr(_cfg, "REQUEST_STATS_FLUSH_INTERVAL_SEC", 60.0) or 0.0)
+    except Exception:
+        interval = 60.0
+    if interval <= 0:
+        return
+    _FLUSHER = threading.Thread(target=_flush_loop, args=(interval,), name="request-stats-flush", daemon=True)
+    _FLUSHER.start()
+
+
+atexit.register(flush)
+
+
+def render_summary_lines(top: int = 5) -> list[str]:
+    """Short human summary for the cycle report."""
+    snap = snapshot()
+    t = snap["totals"]
+    if not t["requests"]:
+        return []
+    lines = [
+        f"- Requests since start: {t['requests']} (errors {t['errors']}), network {t['network_sec']:.1f}s, "
+        f"humanizer sleep {t['sleep_sec']:.1f}s, {t['bytes'] / 1024:.0f} KiB"
+    ]
+    busiest = sorted(snap["endpoints"].items(), key=lambda kv: -kv[1]["network_sec"])[:top]
+    for key, e in busiest:
+        lines.append(f"    • {key}: {e['count']}× avg {e['network_avg_sec'] * 1000:.0f} ms, max {e['network_max_sec'] * 1000:.0f} ms")
+    return lines
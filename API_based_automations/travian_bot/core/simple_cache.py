@@ -1,5 +1,8 @@
+import atexit
 import json
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Optional
 
@@ -34,17 +37,129 @@ class JsonKvCache:
     """Very small JSON key-value cache with timestamp support.
 
     Stored format: { key: {"value": ..., "ts": epoch_seconds} }
+
+    Use ``JsonKvCache.shared(path, ...)`` to get the process-wide instance for a
+    file: it is loaded once, bounded (LRU on ``max_entries``, age on ``ttl_sec``)
+    and written behind (dirty entries are flushed ``write_behind_sec`` after the
+    first change, and at exit). A plain ``JsonKvCache(path)`` keeps the old
+    write-through behaviour.
     """
 
-    def __init__(self, file_path: str | Path):
+    _instances: dict[str, "JsonKvCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        file_path: str | Path,
+        max_entries: int = 0,
+        ttl_sec: float = 0,
+        write_behind_sec: float = 0,
+    ):
         self.path = Path(file_path)
-        self._data = load_json(self.path)
+        self.max_entries = max(0, int(max_entries or 0))
+        self.ttl_sec = max(0.0, float(ttl_sec or 0))
+        self.write_behind_sec = max(0.0, float(write_behind_sec or 0))
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()     # serializes snapshot + write, so writes land in order
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        raw = load_json(self.path)
+        # Oldest first so LRU eviction drops the stalest entries on load
+        items = sorted(
+            ((str(k), v) for k, v in raw.items() if isinstance(v, dict)),
+            key=lambda kv: float(kv[1].get("ts", 0) or 0),
+        )
+        now = _now()
+        self._data: "OrderedDict[str, dict]" = OrderedDict(
+            (k, v) for k, v in items if not self._expired(v, now)
+        )
+        self._evict()
+
+    @classmethod
+    def shared(
+        cls,
+        file_path: str | Path,
+        max_entries: int = 0,
+        ttl_sec: float = 0,
+        write_behind_sec: float = 5.0,
+    ) -> "JsonKvCache":
+        """Return the process-wide cache for ``file_path`` (created on first use)."""
+        key = str(Path(file_path).resolve())
+        with cls._instances_lock:
+            inst = cls._instances.get(key)
+            if inst is None:
+                inst = cls(file_path, max_entries=max_entries, ttl_sec=ttl_sec, write_behind_sec=write_behind_sec)
+                cls._instances[key] = inst
+            return inst
+
+    @classmethod
+    def flush_all(cls) -> None:
+        with cls._instances_lock:
+            instances = list(cls._instances.values())
+        for inst in instances:
+            inst.flush()
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        if self.ttl_sec <= 0:
+            return False
+        try:
+            return (now - float(entry.get("ts", 0) or 0)) > self.ttl_sec
+        except Exception:
+            return True
+
+    def _evict(self) -> None:
+        if self.max_entries <= 0:
+            return
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self._dirty = True
+
+    def _mark_dirty(self) -> None:
+        """Call under self._lock; write-through caches flush in _write_through() after releasing it."""
+        self._dirty = True
+        if self.write_behind_sec <= 0:
+            return
+        if self._timer is None:
+            self._timer = threading.Timer(self.write_behind_sec, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _write_through(self) -> None:
+        # Outside self._lock: flush takes the write lock first, then self._lock
+        if self.write_behind_sec <= 0 and self._dirty:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the cache to disk if it changed since the last write.
+
+        The snapshot and the write happen under one write lock, so a later flush
+        never lands before an earlier one; readers and setters only wait for the
+        snapshot copy, not for disk I/O.
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                snapshot = dict(self._data)
+                self._dirty = False
+            atomic_write_json(self.path, snapshot)
 
     def get(self, key: str) -> Optional[dict]:
         try:
-            v = self._data.get(key)
-            if isinstance(v, dict) and ("value" in v or "ts" in v):
-                return v
+            with self._lock:
+                v = self._data.get(key)
+                if isinstance(v, dict) and ("value" in v or "ts" in v):
+                    if self._expired(v, _now()):
+                        self._data.pop(key, None)
+                        self._mark_dirty()
+                        v = None
+                    else:
+                        self._data.move_to_end(key)
+                        return v
+            self._write_through()
         except Exception:
             pass
         return None
@@ -53,26 +168,34 @@ class JsonKvCache:
         try:
             if ts is None:
                 ts = _now()
-            self._data[str(key)] = {"value": value, "ts": float(ts)}
-            atomic_write_json(self.path, self._data)
+            with self._lock:
+                k = str(key)
+                self._data[k] = {"value": value, "ts": float(ts)}
+                self._data.move_to_end(k)
+                self._evict()
+                self._mark_dirty()
+            self._write_through()
         except Exception:
             pass
 
     def purge_older_than(self, max_age_sec: int) -> None:
         try:
             now = _now()
-            keys = list(self._data.keys())
-            changed = False
-            for k in keys:
-                try:
-                    ts = float(self._data[k].get("ts", 0))
-                except Exception:
-                    ts = 0
-                if max_age_sec > 0 and (now - ts) > max_age_sec:
-                    self._data.pop(k, None)
-                    changed = True
-            if changed:
-                atomic_write_json(self.path, self._data)
+            with self._lock:
+                changed = False
+                for k in list(self._data.keys()):
+                    try:
+                        ts = float(self._data[k].get("ts", 0))
+                    except Exception:
+                        ts = 0
+                    if max_age_sec > 0 and (now - ts) > max_age_sec:
+                        self._data.pop(k, None)
+                        changed = True
+                if changed:
+                    self._mark_dirty()
+            self._write_through()
         except Exception:
             pass
 
+
+atexit.register(JsonKvCache.flush_all)
@@ -0,0 +1,154 @@
+# core/spatial_index.py
+"""Shared distance metric and spatial index for map coordinates.
+
+Travian worlds are a torus: x and y run from -WORLD_RADIUS to +WORLD_RADIUS and
+wrap around, so (200, 0) and (-200, 0) are neighbours. ``travian_distance`` is
+the Euclidean distance on that torus and is what the game uses for travel time.
+
+``SpatialIndex`` buckets points into a uniform grid of ``cell_size`` tiles and
+answers ``k_nearest`` / ``within_radius`` by visiting cells in growing rings
+around the query point, so only the cells near the query are touched.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Any, Callable, Iterable, Optional
+
+WORLD_RADIUS = 200
+WORLD_SIZE = 2 * WORLD_RADIUS + 1
+
+
+def _wrap_delta(a: int | float, b: int | float, size: int = WORLD_SIZE) -> float:
+    d = abs(float(a) - float(b)) % size
+    return min(d, size - d)
+
+
+def travian_distance(x1, y1, x2, y2, size: int = WORLD_SIZE) -> float:
+    """Euclidean distance with map wrap-around (the metric used for travel times)."""
+    dx = _wrap_delta(x1, x2, size)
+    dy = _wrap_delta(y1, y2, size)
+    return math.sqrt(dx * dx + dy * dy)
+
+
+def parse_coord_key(key: str) -> Optional[tuple[int, int]]:
+    """Parse "x_y", "(x,y)" or "(x_y)" style keys into a tuple; None when malformed."""
+    try:
+        text = str(key).strip().strip("()")
+        sep = "_" if "_" in text else ","
+        xs, ys = text.split(sep)
+        return int(xs.strip()), int(ys.strip())
+    except Exception:
+        return None
+
+
+class SpatialIndex:
+    """Uniform grid-bucket index over (x, y) points with wrap-around distances."""
+
+    def __init__(self, cell_size: int = 8, size: int = WORLD_SIZE) -> None:
+        self.cell_size = max(1, int(cell_size))
+        self.size = int(size)
+        self.radius = self.size // 2
+        self.cells_per_axis = -(-self.size // self.cell_size)
+        self._buckets: dict[tuple[int, int], list[tuple[int, int, Any]]] = {}
+        self._count = 0
+
+    @classmethod
+    def from_coord_keys(cls, keys: Iterable[str], cell_size: int = 8) -> "SpatialIndex":
+        """Index coordinate keys ("x_y" / "(x,y)"); the item stored is the key itself."""
+        idx = cls(cell_size=cell_size)
+        for key in keys:
+            xy = parse_coord_key(key)
+            if xy is not None:
+                idx.insert(xy[0], xy[1], key)
+        return idx
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _cell_of(self, x: int, y: int) -> tuple[int, int]:
+        nx = (int(x) + self.radius) % self.size
+        ny = (int(y) + self.radius) % self.size
+        return nx // self.cell_size, ny // self.cell_size
+
+    def insert(self, x: int, y: int, item: Any = None) -> None:
+        self._buckets.setdefault(self._cell_of(x, y), []).append((int(x), int(y), item))
+        self._count += 1
+
+    def _ring(self, cx: int, cy: int, r: int):
+        """Cells at Chebyshev distance r from (cx, cy), wrapped; may repeat on tiny worlds."""
+        n = self.cells_per_axis
+        if r == 0:
+            yield cx, cy
+            return
+        for dx in range(-r, r + 1):
+            yield (cx + dx) % n, (cy - r) % n
+            yield (cx + dx) % n, (cy + r) % n
+        for dy in range(-r + 1, r):
+            yield (cx - r) % n, (cy + dy) % n
+            yield (cx + r) % n, (cy + dy) % n
+
+    def _ring_lower_bound(self, r: int) -> float:
+        # Any point in ring r is at least (r - 1) full cells away along one axis.
+        # When the world size is not a multiple of cell_size the last cell is
+        # narrower, and a path across the wrap seam may cross it: allow one cell less.
+        full_cells = r - 1 if self.size % self.cell_size == 0 else r - 2
+        return float(max(0, full_cells) * self.cell_size)
+
+    def _max_ring(self) -> int:
+        return self.cells_per_axis // 2 + 1
+
+    def _scan(self, x: int, y: int, max_dist: float, filter: Optional[Callable[[Any], bool]], stop: Callable[[list, int], bool]):
+        """Visit rings outward, collecting (dist, x, y, item) with dist <= max_dist."""
+        cx, cy = self._cell_of(x, y)
+        seen: set[tuple[int, int]] = set()
+        found: list[tuple[float, int, int, Any]] = []
+        for r in range(self._max_ring() + 1):
+            if self._ring_lower_bound(r) > max_dist or stop(found, r):
+                break
+            for cell in self._ring(cx, cy, r):
+                if cell in seen:
+                    continue
+                seen.add(cell)
+                for px, py, item in self._buckets.get(cell, ()):
+                    d = travian_distance(x, y, px, py, self.size)
+                    if d > max_dist:
+                        continue
+                    if filter is not None and not filter(item):
+                        continue
+                    found.append((d, px, py, item))
+        found.sort(key=lambda t: (t[0], t[1], t[2]))
+        return found
+
+    def within_radius(
+        self,
+        x: int,
+        y: int,
+        radius: float,
+        filter: Optional[Callable[[Any], bool]] = None,
+    ) -> list[tuple[float, int, int, Any]]:
+        """All points with distance <= radius as (dist, x, y, item), nearest first."""
+        max_dist = float("inf") if radius is None else float(radius)
+        return self._scan(x, y, max_dist, filter, lambda found, r: False)
+
+    def k_nearest(
+        self,
+        x: int,
+        y: int,
+        k: int,
+        max_dist: Optional[float] = None,
+        filter: Optional[Callable[[Any], bool]] = None,
+    ) -> list[tuple[float, int, int, Any]]:
+        """The k nearest points (optionally within max_dist and matching filter), nearest first."""
+        if k <= 0:
+            return []
+        limit = float("inf") if max_dist is None else float(max_dist)
+
+        def _done(found: list, r: int) -> bool:
+            # Stop once k candidates are known and the next ring cannot beat the k-th
+            if len(found) < k:
+                return False
+            kth = heapq.nsmallest(k, (f[0] for f in found))[-1]
+            return self._ring_lower_bound(r) > kth
+
+        return self._scan(x, y, limit, filter, _done)[:k]
@@ -5,9 +5,14 @@ import time
 from datetime import datetime, time as dtime, timedelta
 from bs4 import BeautifulSoup
 from analysis.animal_to_power_mapping import get_animal_power
+from core.combat_stats import ANIMAL_CODES
 from core.unit_catalog import resolve_unit_base_name, resolve_label_u
+from core.village_snapshot import VillageSnapshot, build_snapshot, parse_market_data
+from core import clock, event_scheduler, request_stats
 from typing import Optional
 import logging
+import threading
+import urllib.parse
 from pathlib import Path
 
 
@@ -48,6 +53,8 @@ class TravianAPI:
                 except Exception:
                     continue
             self._x_version = str(getattr(_cfg, 'TRAVIAN_X_VERSION', '') or '').strip()
+            self._page_cache_enable = bool(getattr(_cfg, 'PAGE_CACHE_ENABLE', True))
+            self._page_cache_max_age = max(0.0, float(getattr(_cfg, 'PAGE_CACHE_MAX_AGE_SEC', 120.0)))
         except Exception:
             self._human_min, self._human_max = 0.6, 2.2
             self._human_every, self._human_long_min, self._human_long_max = 7, 3.0, 6.0
@@ -59,6 +66,7 @@ class TravianAPI:
             self._idle_pages = []
             self._quiet_windows = []
             self._x_version = ''
+            self._page_cache_enable, self._page_cache_max_age = True, 120.0
         if not self._idle_pages:
             self._idle_pages = [
                 "/dorf1.php",
@@ -70,7 +78,7 @@ class TravianAPI:
                 "/statistics/player",
                 "/hero/adventures",
             ]
-        self._idle_next_ts = time.time()  # schedule immediately to seed interval
+        self._idle_next_ts = clock.now()  # schedule immediately to seed interval
         self._req_counter = 0
         # Set polite default headers if missing
         try:
@@ -85,20 +93,47 @@ class TravianAPI:
             self.session.headers.setdefault('Accept-Encoding', 'gzip, deflate, br, zstd')
         except Exception:
             pass
-        # Wrap session.request to inject human-like delays globally
-        self._raw_request = self.session.request
+        # Time the real HTTP call per endpoint (network only; see core.request_stats)
+        self._session_request = self.session.request
+        self._sleep_local = threading.local()
+
+        def _timed_request(method, url, **kwargs):
+            slept = getattr(self._sleep_local, "slept", 0.0)
+            self._sleep_local.slept = 0.0
+            t0 = time.perf_counter()
+            try:
+                resp = self._session_request(method, url, **kwargs)
+            except Exception:
+                request_stats.record_request(method, url, None, time.perf_counter() - t0, sleep_sec=slept, error=True)
+                raise
+            net = time.perf_counter() - t0
+            try:
+                if kwargs.get("stream"):
+                    nbytes = int(resp.headers.get("Content-Length") or 0)
+                else:
+                    nbytes = len(resp.content or b"")
+            except Exception:
+                nbytes = 0
+            request_stats.record_request(method, url, getattr(resp, "status_code", None), net, nbytes, sleep_sec=slept)
+            return resp
+
+        self._raw_request = _timed_request
 
+        # Wrap session.request to inject human-like delays globally
         def _human_request(method, url, **kwargs):
             import random, time as _t
+            sleep_start = _t.perf_counter()
             try:
                 self._req_counter += 1
                 # Short think time before each request
-                _t.sleep(random.uniform(self._human_min, self._human_max))
+                clock.sleep(random.uniform(self._human_min, self._human_max))
                 # Occasionally take a longer pause
                 if self._req_counter % self._human_every == 0 or random.random() < self._human_long_prob:
-                    _t.sleep(random.uniform(self._human_long_min, self._human_long_max))
+                    clock.sleep(random.uniform(self._human_long_min, self._human_long_max))
             except Exception:
                 pass
+            # Handed to _timed_request so the think-time is booked on this request
+            self._sleep_local.slept = _t.perf_counter() - sleep_start
             resp = self._raw_request(method, url, **kwargs)
             try:
                 self._monitor_response(resp)
@@ -118,6 +153,17 @@ class TravianAPI:
 
         self._schedule_next_idle()
 
+        # Per-cycle page cache keyed by (active village, path); see get_cached_page
+        self._page_cache: dict[tuple, dict] = {}
+        self._page_cache_lock = threading.RLock()
+        self._page_cache_gen = 0
+        self._page_cache_hits = 0
+        self._page_cache_misses = 0
+        try:
+            self.session.hooks.setdefault("response", []).append(self._page_cache_hook)
+        except Exception:
+            pass
+
         # Ensure Travian X-Version header is present: use config override or auto-detect
         try:
             if self._x_version:
@@ -149,14 +195,14 @@ class TravianAPI:
     def _schedule_next_idle(self) -> None:
         try:
             interval = random.uniform(self._idle_min_interval, self._idle_max_interval)
-            self._idle_next_ts = time.time() + interval
+            self._idle_next_ts = clock.now() + interval
         except Exception:
             self._idle_next_ts = float("inf")
 
     def _in_quiet_window_now(self) -> bool:
         if not getattr(self, "_quiet_windows", None):
             return False
-        now = datetime.now()
+        now = clock.datetime_now()
         for start_t, end_t in self._quiet_windows:
             start = now.replace(hour=start_t.hour, minute=start_t.minute, second=0, microsecond=0)
             end = now.replace(hour=end_t.hour, minute=end_t.minute, second=0, microsecond=0)
@@ -171,7 +217,7 @@ class TravianAPI:
             return
         if self._in_quiet_window_now():
             return
-        now = time.time()
+        now = clock.now()
         if now < getattr(self, "_idle_next_ts", 0.0):
             return
         try:
@@ -193,7 +239,7 @@ class TravianAPI:
         except Exception:
             delay = 0.6
         if delay > 0:
-            time.sleep(delay)
+            clock.sleep(delay)
         try:
             url = f"{self.server_url.rstrip('/')}/{page.lstrip('/')}"
             resp = self._raw_request("GET", url, timeout=15)
@@ -267,7 +313,7 @@ class TravianAPI:
             cooldown = 120.0
         logging.info("[Humanizer] Cooling down for %.1f seconds due to suspicion signal.", cooldown)
         if cooldown > 0:
-            time.sleep(cooldown)
+            clock.sleep(cooldown)
         self._schedule_next_idle()
 
     def get_player_info(self):
@@ -403,14 +449,167 @@ class TravianAPI:
         """Switch current village context (affects tasks scoped to settledVillage)."""
         try:
             vid = str(village_id)
-            self.session.get(f"{self.server_url}/dorf1.php?newdid={vid}")
+            gen = self._page_cache_gen
+            res = self.session.get(f"{self.server_url}/dorf1.php?newdid={vid}")
             try:
                 # Track current village id for APIs that may require it (e.g., tasks in spawnVillage scope)
                 self._current_village_id = int(village_id)
             except Exception:
                 self._current_village_id = None
+            # The switch response is that village's dorf1: seed the page cache with it
+            try:
+                if getattr(res, "status_code", 0) == 200:
+                    self._store_cached_page(self._page_cache_key("/dorf1.php"), res, gen)
+            except Exception:
+                pass
+        except Exception:
+            pass
+
+    # --- Per-cycle page cache ---
+    # Query parameters that make a GET state-changing (build/demolish links carry a=/c=)
+    _STATE_CHANGING_PARAMS = frozenset({"a", "c", "action"})
+    # POST endpoints that only read state and must not flush the cache
+    _READ_ONLY_POSTS = ("/api/v1/map/tile-details", "/api/v1/map/position")
+
+    def begin_page_cycle(self) -> None:
+        """Start a new bot cycle: drop all cached pages so the cycle sees fresh state."""
+        self.invalidate_page_cache()
+
+    def invalidate_page_cache(self, path: str | None = None) -> None:
+        """Drop cached pages (all villages), or only entries for one path."""
+        with self._page_cache_lock:
+            self._page_cache_gen += 1
+            if path is None:
+                self._page_cache.clear()
+            else:
+                for key in [k for k in self._page_cache if k[1] == path]:
+                    del self._page_cache[key]
+
+    def page_cache_stats(self) -> dict:
+        with self._page_cache_lock:
+            return {
+                "entries": len(self._page_cache),
+                "hits": self._page_cache_hits,
+                "misses": self._page_cache_misses,
+            }
+
+    def _page_cache_key(self, path: str) -> tuple:
+        return (getattr(self, "_current_village_id", None), path)
+
+    def _store_cached_page(self, key: tuple, response, gen: int) -> None:
+        with self._page_cache_lock:
+            # A state-changing request finished while we were fetching: do not cache
+            if gen != self._page_cache_gen:
+                return
+            self._page_cache[key] = {"ts": time.time(), "response": response, "soup": None}
+
+    def _page_cache_hook(self, response, *args, **kwargs):
+        """requests response hook: track village switches and flush after state changes."""
+        try:
+            req = getattr(response, "request", None)
+            method = str(getattr(req, "method", "GET") or "GET").upper()
+            parts = urllib.parse.urlsplit(str(getattr(req, "url", "") or ""))
+            query = urllib.parse.parse_qs(parts.query)
+            newdid = query.get("newdid")
+            if newdid:
+                try:
+                    self._current_village_id = int(newdid[0])
+                except Exception:
+                    pass
+            if method in ("GET", "HEAD"):
+                if self._STATE_CHANGING_PARAMS & set(query):
+                    self.invalidate_page_cache()
+            elif not parts.path.endswith(self._READ_ONLY_POSTS):
+                self.invalidate_page_cache()
         except Exception:
             pass
+        return response
+
+    def get_cached_page(self, path: str, max_age: float | None = None):
+        """GET ``path`` at most once per (active village, path) per cycle and reuse the response.
+
+        Entries are dropped by begin_page_cycle(), after any state-changing request
+        (POST, or GET with an action parameter) and once older than PAGE_CACHE_MAX_AGE_SEC.
+        Raises like ``res.raise_for_status()``; error responses are never cached.
+        """
+        url = f"{self.server_url}{path}"
+        if not self._page_cache_enable:
+            res = self.session.get(url)
+            res.raise_for_status()
+            return res
+        limit = self._page_cache_max_age if max_age is None else max(0.0, float(max_age))
+        key = self._page_cache_key(path)
+        with self._page_cache_lock:
+            entry = self._page_cache.get(key)
+            if entry is not None and (time.time() - entry["ts"]) <= limit:
+                self._page_cache_hits += 1
+                return entry["response"]
+            self._page_cache_misses += 1
+            gen = self._page_cache_gen
+        res = self.session.get(url)
+        res.raise_for_status()
+        self._store_cached_page(key, res, gen)
+        return res
+
+    def get_cached_soup(self, path: str, max_age: float | None = None) -> BeautifulSoup:
+        """Parsed form of get_cached_page(); the soup is shared, so treat it as read-only."""
+        return self._cached_page_and_soup(path, max_age=max_age)[1]
+
+    def _cached_page_and_soup(self, path: str, max_age: float | None = None):
+        res = self.get_cached_page(path, max_age=max_age)
+        with self._page_cache_lock:
+            entry = self._page_cache.get(self._page_cache_key(path))
+            if entry is not None and entry["response"] is res:
+                if entry["soup"] is None:
+                    entry["soup"] = BeautifulSoup(res.text, "html.parser")
+                return res, entry["soup"]
+        return res, BeautifulSoup(res.text, "html.parser")
+
+    def get_village_snapshot(self, village_id: int | str | None = None, with_market: bool = False) -> VillageSnapshot:
+        """Parsed state of a village (resources, capacities, production, queue, troops).
+
+        Built once from the cached /dorf1.php and shared until the page cache drops
+        that page. ``village_id`` switches village first when it is not the active
+        one; ``with_market`` additionally fills the merchant fields from the
+        marketplace page. Treat the returned snapshot as read-only.
+        """
+        if village_id is not None:
+            try:
+                vid = int(village_id)
+            except Exception:
+                vid = None
+            if vid is not None and vid != getattr(self, "_current_village_id", None):
+                self.switch_village(vid)
+        soup = self.get_cached_soup("/dorf1.php")
+        key = self._page_cache_key("/dorf1.php")
+        with self._page_cache_lock:
+            entry = self._page_cache.get(key)
+            if entry is not None and entry.get("soup") is not soup:
+                entry = None
+            snapshot = entry.get("snapshot") if entry is not None else None
+        if snapshot is None:
+            fetched_at = entry["ts"] if entry is not None else None
+            snapshot = build_snapshot(key[0], soup, fetched_at=fetched_at)
+            if entry is not None:
+                with self._page_cache_lock:
+                    entry["snapshot"] = snapshot
+            # Let the main loop wake up when the first construction finishes
+            try:
+                finish = [b["finish_in"] for b in snapshot.build_queue if b.get("finish_in")]
+                if finish:
+                    event_scheduler.schedule(f"build:{key[0]}", snapshot.fetched_at + min(finish))
+                else:
+                    event_scheduler.cancel(f"build:{key[0]}")
+            except Exception:
+                pass
+        if with_market and not snapshot.has_market:
+            market_res, market_soup = self._cached_page_and_soup("/build.php?gid=17")
+            (
+                snapshot.merchants_available,
+                snapshot.merchants_total,
+                snapshot.merchant_capacity,
+            ) = parse_market_data(market_res.text, market_soup)
+        return snapshot
 
     def list_collectible_progressive_tasks(self) -> list[dict]:
         """Parse /tasks page and return a list of JSON payloads for collectReward.
@@ -818,7 +1017,9 @@ class TravianAPI:
                 img = row.find("img")
                 cols = row.find_all("td")
                 if img and len(cols) >= 2:
-                    animal_name = img.get("alt", "").strip().lower()
+                    # Unit class (u31..u40) first: the alt text is localized
+                    code = next((c for c in (img.get("class") or []) if c in ANIMAL_CODES), None)
+                    animal_name = ANIMAL_CODES[code] if code else img.get("alt", "").strip().lower()
                     count_text = cols[1].get_text(strip=True).replace("\u202d", "").replace("\u202c", "")
                     try:
                         count = int(count_text)
@@ -1594,122 +1795,6 @@ class TravianAPI:
             return None
         return None
 
-
-
-
-    def find_latest_oasis_report(self, x: int | None, y: int | None) -> Optional[dict]:
-        """
-        Best-effort: zoekt in /berichte.php naar het meest recente rapport dat (x|y) bevat,
-        opent dat rapport en retourneert {'html': ...}. Retourneert None als niets gevonden.
-        Robuuster gemaakt tegen RTL/Unicode mintekens en onzichtbare layout-tekens.
-        """
-        try:
-            # Legacy debug toggles (kept default disabled)
-            _dbg_log = _dbg_dump = False
-            # 1) lijstpagina
-            lst = self.session.get(f"{self.server_url}/berichte.php")
-            lst.raise_for_status()
-            html = lst.text or ""
-            
-            # Normaliseer unicode voor matching: verwijder directionele marks en vervang speciale mintekens
-            def _normalize(s: str) -> str:
-                if not s:
-                    return ""
-                # verwijder directionality/invisible marks
-                rm = dict.fromkeys(map(ord, "\u200e\u200f\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069"), None)
-                s = s.translate(rm)
-                # vervang diverse dash/min varianten door ASCII '-'
-                for ch in ("\u2212", "\u2010", "\u2011", "\u2012", "\u2013", "\u2014"):
-                    s = s.replace(ch, "-")
-                return s
-
-            norm_html = _normalize(html)
-            # Try newer /report listing with simple pagination first
-            try:
-                import re
-                pages = ["/report", "/report?page=1", "/report?page=2", "/report?page=3"]
-                xs = str(int(x)) if x is not None else None
-                ys = str(int(y)) if y is not None else None
-                for p in pages:
-                    pg = self.session.get(f"{self.server_url}{p}")
-                    if not getattr(pg, "ok", False):
-                        continue
-                    page_html = getattr(pg, "text", "") or ""
-                    nhtml = _normalize(page_html)
-                    if _dbg_dump:
-                        try:
-                            from pathlib import Path
-                            Path('logs').mkdir(parents=True, exist_ok=True)
-                            safe = p.replace('/', '_').replace('?', '_').replace('=', '_')
-                            (Path('logs')/f'report_list{safe}.html').write_text(page_html, encoding='utf-8')
-                        except Exception:
-                            pass
-                    if xs and ys:
-                        coord_re = re.compile(r"\(\s*" + re.escape(xs) + r"\s*\|\s*" + re.escape(ys) + r"\s*\)")
-                        pos = [m.start() for m in coord_re.finditer(nhtml)]
-                        links = list(re.finditer(r'href=\"(/report\?id=[^\"]*)\"', nhtml))
-                        if _dbg_log:
-                            print(f"[Reports] Scanning {p}: {len(links)} report link(s), coord matches: {len(pos)}")
-                        if pos and links:
-                            for pc in pos:
-                                best = min(links, key=lambda lm: abs(lm.start() - pc))
-                                href = best.group(1)
-                                if _dbg_log:
-                                    # show a small context around the link
-                                    bstart = max(0, best.start()-80)
-                                    bend = min(len(nhtml), best.end()+80)
-                                    snippet = nhtml[bstart:bend]
-                                    print(f"[Reports] Candidate link near coord: {href} … {snippet[:120].replace('\n',' ')} …")
-                                rep = self.session.get(f"{self.server_url}{href}")
-                                if getattr(rep, "ok", False):
-                                    return {"html": rep.text}
-                    else:
-                        m = re.search(r'href=\"(/report\?id=[^\"]*)\"', nhtml)
-                        if m:
-                            if _dbg_log:
-                                print(f"[Reports] No coords: opening first report link {m.group(1)} from {p}")
-                            rep = self.session.get(f"{self.server_url}{m.group(1)}")
-                            if getattr(rep, "ok", False):
-                                return {"html": rep.text}
-            except Exception:
-                pass
-            if x is not None and y is not None:
-                import re
-                # Vind alle detail-links in genormaliseerde HTML
-                link_iter = list(re.finditer(r'href="(/berichte\\.php\\?id=\\d+[^"]*)"', norm_html))
-                # Coordvorm met pijpje en optionele spaties, met ASCII '-' na normalisatie
-                xs, ys = str(int(x)), str(int(y))
-                coord_re = re.compile(r"\(\s*" + re.escape(xs) + r"\s*\|\s*" + re.escape(ys) + r"\s*\)")
-                pos_coord = [m.start() for m in coord_re.finditer(norm_html)]
-                candidate = None
-                if pos_coord and link_iter:
-                    # Koppel dichtsbijzijnde link aan coord-positie
-                    for pc in pos_coord:
-                        best = min(link_iter, key=lambda lm: abs(lm.start() - pc))
-                        if best is not None:
-                            candidate = best.group(1)
-                            break
-                # fallback: pak eerste link als niets met coords
-                if not candidate and link_iter:
-                    candidate = link_iter[0].group(1)
-                if not candidate:
-                    return None
-                # 2) detailpagina
-                rep = self.session.get(f"{self.server_url}{candidate}")
-                rep.raise_for_status()
-                return {"html": rep.text}
-            else:
-                # Geen coords → neem laatste eerste link
-                import re
-                hrefs = re.findall(r'href="(/berichte\\.php\\?id=\\d+[^"]*)"', html)
-                if not hrefs:
-                    return None
-                rep = self.session.get(f"{self.server_url}{hrefs[0]}")
-                rep.raise_for_status()
-                return {"html": rep.text}
-        except Exception:
-            return None
-
     def log_cookies(self):
         """Log all cookies for debugging."""
         print("\n" + "="*40)
@@ -1732,37 +1817,7 @@ class TravianAPI:
 
     def get_troops_in_village(self):
         """Fetch troop counts in the current village (no printing)."""
-        import re
-
-        url = f"{self.server_url}/dorf1.php"
-        response = self.session.get(url)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, "html.parser")
-        troops_table = soup.find("table", {"id": "troops"})
-        if not troops_table:
-            return {}
-
-        troops: dict[str, int] = {}
-        for row in troops_table.find_all("tr"):
-            img = row.find("img")
-            num = row.find("td", class_="num")
-            if not (img and num):
-                continue
-            unit_classes = img.get("class", [])
-            for c in unit_classes:
-                if c in ("unit", "uhero"):
-                    continue
-                m = re.fullmatch(r"u(\d{1,2})", c)
-                if not m:
-                    continue
-                try:
-                    code_num = int(m.group(1))
-                    count = int(num.text.strip())
-                    troops[f"u{code_num}"] = count
-                except Exception:
-                    continue
-        return troops
+        return dict(self.get_village_snapshot().troops)
 
     def _make_graphql_request(self, query: str, variables: dict = None) -> dict:
         """Make a GraphQL request to the server."""
@@ -1779,17 +1834,23 @@ class TravianAPI:
         return response.json()
 
     # === Reports (list + detail) ===
-    def list_report_links(self, tab: int | None = None, max_items: int = 100) -> list[str]:
+    def list_report_links(self, tab: int | None = None, max_items: int = 100, page: int | None = None) -> list[str]:
         """Return relative hrefs like /report?id=6401237|abcd&s=1 from the report overview.
 
         - tab can be provided (e.g., 1 for 'All'); if None, default server tab is used.
         - max_items limits how many links to return to avoid heavy scans.
+        - page selects an older overview page (?page=N, 1 = newest).
         """
         url = f"{self.server_url}/report"
+        params = {}
         try:
-            params = {"s": int(tab)} if tab is not None else None
+            if tab is not None:
+                params["s"] = int(tab)
+            if page is not None and int(page) > 1:
+                params["page"] = int(page)
         except Exception:
-            params = None
+            pass
+        params = params or None
         try:
             res = self.session.get(url, params=params)
             res.raise_for_status()
@@ -1863,8 +1924,7 @@ class TravianAPI:
         on a common page like /dorf1.php. Returns 0 if not found.
         """
         try:
-            res = self.session.get(f"{self.server_url}/dorf1.php")
-            res.raise_for_status()
+            res = self.get_cached_page("/dorf1.php")
             html = getattr(res, "text", "") or ""
             try:
                 # Fast regex to avoid parser dependency for this small task
@@ -1944,50 +2004,43 @@ class TravianAPI:
         Do not rely on static elements like 'progressiveTasksTitle' which is always present.
         """
         try:
-            res = self.session.get(f"{self.server_url}/dorf1.php")
-            res.raise_for_status()
+            res = self.get_cached_page("/dorf1.php")
             html = getattr(res, "text", "") or ""
             # Strict: only treat the explicit speech-bubble as an indicator
             return ("newQuestSpeechBubble" in html) or ("bigSpeechBubble newQuestSpeechBubble" in html)
         except Exception:
             return False
 
-    @staticmethod
-    def _extract_coords_from_report_html(html: str) -> tuple[int, int] | None:
-        """Best-effort coordinates extraction from report detail HTML."""
-        try:
-            import re
-            # Common form is (x|y) in defender target link/title
-            for m in re.finditer(r"\(([-]?\d{1,3})\|([-]?\d{1,3})\)", html):
-                x = int(m.group(1)); y = int(m.group(2))
-                return x, y
-        except Exception:
-            pass
-        return None
-
     def find_latest_oasis_report(self, x: int | None, y: int | None, tab: int | None = 1, scan_limit: int = 30) -> dict | None:
-        """Scan recent reports, returning the first whose coordinates match (x|y).
+        """Latest report whose target coordinates match (x|y), as a parsed report row.
 
-        Returns dict with keys: id (if derivable), html, href.
+        Both paths return the same shape (core.report_store.report_row): num, id/rid,
+        href, x, y, time, sent, lost, sent_total, lost_total, bounty, bounty_total,
+        carry_full. With the report store enabled this is a local query; only when
+        nothing is stored yet for (x|y) are new reports ingested first. Without the
+        store, recent report details are fetched and parsed until one matches.
         """
         if x is None or y is None:
             return None
+        from core import report_store
+        try:
+            if report_store.enabled():
+                row = report_store.latest_for(x, y)
+                if row is None and report_store.ingest(self, tab=tab, max_items=scan_limit):
+                    row = report_store.latest_for(x, y)
+                return row
+        except Exception as e:
+            logging.debug(f"[Reports] Report store lookup failed, scanning details: {e}")
         hrefs = self.list_report_links(tab=tab, max_items=scan_limit)
         for href in hrefs:
             html = self.fetch_report_detail(href)
             if not html:
                 continue
-            coords = self._extract_coords_from_report_html(html)
-            if coords and coords == (x, y):
-                # Try to pull id from href
-                rid = None
-                try:
-                    import urllib.parse as _up
-                    qs = _up.parse_qs(_up.urlsplit(href).query)
-                    rid = (qs.get("id") or [None])[0]
-                except Exception:
-                    rid = None
-                return {"id": rid, "href": href, "html": html}
+            # Target coords from the defender section (the first (x|y) on the page can be the attacker)
+            parsed = report_store.parse_report_html(html)
+            if (parsed.get("x"), parsed.get("y")) == (x, y):
+                rid, num = report_store.report_id_of(href)
+                return report_store.report_row(num, rid, href, parsed)
         return None
 
     # Backwards-compatible generic alias (works for oasis or villages)
@@ -32,6 +32,16 @@ UNIT_NAME_MAP = {
     7: {"t1": "Mercenary", "t2": "Bowman", "t3": "Spotter", "t4": "Steppe Rider", "t5": "Marksman", "t6": "Marauder", "t7": "Ram", "t8": "Catapult", "t9": "Logades", "t10": "Settler"},
 }
 
+# Base movement speed in fields/hour per local slot (x1 server; multiply by server speed)
+UNIT_SPEED_MAP = {
+    1: {"t1": 6, "t2": 5, "t3": 7, "t4": 16, "t5": 14, "t6": 10, "t7": 4, "t8": 3, "t9": 4, "t10": 5},
+    2: {"t1": 7, "t2": 7, "t3": 6, "t4": 9, "t5": 10, "t6": 9, "t7": 4, "t8": 3, "t9": 4, "t10": 5},
+    3: {"t1": 7, "t2": 6, "t3": 17, "t4": 19, "t5": 16, "t6": 13, "t7": 4, "t8": 3, "t9": 5, "t10": 5},
+    4: {"t1": 6, "t2": 6, "t3": 14, "t4": 18, "t5": 15, "t6": 14, "t7": 4, "t8": 3, "t9": 5, "t10": 5},
+    5: {"t1": 7, "t2": 6, "t3": 7, "t4": 16, "t5": 15, "t6": 10, "t7": 4, "t8": 3, "t9": 4, "t10": 5},
+    7: {"t1": 6, "t2": 6, "t3": 14, "t4": 18, "t5": 15, "t6": 14, "t7": 4, "t8": 3, "t9": 5, "t10": 5},
+}
+
 
 def u_to_t(code: str) -> str | None:
     """Map a global unit id like 'u61' or '61' to local slot 't1'..'t10'. Accepts already 'tX'."""
@@ -88,3 +98,13 @@ def resolve_label_u(tribe_id: int | None, unit_code: str) -> str:
     name = resolve_unit_base_name(tribe_id, unit_code)
     ucode = unit_code if str(unit_code).startswith("u") else t_to_u(int(tribe_id or 4), unit_code)
     return f"{name} ({ucode})"
+
+
+def unit_speed(tribe_id: int | None, unit_code: str) -> float | None:
+    """Base speed (fields/hour at x1) for a unit code ('tX' or 'uNN'); None if unknown."""
+    tcode = u_to_t(unit_code)
+    if not tcode:
+        return None
+    speeds = UNIT_SPEED_MAP.get(int(tribe_id or 4)) or UNIT_SPEED_MAP[4]
+    v = speeds.get(tcode)
+    return float(v) if v else None
@@ -0,0 +1,229 @@
+# core/village_snapshot.py
+"""One parsed view of a village per cycle.
+
+Balancer, router, raider and hero code used to fetch /dorf1.php (and the
+marketplace) and parse their own slice of it. ``TravianAPI.get_village_snapshot``
+builds a ``VillageSnapshot`` from the per-cycle page cache instead, so every
+consumer reads the same parse of the same page. Parsers live here so they can be
+reused without importing feature modules from core.
+"""
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+RESOURCE_TYPES = ("wood", "clay", "iron", "crop")
+_BAR_IDS = {"wood": "l1", "clay": "l2", "iron": "l3", "crop": "l4"}
+_BIDI = dict.fromkeys(map(ord, "‭‬‎‏"), None)
+
+
+@dataclass(slots=True)
+class VillageSnapshot:
+    village_id: Optional[int]
+    fetched_at: float
+    resources: dict[str, int] = field(default_factory=dict)
+    capacities: dict[str, int] = field(default_factory=dict)
+    production: dict[str, int] = field(default_factory=dict)
+    free_crop: Optional[int] = None
+    build_queue: list[dict] = field(default_factory=list)
+    troops: dict[str, int] = field(default_factory=dict)
+    hero_home: bool = False
+    merchants_available: Optional[int] = None
+    merchants_total: Optional[int] = None
+    merchant_capacity: Optional[int] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.build_queue)
+
+    @property
+    def has_market(self) -> bool:
+        return self.merchants_total is not None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return max(0.0, (time.time() if now is None else now) - self.fetched_at)
+
+    def is_fresh(self, max_age: float) -> bool:
+        return self.age() <= max_age
+
+
+def _to_int(text: Any) -> Optional[int]:
+    """Parse Travian numbers like '‭5.321‬', '1,200' or '−40'; None when no digits."""
+    if text is None:
+        return None
+    s = str(text).translate(_BIDI).replace("−", "-").strip()
+    digits = re.sub(r"[^\d-]", "", s)
+    neg = digits.startswith("-")
+    digits = digits.replace("-", "")
+    if not digits:
+        return None
+    return -int(digits) if neg else int(digits)
+
+
+def _resources_script(soup) -> str:
+    for script in soup.find_all("script"):
+        text = script.string or ""
+        if re.search(r"var\s+resources", text):
+            return text
+    return ""
+
+
+def parse_resource_bar(soup) -> tuple[dict[str, int], dict[str, int], dict[str, int], Optional[int]]:
+    """Current stock, storage capacities, hourly production and free crop from the stock bar."""
+    current = {rt: 0 for rt in RESOURCE_TYPES}
+    for rtype, element_id in _BAR_IDS.items():
+        el = soup.find(id=element_id)
+        value = _to_int(el.get_text()) if el is not None else None
+        if value is not None:
+            current[rtype] = value
+    free_crop = None
+    free_el = soup.find(id="stockBarFreeCrop")
+    if free_el is not None:
+        free_crop = _to_int(free_el.get_text()) or 0
+
+    capacities: dict[str, int] = {}
+    production: dict[str, int] = {}
+    text = _resources_script(soup)
+    if text:
+        for rtype, key in _BAR_IDS.items():
+            if rtype != "crop":
+                m = re.search(rf"maxStorage\s*:\s*\{{[^}}]*\"{key}\"\s*:\s*(\d+)", text)
+                if m:
+                    capacities[rtype] = int(m.group(1))
+            m = re.search(rf"production\s*:\s*\{{[^}}]*\"{key}\"\s*:\s*(-?\d+)", text)
+            if m:
+                production[rtype] = int(m.group(1))
+        m_crop = re.search(r"maxCropStorage\s*:\s*(\d+)", text)
+        if m_crop:
+            capacities["crop"] = int(m_crop.group(1))
+    return current, capacities, production, free_crop
+
+
+def parse_build_queue(soup) -> list[dict]:
+    """Running constructions from the dorf1 building list: name, level and seconds left."""
+    queue: list[dict] = []
+    container = soup.find("div", class_="buildingList")
+    if container is None:
+        return queue
+    for li in container.find_all("li"):
+        name_el = li.find("div", class_="name")
+        if name_el is None:
+            continue
+        lvl_el = name_el.find("span", class_="lvl")
+        level = _to_int(lvl_el.get_text()) if lvl_el is not None else None
+        # Name is the text outside the level span ("Woodcutter <span class=lvl>Level 5</span>")
+        name = " ".join(
+            s.strip() for s in name_el.find_all(string=True)
+            if s.strip() and (lvl_el is None or s.parent is not lvl_el)
+        )
+        timer = li.find("span", class_="timer")
+        finish_in = None
+        if timer is not None and timer.has_attr("value"):
+            try:
+                finish_in = int(float(timer["value"]))
+            except Exception:
+                finish_in = None
+        queue.append({"name": name, "level": level, "finish_in": finish_in})
+    return queue
+
+
+def parse_troops(soup) -> tuple[dict[str, int], bool]:
+    """Troop counts from the dorf1 troops table (uNN codes) and whether the hero is home."""
+    troops: dict[str, int] = {}
+    hero_home = False
+    table = soup.find("table", {"id": "troops"})
+    if not table:
+        return troops, hero_home
+    for row in table.find_all("tr"):
+        img = row.find("img")
+        num = row.find("td", class_="num")
+        if not (img and num):
+            continue
+        for c in img.get("class", []):
+            if c == "uhero":
+                hero_home = True
+                continue
+            if c == "unit":
+                continue
+            m = re.fullmatch(r"u(\d{1,2})", c)
+            if not m:
+                continue
+            try:
+                troops[f"u{int(m.group(1))}"] = int(num.text.strip())
+            except Exception:
+                continue
+    return troops, hero_home
+
+
+def _extract_int(text: str | None) -> int:
+    if not text:
+        return 0
+    m = re.search(r"(-?\d+)", text)
+    return int(m.group(1)) if m else 0
+
+
+def parse_market_data(html: str, soup) -> tuple[int, int, int]:
+    """(available merchants, total merchants, capacity per merchant) from the marketplace."""
+    available = 0
+    total = 0
+    capacity = 0
+
+    for pattern in (r"\"availableMerchants\"\s*:\s*(\d+)", r"availableMerchants\s*=\s*(\d+)"):
+        m = re.search(pattern, html)
+        if m:
+            available = int(m.group(1))
+            break
+
+    for pattern in (r"\"totalMerchants\"\s*:\s*(\d+)", r"totalMerchants\s*=\s*(\d+)"):
+        m = re.search(pattern, html)
+        if m:
+            total = int(m.group(1))
+            break
+
+    for pattern in (
+        r"\"merchantCapacity\"\s*:\s*(\d+)",
+        r"capacityPerMerchant\s*[:=]\s*(\d+)",
+    ):
+        m = re.search(pattern, html)
+        if m:
+            capacity = int(m.group(1))
+            break
+
+    if not available:
+        node = soup.find(id="merchantsAvailable") or soup.find(class_=re.compile("merchantsAvailable"))
+        if node:
+            available = _extract_int(node.get_text(" ", strip=True))
+
+    if not total:
+        node = soup.find(id="merchantsTotal") or soup.find(class_=re.compile("merchantsTotal"))
+        if node:
+            total = _extract_int(node.get_text(" ", strip=True))
+
+    if not capacity:
+        text_node = soup.find(string=re.compile("per merchant", re.IGNORECASE))
+        if text_node:
+            capacity = _extract_int(str(text_node))
+
+    capacity = max(0, capacity)
+    available = max(0, available)
+    total = max(available, total)
+    return available, total, capacity
+
+
+def build_snapshot(village_id: Optional[int], dorf1_soup, fetched_at: Optional[float] = None) -> VillageSnapshot:
+    """Parse everything dorf1 carries into a snapshot (marketplace fields stay None)."""
+    resources, capacities, production, free_crop = parse_resource_bar(dorf1_soup)
+    troops, hero_home = parse_troops(dorf1_soup)
+    return VillageSnapshot(
+        village_id=village_id,
+        fetched_at=time.time() if fetched_at is None else float(fetched_at),
+        resources=resources,
+        capacities=capacities,
+        production=production,
+        free_crop=free_crop,
+        build_queue=parse_build_queue(dorf1_soup),
+        troops=troops,
+        hero_home=hero_home,
+    )
@@ -1,8 +1,8 @@
-import time
 import random
 import threading
 import logging
 
+from core import clock
 from core.hero_manager import HeroManager
 
 try:
@@ -18,23 +18,23 @@ def run_hero_adventure_thread(api):
     while True:
         try:
             if not bool(getattr(settings, "HERO_ADVENTURE_ENABLE", True)):
-                time.sleep(60)
+                clock.sleep(60)
                 continue
 
             hero = HeroManager(api)
             st = hero.fetch_hero_status()
             if not st or not st.is_present:
                 # Hero missing → wait longer
-                time.sleep(120)
+                clock.sleep(120)
                 continue
             if st.is_on_mission:
                 # On adventure/mission already
-                time.sleep(90)
+                clock.sleep(90)
                 continue
 
             min_health = int(getattr(settings, "HERO_ADVENTURE_MIN_HEALTH", 40))
             if isinstance(st.health, (int, float)) and st.health < min_health:
-                time.sleep(180)
+                clock.sleep(180)
                 continue
 
             advs = api.list_hero_adventures() or []
@@ -57,7 +57,7 @@ def run_hero_adventure_thread(api):
                     if api.start_hero_adventure(chosen):
                         logging.info("[HeroAdv] ✅ Adventure started by thread.")
                         # Let the hero depart; sleep a bit longer
-                        time.sleep(120)
+                        clock.sleep(120)
                         continue
                     else:
                         logging.info("[HeroAdv] ❌ Could not start adventure.")
@@ -65,8 +65,8 @@ def run_hero_adventure_thread(api):
             # No adventures or not eligible → sleep
             base = int(getattr(settings, "HERO_ADVENTURE_POLL_INTERVAL_SEC", 90))
             jit = int(getattr(settings, "HERO_ADVENTURE_RANDOM_JITTER_SEC", 45))
-            time.sleep(max(30, base + random.randint(-jit, jit)))
+            clock.sleep(max(30, base + random.randint(-jit, jit)))
         except Exception as e:
             logging.error(f"[HeroAdv] Thread exception: {e}")
-            time.sleep(120)
+            clock.sleep(120)
 
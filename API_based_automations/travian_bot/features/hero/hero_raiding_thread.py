@@ -2,11 +2,16 @@ import time
 import random
 import threading
 from datetime import datetime, time as dtime, timedelta
+from core import clock
 from core.hero_manager import HeroManager
 from core.database_helpers import load_latest_unoccupied_oases
 from core.hero_runner import try_send_hero_to_oasis
-from identity_handling.identity_helper import load_villages_from_identity
+from identity_handling.identity_helper import get_village_by_id, load_villages_from_identity
 from core.console import CONSOLE_LOCK, print_line
+from core.spatial_index import SpatialIndex
+
+# Hero only clears oases closer than this many tiles
+_HERO_MAX_OASIS_DISTANCE = 20
 
 
 def _parse_quiet_windows(raw) -> list[tuple[dtime, dtime]]:
@@ -108,14 +113,14 @@ def run_hero_raiding_thread(api):
         try:
             try:
                 if quiet_windows:
-                    remain = _remaining_quiet(datetime.now(), quiet_windows)
+                    remain = _remaining_quiet(clock.datetime_now(), quiet_windows)
                     if remain:
                         jitter = 0.0
                         if jitter_max > 0:
                             jitter = random.uniform(jitter_min, jitter_max)
                         wait_time = max(30, int(remain.total_seconds() + jitter))
                         safe_print(f"[HeroOasisClear] 💤 Quiet window active. Sleeping {wait_time} seconds before next hero check...")
-                        time.sleep(wait_time)
+                        clock.sleep(wait_time)
                         continue
             except Exception:
                 pass
@@ -127,21 +132,21 @@ def run_hero_raiding_thread(api):
                 safe_print("[HeroOasisClear] ❌ Failed to fetch hero status")
                 wait_time = 300 + random.randint(-30, 30)
                 safe_print(f"[HeroOasisClear] Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
                 continue
 
             if not status.is_present:
                 safe_print("[HeroOasisClear] ❌ Hero is not present.")
                 wait_time = 300 + random.randint(-30, 30)
                 safe_print(f"[HeroOasisClear] Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
                 continue
 
             if status.health is not None and status.health < 20:
                 safe_print(f"[HeroOasisClear] ⚠️ Hero health too low ({status.health}%)")
                 wait_time = 300 + random.randint(-30, 30)
                 safe_print(f"[HeroOasisClear] Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
                 continue
 
             if status.is_on_mission:
@@ -156,43 +161,38 @@ def run_hero_raiding_thread(api):
                     if not eta:
                         remain = api.get_hero_return_eta()
                         if isinstance(remain, int) and remain > 0:
-                            eta = time.time() + remain
-                    if eta and eta > time.time():
-                        wait_time = int(eta - time.time())
+                            eta = clock.now() + remain
+                    if eta and eta > clock.now():
+                        wait_time = int(eta - clock.now())
                         safe_print(f"[HeroOasisClear] ❌ On mission. Sleeping until ETA (~{wait_time} sec)…")
-                        time.sleep(max(30, wait_time))
+                        clock.sleep(max(30, wait_time))
                         continue
                 except Exception:
                     pass
                 safe_print("[HeroOasisClear] ❌ Hero is on a mission.")
                 wait_time = 600 + random.randint(-60, 60)
                 safe_print(f"[HeroOasisClear] Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
                 continue
 
             if not status.current_village_id:
                 safe_print("[HeroOasisClear] ❌ No current village information.")
                 wait_time = 300 + random.randint(-30, 30)
                 safe_print(f"[HeroRaider] Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
                 continue
 
-            safe_print("[HeroOasisClear] Loading villages from identity...")
-            villages = load_villages_from_identity()
-            current_village = None
-            for village in villages:
-                if str(village["village_id"]) == str(status.current_village_id):
-                    current_village = village
-                    break
+            current_village = get_village_by_id(status.current_village_id)
 
             if not current_village:
+                villages = load_villages_from_identity()
                 safe_print(f"[HeroOasisClear] ⚠️ Hero is in village {status.current_village_id} which is not in your identity.")
                 safe_print("[HeroOasisClear] Available villages in identity:")
                 for v in villages:
                     safe_print(f"[HeroOasisClear] - {v['village_name']} (ID: {v['village_id']})")
                 wait_time = 300 + random.randint(-30, 30)
                 safe_print(f"[HeroOasisClear] Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
                 continue
 
             # Debug: Print hero status and current village details
@@ -205,29 +205,17 @@ def run_hero_raiding_thread(api):
                 safe_print("[HeroOasisClear] ❌ No unoccupied oases found in latest scan.")
                 wait_time = 300 + random.randint(-30, 30)
                 safe_print(f"[HeroOasisClear] Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
                 continue
 
             safe_print("[HeroOasisClear] Ordering candidates by distance (nearest first)…")
-            # Build nearest-first candidate list using stored distances; fallback to Euclidean if missing
-            def _euclid(ax, ay, bx, by):
-                try:
-                    return ((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5
-                except Exception:
-                    return 9999.0
-            candidates = []
-            for coord_key, tile in (oases or {}).items():
-                try:
-                    x_str, y_str = coord_key.split("_")
-                    x_i, y_i = int(x_str), int(y_str)
-                except Exception:
-                    continue
-                d = tile.get("distance")
-                if not isinstance(d, (int, float)):
-                    d = _euclid(current_village['x'], current_village['y'], x_i, y_i)
-                candidates.append((d, {"x": x_i, "y": y_i}))
-            candidates = [c for c in candidates if c[0] < 20]
-            candidates.sort(key=lambda t: t[0])
+            # Nearest-first candidates within hero range via the shared spatial index
+            index = SpatialIndex.from_coord_keys((oases or {}).keys())
+            candidates = [
+                (d, {"x": x_i, "y": y_i})
+                for d, x_i, y_i, _key in index.within_radius(current_village['x'], current_village['y'], _HERO_MAX_OASIS_DISTANCE)
+                if d < _HERO_MAX_OASIS_DISTANCE
+            ]
             # Log a short preview of nearest distances
             try:
                 preview = ", ".join([f"({c[1]['x']},{c[1]['y']}) {c[0]:.1f}t" for c in candidates[:5]])
@@ -258,7 +246,7 @@ def run_hero_raiding_thread(api):
                 if try_send_hero_to_oasis(api, current_village, oasis):
                     safe_print(f"[HeroOasisClear] ✅ Hero sent to oasis at ({oasis['x']}, {oasis['y']})")
                     # Verify on rally point that hero is on mission; avoid false positives where only escort left
-                    time.sleep(2)
+                    clock.sleep(2)
                     remain = None
                     try:
                         remain = api.get_hero_return_eta()
@@ -270,14 +258,14 @@ def run_hero_raiding_thread(api):
                         break
                     # Persist ETA to avoid frequent polling while on mission
                     try:
-                        eta = time.time() + remain + random.randint(60, 120)
+                        eta = clock.now() + remain + random.randint(60, 120)
                         eta_path.parent.mkdir(parents=True, exist_ok=True)
                         import json as _json
                         eta_path.write_text(_json.dumps({"return_epoch": int(eta)}, ensure_ascii=False, indent=2), encoding='utf-8')
                     except Exception:
                         pass
                     safe_print(f"[HeroOasisClear] Hero will return in {remain / 3600:.2f} hours.")
-                    time.sleep(remain + random.randint(60, 120))
+                    clock.sleep(remain + random.randint(60, 120))
                     sent = True
                     break
                 # If send failed (incl. onvoldoende escorts), just fall back to next nearest automatically
@@ -285,8 +273,8 @@ def run_hero_raiding_thread(api):
                 safe_print("[HeroOasisClear] ❌ Failed to send hero — no feasible oasis with current escorts.")
                 wait_time = 300 + random.randint(-30, 30)
                 safe_print(f"[HeroOasisClear] Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
         except Exception as e:
             safe_print(f"[HeroOasisClear] Exception: {e}")
             safe_print("[HeroOasisClear] Waiting 300 seconds before retry...")
-            time.sleep(300) 
+            clock.sleep(300) 
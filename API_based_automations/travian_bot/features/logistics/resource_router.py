@@ -5,7 +5,6 @@ from __future__ import annotations
 import json
 import logging
 import math
-import re
 import time
 from dataclasses import dataclass
 from pathlib import Path
@@ -13,7 +12,7 @@ from typing import Iterable
 
 from bs4 import BeautifulSoup
 
-from features.build.resource_balancer import RESOURCE_TYPES
+from core.village_snapshot import RESOURCE_TYPES, parse_market_data as _parse_market_data
 
 try:
     from config.config import settings
@@ -29,7 +28,6 @@ except Exception:  # pragma: no cover - fallback when config import fails
     settings = _Cfg()
 
 from identity_handling.identity_helper import load_villages_from_identity
-from features.build import resource_balancer as balancer
 
 
 LOG = logging.getLogger("travian")
@@ -76,60 +74,6 @@ def _save_state(state: dict) -> None:
         LOG.debug("[ResourceRouter] Failed to persist state: %s", exc)
 
 
-def _extract_int(text: str | None) -> int:
-    if not text:
-        return 0
-    m = re.search(r"(-?\d+)", text)
-    return int(m.group(1)) if m else 0
-
-
-def _parse_market_data(html: str, soup: BeautifulSoup) -> tuple[int, int, int]:
-    available = 0
-    total = 0
-    capacity = 0
-
-    for pattern in (r"\"availableMerchants\"\s*:\s*(\d+)", r"availableMerchants\s*=\s*(\d+)"):
-        m = re.search(pattern, html)
-        if m:
-            available = int(m.group(1))
-            break
-
-    for pattern in (r"\"totalMerchants\"\s*:\s*(\d+)", r"totalMerchants\s*=\s*(\d+)"):
-        m = re.search(pattern, html)
-        if m:
-            total = int(m.group(1))
-            break
-
-    for pattern in (
-        r"\"merchantCapacity\"\s*:\s*(\d+)",
-        r"capacityPerMerchant\s*[:=]\s*(\d+)",
-    ):
-        m = re.search(pattern, html)
-        if m:
-            capacity = int(m.group(1))
-            break
-
-    if not available:
-        node = soup.find(id="merchantsAvailable") or soup.find(class_=re.compile("merchantsAvailable"))
-        if node:
-            available = _extract_int(node.get_text(" ", strip=True))
-
-    if not total:
-        node = soup.find(id="merchantsTotal") or soup.find(class_=re.compile("merchantsTotal"))
-        if node:
-            total = _extract_int(node.get_text(" ", strip=True))
-
-    if not capacity:
-        text_node = soup.find(string=re.compile("per merchant", re.IGNORECASE))
-        if text_node:
-            capacity = _extract_int(str(text_node))
-
-    capacity = max(0, capacity)
-    available = max(0, available)
-    total = max(available, total)
-    return available, total, capacity
-
-
 def _fetch_market_page(api):
     res = api.session.get(f"{api.server_url}/build.php?gid=17")
     res.raise_for_status()
@@ -263,12 +207,7 @@ def _gather_village_states(api) -> list[VillageState]:
         if village_id <= 0:
             continue
         try:
-            api.switch_village(village_id)
-        except Exception:
-            continue
-        try:
-            resources, capacities, _queue = balancer._load_village_state(api)
-            available, total, capacity, _soup, _html = _fetch_market_page(api)
+            snapshot = api.get_village_snapshot(village_id, with_market=True)
         except Exception as exc:
             LOG.debug("[ResourceRouter] Kon staat niet ophalen voor dorp %s: %s", village_id, exc)
             continue
@@ -278,11 +217,11 @@ def _gather_village_states(api) -> list[VillageState]:
                 name=str(village.get("village_name") or village_id),
                 x=int(village.get("x", 0)),
                 y=int(village.get("y", 0)),
-                resources=resources,
-                capacities=capacities,
-                merchants_total=total,
-                merchants_available=available,
-                merchant_capacity=capacity,
+                resources=dict(snapshot.resources),
+                capacities=dict(snapshot.capacities),
+                merchants_total=int(snapshot.merchants_total or 0),
+                merchants_available=int(snapshot.merchants_available or 0),
+                merchant_capacity=int(snapshot.merchant_capacity or 0),
             )
         )
     return states
@@ -1,7 +1,7 @@
 from identity_handling.login import login
 from identity_handling.identity_helper import load_villages_from_identity, choose_village_to_scan
 from core.travian_api import TravianAPI
-from core.full_map_scanner import full_map_scan
+from core.full_map_scanner import full_map_scan, incremental_map_scan
 from analysis.full_scan_oasis_analysis import extract_unoccupied_oases
 import time
 
@@ -12,6 +12,7 @@ def scan_map_for_oases(
     default_radius: int = 25,
     prompt_radius: bool = True,
     disable_humanizer: bool = False,
+    incremental: bool = False,
 ) -> None:
     """Run a map scan for unoccupied oases.
 
@@ -19,6 +20,7 @@ def scan_map_for_oases(
         api: Logged-in Travian API client.
         default_radius: Radius to use when the user skips input (tiles).
         prompt_radius: Whether to ask the user for a custom radius.
+        incremental: Only refetch tiles whose stored copy expired (see MAP_RESCAN_*).
     """
     # Try to load villages, else inform user to run identity setup
     try:
@@ -42,7 +44,10 @@ def scan_map_for_oases(
             scan_radius = default_radius
 
     total_tiles = (scan_radius * 2 + 1) ** 2
-    print(f"[i] This scan will request {total_tiles} tiles.")
+    if incremental:
+        print(f"[i] Incremental rescan of {total_tiles} tiles; only expired tiles are requested.")
+    else:
+        print(f"[i] This scan will request {total_tiles} tiles.")
 
     humanizer_toggled = False
     if disable_humanizer and hasattr(api, "set_humanizer"):
@@ -56,8 +61,12 @@ def scan_map_for_oases(
     start_time = time.time()
     try:
         # Full map scan
-        print(f"[+] Starting full map scan around ({village_x}, {village_y}) with radius {scan_radius}...")
-        scan_path = full_map_scan(api, village_x, village_y, scan_radius)
+        if incremental:
+            print(f"[+] Starting incremental map rescan around ({village_x}, {village_y}) with radius {scan_radius}...")
+            scan_path = incremental_map_scan(api, village_x, village_y, scan_radius)
+        else:
+            print(f"[+] Starting full map scan around ({village_x}, {village_y}) with radius {scan_radius}...")
+            scan_path = full_map_scan(api, village_x, village_y, scan_radius)
 
         # Oasis extraction
         print("[+] Extracting unoccupied oases from scan data...")
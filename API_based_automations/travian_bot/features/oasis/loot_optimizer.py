@@ -0,0 +1,126 @@
+"""Loot-per-troop-hour assignment of the troop bank over due oasis targets.
+
+The default raider walks due targets nearest-first and sends whatever each
+distance range prescribes until the bank runs dry. This module instead picks the
+set of (target, range composition) options that maximizes expected loot per hour
+of troop time, using what the LearningStore learned about each target:
+
+    rate   = expected_loot / round_trip_hours          (loot/hour while the group is out)
+    weight = troops in the composition                  (what it costs from the bank)
+
+Greedy by rate per troop (loot per troop-hour), then a bounded local search that
+swaps a chosen option for better unchosen ones (1-for-1 and 1-for-many) as long as
+the bank allows. Runs within a small time budget; hundreds of targets take a few ms.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from features.oasis.troop_vectors import fits, take
+
+
+@dataclass(slots=True)
+class RaidOption:
+    coords: str
+    range_idx: int
+    distance: float
+    need: tuple[int, ...]                # units per slot t1..t10 (see troop_vectors)
+    hours: float                         # round trip at x1 speed (only used relatively)
+    loot: Optional[float] = None         # expected loot per raid; None = no history
+    troops: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.troops = max(1, sum(self.need))
+
+    @property
+    def rate(self) -> float:
+        return (self.loot or 0.0) / max(self.hours, 1e-6)
+
+    @property
+    def density(self) -> float:
+        """Loot per troop-hour."""
+        return self.rate / self.troops
+
+
+def expected_loot(baseline: dict) -> Optional[float]:
+    """Average haul per returned raid, discounted by the average troop loss; None without history."""
+    try:
+        attempts = int(baseline.get("attempts", 0) or 0)
+        total = int(baseline.get("total_loot_total", 0) or 0)
+    except Exception:
+        return None
+    if attempts <= 0 or total <= 0:
+        return None
+    avg_loss = baseline.get("avg_loss_pct")
+    loss = min(1.0, max(0.0, float(avg_loss))) if isinstance(avg_loss, (int, float)) else 0.0
+    return (total / attempts) * (1.0 - loss)
+
+
+def round_trip_hours(distance: float, slowest_speed: Optional[float]) -> float:
+    speed = slowest_speed if slowest_speed and slowest_speed > 0 else 6.0
+    return 2.0 * max(float(distance), 0.5) / speed
+
+
+def _give(need: Sequence[int], bank: list[int]) -> None:
+    for i, n in enumerate(need):
+        bank[i] += n
+
+
+def plan_raids(
+    options: list[RaidOption],
+    bank: Sequence[int],
+    time_budget_ms: float = 20.0,
+) -> Optional[list[RaidOption]]:
+    """Chosen options (at most one per target), best loot/troop-hour first.
+
+    Returns None when no option has loot history, so the caller keeps its
+    nearest-first ordering. Targets without history get the median rate per troop
+    of the known ones, so new oases still get explored.
+    """
+    known = sorted(o.density for o in options if o.loot is not None)
+    if not known:
+        return None
+    prior_density = known[len(known) // 2]
+    for o in options:
+        if o.loot is None:
+            o.loot = prior_density * o.troops * max(o.hours, 1e-6)
+
+    deadline = time.perf_counter() + max(1.0, float(time_budget_ms)) / 1000.0
+    remaining = [max(0, int(v or 0)) for v in bank]
+    # Nearest first as tie-breaker keeps the old behaviour for equal scores
+    ranked = sorted(options, key=lambda o: (-o.density, o.distance))
+
+    chosen: dict[str, RaidOption] = {}
+    for o in ranked:
+        if o.coords not in chosen and fits(o.need, remaining):
+            chosen[o.coords] = o
+            take(o.need, remaining)
+
+    # Local search: drop one chosen option, refill greedily; keep it when total rate improves
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for out in sorted(chosen.values(), key=lambda o: o.rate):
+            if time.perf_counter() >= deadline:
+                break
+            trial_bank = list(remaining)
+            _give(out.need, trial_bank)
+            added: dict[str, RaidOption] = {}
+            gain = -out.rate
+            for o in ranked:
+                if o.coords in chosen or o.coords in added:
+                    continue
+                if fits(o.need, trial_bank):
+                    take(o.need, trial_bank)
+                    added[o.coords] = o
+                    gain += o.rate
+            if gain > 1e-9 and added:
+                del chosen[out.coords]
+                chosen.update(added)
+                remaining = trial_bank
+                improved = True
+                break
+
+    return sorted(chosen.values(), key=lambda o: (-o.density, o.distance))
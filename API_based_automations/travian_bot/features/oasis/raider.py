@@ -1,7 +1,10 @@
+import json
 import logging
 import time
+from dataclasses import dataclass
 from random import uniform
 from features.oasis.validator import is_valid_unoccupied_oasis
+from core import clock
 from core.learning_store import LearningStore
 from core.rally_tracker import enqueue_pending_raid
 try:
@@ -11,7 +14,9 @@ except Exception:
         LEARNING_ENABLE = True
     _cfg = _CfgFallback()
 from core.metrics import add_sent, add_skip
-from core.unit_catalog import FACTION_TO_TRIBE, resolve_label_t, t_to_u, u_to_t
+from core.spatial_index import SpatialIndex
+from core.unit_catalog import FACTION_TO_TRIBE, resolve_label_t
+from features.oasis.troop_vectors import CompiledPlan, bank_vector, fits, shortfall, take
 
 def resolve_unit_name(tribe_id: int, unit_code: str) -> str:
     # Use central catalog label with local slot code
@@ -38,6 +43,50 @@ def get_range_index_for_distance(distance, distance_ranges):
             continue
     return -1
 
+@dataclass(slots=True)
+class _InRangeView:
+    """Targets of one village within max_raid_distance, keyed like the learning store ('(x,y)')."""
+    signature: tuple
+    oases: dict
+    targets: dict[str, tuple[float, str]]     # key -> (distance, scan coords 'x_y')
+    keys: frozenset
+    unseen: list[str]                         # keys without a store entry yet (due now)
+
+
+# village id -> in-range view; rebuilt only when the origin, radius or scanned tiles change
+_IN_RANGE_VIEWS: dict = {}
+
+
+def _in_range_view(village_id, oases, village_x, village_y, max_raid_distance, origin_known) -> _InRangeView:
+    signature = (village_x, village_y, float(max_raid_distance), origin_known)
+    view = _IN_RANGE_VIEWS.get(village_id)
+    if view is not None and view.signature == signature and (view.oases is oases or view.oases.keys() == oases.keys()):
+        view.oases = oases
+        return view
+
+    # Nearest-first within max_raid_distance: via the shared spatial index when the village
+    # is known, else on the distances stored with the scan (the fallback origin is just a
+    # target tile, not the village)
+    if origin_known:
+        target_index = SpatialIndex.from_coord_keys(oases.keys())
+        in_range = target_index.within_radius(village_x, village_y, float(max_raid_distance))
+    else:
+        in_range = []
+        for coords, tile in oases.items():
+            try:
+                stored = float(tile.get("distance", float("inf")))
+                x_i, y_i = (int(v) for v in coords.split("_"))
+            except Exception:
+                continue
+            if stored <= float(max_raid_distance):
+                in_range.append((stored, x_i, y_i, coords))
+    targets = {f"({x_i},{y_i})": (dist, coords) for dist, x_i, y_i, coords in in_range}
+    ls = LearningStore.shared()
+    view = _InRangeView(signature, oases, targets, frozenset(targets),
+                        [k for k in targets if ls.get_due_at(k) is None])
+    _IN_RANGE_VIEWS[village_id] = view
+    return view
+
 def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=False, hero_available=False, priority_only: bool = False):
     """
     Execute a batch of raids on oases based on the raid plan.
@@ -56,12 +105,13 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
     distance_ranges = raid_plan.get("distance_ranges", [])
 
     # Resolve village coordinates from identity using provided village_id
+    origin_known = False
     try:
-        from identity_handling.identity_helper import load_villages_from_identity
-        _villages = load_villages_from_identity() or []
-        _match = next((v for v in _villages if str(v.get("village_id")) == str(village_id)), None)
+        from identity_handling.identity_helper import get_village_by_id
+        _match = get_village_by_id(village_id)
         if _match is not None:
             village_x, village_y = int(_match.get("x")), int(_match.get("y"))
+            origin_known = True
         else:
             # Fallback: best-effort derive from scan payload (pick nearest oasis and assume distances are relative)
             first = next(iter(oases.keys()))
@@ -76,7 +126,7 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
     logging.info(f"Maximum raid distance: {max_raid_distance} tiles")
     use_learning = bool(getattr(_cfg, 'LEARNING_ENABLE', True))
     # Always keep a scheduling store for last_sent timestamps, independent of learning
-    ls = LearningStore()
+    ls = LearningStore.shared()
 
     # Get current troops
     troops_info = api.get_troops_in_village()
@@ -84,31 +134,10 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
         logging.error("Could not fetch troops. Exiting.")
         return sent_raids
 
-    # Helper: can current troop bank satisfy at least one distance range combo?
-    def _can_satisfy_any_range_with_bank(bank: dict) -> bool:
-        for dr in (distance_ranges or []):
-            reqs = {}
-            try:
-                for u in (dr.get("units") or []):
-                    uc = str(u.get("unit_code"))
-                    gs = int(u.get("group_size", 0))
-                    if gs <= 0:
-                        continue
-                    reqs[uc] = reqs.get(uc, 0) + gs
-                if not reqs:
-                    continue
-                ok = True
-                for uc, need in reqs.items():
-                    key_u = t_to_u(tribe_id, uc)
-                    have = int(bank.get(key_u, bank.get(uc, 0)) or 0)
-                    if have < need:
-                        ok = False
-                        break
-                if ok:
-                    return True
-            except Exception:
-                continue
-        return False
+    # Compile the plan once per batch: per-range requirement vectors and a slot-vector
+    # troop bank that is updated in place after every send
+    compiled = CompiledPlan(distance_ranges, tribe_id)
+    bank = bank_vector(troops_info, tribe_id)
 
     # Optional early exit: if troop bank cannot satisfy any distance range composition
     try:
@@ -116,25 +145,12 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
     except Exception:
         early_exit_on_insufficient = True
     if early_exit_on_insufficient:
-        if not _can_satisfy_any_range_with_bank(troops_info):
-            try:
-                # Determine a minimal required sum for messaging only
-                min_need = None
-                for dr in (distance_ranges or []):
-                    total = 0
-                    for u in (dr.get("units") or []):
-                        gs = int(u.get("group_size", 0))
-                        if gs > 0:
-                            total += gs
-                    if total > 0:
-                        min_need = total if min_need is None else min(min_need, total)
-                bank = sum(int(v) for v in troops_info.values() if isinstance(v, int))
-                if min_need is not None:
-                    logging.info(f"[Oasis] Insufficient troop bank: need ≥ {min_need}, have {bank}. Skipping oasis loop.")
-                else:
-                    logging.info("[Oasis] Insufficient troop bank for any configured range. Skipping oasis loop.")
-            except Exception:
-                logging.info("[Oasis] Insufficient troop bank. Skipping oasis loop.")
+        if not compiled.any_satisfiable(bank):
+            min_need = compiled.min_total()
+            if min_need is not None:
+                logging.info(f"[Oasis] Insufficient troop bank: need ≥ {min_need}, have {sum(bank)}. Skipping oasis loop.")
+            else:
+                logging.info("[Oasis] Insufficient troop bank for any configured range. Skipping oasis loop.")
             return sent_raids
 
     # Build scheduling view: due based on last_sent and interval+jitter
@@ -147,65 +163,29 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
     except Exception:
         tgt_interval, jitter, cooldown_lost = 600, 60, 1800
 
-    now = time.time()
+    now = clock.now()
     sched = []
-    def _min_required_for_unit(unit_code: str, group: int, base_group: int) -> int:
-        norm = u_to_t(unit_code) or unit_code
-        if norm == "t1" and group < 2:
-            target = max(2, base_group)
-            return target
-        return group
-
-    for coords, tile in oases.items():
-        x_str, y_str = coords.split("_")
-        x_i, y_i = int(x_str), int(y_str)
-        key = f"({x_i},{y_i})"
-        pause_until = ls.get_pause_until(key) if ls else None
-        priority_until = ls.get_priority_until(key) if ls else None
+
+    # Eligibility comes from the store's due index:
+    # max(last_sent + interval, pause end, cooldown after a loss when learning is on)
+    ls.configure_due_index(tgt_interval, cooldown_lost if use_learning else 0.0)
+    view = _in_range_view(village_id, oases, village_x, village_y, max_raid_distance, origin_known)
+
+    # Due targets straight from the store's index, limited to this village's range; targets the
+    # store has never seen are due now. Paused or cooling-down targets are simply not due.
+    view.unseen = [k for k in view.unseen if ls.get_due_at(k) is None]
+    due_keys = [k for k in ls.due_targets(now) if k in view.targets] + view.unseen
+    for key in due_keys:
         if priority_only:
+            priority_until = ls.get_priority_until(key)
             if not priority_until or float(priority_until) <= now:
                 continue
-        if pause_until and float(pause_until) > now:
-            try:
-                remain = max(0, float(pause_until) - now)
-                logging.info(
-                    f"[Oasis] Paused target {key} for another {remain/60:.1f} minute(s); skipping.")
-            except Exception:
-                logging.info(f"[Oasis] Paused target {key}; skipping.")
-            continue
-        # Ensure numeric distance for sorting
-        try:
-            dist = float(tile.get("distance", float("inf")))
-        except Exception:
-            dist = float("inf")
-        # Cooldown on recent loss
-        if use_learning and ls:
-            try:
-                base = ls.get_baseline(key)
-                last_r = (base or {}).get("last_result")
-                last_ts = (base or {}).get("last_ts")
-                if last_r == 'lost' and isinstance(last_ts, str):
-                    # Convert ISO to epoch
-                    try:
-                        import datetime as _dt
-                        t = _dt.datetime.strptime(last_ts, "%Y-%m-%dT%H:%M:%SZ")
-                        if (now - t.timestamp()) < cooldown_lost:
-                            # Skip for now
-                            continue
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-        # Scheduler: last_sent tracking is independent of learning
-        last_sent = ls.get_last_sent(key)
-        # Next due; negative means overdue, 0 means due now; None (never) treated as due now
-        if last_sent is None:
-            due_val = 0.0
-        else:
-            due_val = float(last_sent + tgt_interval - now)
-        sched.append((due_val, coords, dist))
-    # Snapshot full schedule BEFORE filtering (used to persist next upcoming due time)
-    sched_all = list(sched)
+        dist, coords = view.targets[key]
+        if origin_known:
+            oases[coords]["distance"] = dist
+        sched.append((0.0, coords, dist))
+    # Earliest upcoming due time among this village's targets (persisted below as a countdown hint)
+    next_due_epoch = ls.next_due_at(now, keys=view.keys)
 
     # Optionally force focus on the nearest oasis only
     try:
@@ -241,27 +221,7 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
             pass
 
         # === PATCH: filter due targets op ranges die haalbaar zijn met huidige troepen ===
-        def _range_satisfiable(dr: dict, bank: dict, tribe_id: int) -> bool:
-            try:
-                for u in (dr.get("units") or []):
-                    uc = str(u.get("unit_code"))
-                    need = int(u.get("group_size", 0))
-                    if need <= 0:
-                        continue
-                    from core.unit_catalog import t_to_u, u_to_t
-                    uc_local = u_to_t(uc) or uc  # accepteer zowel uNN als tX codes
-                    key_u = t_to_u(tribe_id, uc_local)
-                    have = int(bank.get(key_u, bank.get(uc, 0)) or 0)
-                    if have < need:
-                        return False
-                return True
-            except Exception:
-                return False
-
-        satisfiable_ranges = []
-        for dr in (distance_ranges or []):
-            if _range_satisfiable(dr, troops_info, tribe_id):
-                satisfiable_ranges.append((float(dr.get("start", 0)), float(dr.get("end", 0))))
+        satisfiable_ranges = compiled.satisfiable_spans(bank)
 
         if satisfiable_ranges:
             try:
@@ -284,19 +244,55 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
 
     ordered_targets = [(coords, oases[coords]) for _, coords, _ in sched]
 
+    # Optional: allocate the troop bank by expected loot per troop-hour instead of nearest-first
+    planned_ranges: dict[str, int] = {}
+    raid_mode = str(getattr(_cfg, 'OASIS_RAID_MODE', 'nearest') or 'nearest').strip().lower()
+    if raid_mode == "loot_per_hour" and use_learning and not always_nearest_only and ordered_targets:
+        try:
+            from features.oasis.loot_optimizer import RaidOption, expected_loot, plan_raids, round_trip_hours
+            from core.unit_catalog import unit_speed
+            t_opt = time.perf_counter()
+            options = []
+            for coords, tile in ordered_targets:
+                distance = float(tile["distance"])
+                cx, cy = coords.split("_")
+                key = f"({int(cx)},{int(cy)})"
+                mul = float(ls.get_multiplier(key))
+                loot = expected_loot(ls.get_baseline(key))
+                # Every range containing the distance is an option (first = default, later = promotion)
+                for idx in compiled.indexes_for_distance(distance):
+                    need = compiled.adjusted(idx, mul)
+                    if not any(need):
+                        continue
+                    speeds = [unit_speed(tribe_id, f"t{i + 1}") for i, n in enumerate(need) if n]
+                    speeds = [sp for sp in speeds if sp]
+                    hours = round_trip_hours(distance, min(speeds) if speeds else None)
+                    options.append(RaidOption(coords, idx, distance, need, hours, loot))
+            plan = plan_raids(options, list(bank), float(getattr(_cfg, 'OASIS_OPTIMIZER_TIME_BUDGET_MS', 20.0)))
+            if plan is None:
+                logging.info("[Oasis] Loot optimizer: no loot history yet; keeping nearest-first order.")
+            else:
+                ordered_targets = [(o.coords, oases[o.coords]) for o in plan]
+                planned_ranges = {o.coords: o.range_idx for o in plan}
+                logging.info(
+                    f"[Oasis] Loot optimizer picked {len(plan)}/{len(options)} option(s) in "
+                    f"{(time.perf_counter() - t_opt) * 1000:.1f} ms; expected {sum(o.rate for o in plan):.0f} loot/h."
+                )
+        except Exception as e:
+            logging.warning(f"[Oasis] Loot optimizer failed ({e}); keeping nearest-first order.")
+
     # Persist the earliest upcoming due time for a simple external countdown
     try:
         import time as _t
         from pathlib import Path as _P
-        # Use the full, unfiltered schedule to compute the NEXT due time (>0 only),
-        # so that even when some are due now (<=0) we still expose the upcoming future due.
-        upcoming = [float(d) for (d, _, _) in sched_all if isinstance(d, (int, float)) and float(d) > 0.0]
-        next_due_sec = min(upcoming) if upcoming else 0.0
+        # Next due time from the index (>0 only), so that even when some are due
+        # now (<=0) we still expose the upcoming future due.
+        next_due_sec = max(0.0, float(next_due_epoch) - now) if next_due_epoch else 0.0
         payload = {
             "village": {"x": village_x, "y": village_y, "id": village_id},
-            "generated": int(_t.time()),
+            "generated": int(clock.now()),
             "next_due_sec": float(next_due_sec),
-            "next_due_epoch": int(_t.time() + max(0.0, float(next_due_sec)))
+            "next_due_epoch": int(clock.now() + max(0.0, float(next_due_sec)))
         }
         p = _P("database/runtime_next_oasis_due.json")
         p.parent.mkdir(parents=True, exist_ok=True)
@@ -306,7 +302,7 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
         # Also log a human-friendly hint for when the next EmptyOasisRaider batch is expected
         if next_due_sec and next_due_sec > 0:
             try:
-                eta_epoch = int(_t.time() + int(next_due_sec))
+                eta_epoch = int(clock.now() + int(next_due_sec))
                 mm, ss = divmod(int(next_due_sec), 60)
                 # show H:MM:SS if long
                 if mm >= 60:
@@ -334,13 +330,6 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
             logging.info(f"Reached maximum raid distance ({max_raid_distance} tiles). Stopping raids.")
             break
 
-        # Get appropriate unit combination for this distance
-        units = get_units_for_distance(distance, distance_ranges)
-        if not units:
-            logging.info(f"No unit combination defined for distance {distance:.1f}. Skipping.")
-            add_skip("no_unit_combo")
-            continue
-
         x_str, y_str = coords.split("_")
         x, y = int(x_str), int(y_str)
         key = f"({x},{y})"
@@ -398,31 +387,22 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
                     logging.info(f"[Schedule] {key}: last_sent=never; target_interval={_fmt_sec(tgt_interval)}; due now")
             except Exception:
                 pass
-        base_total = sum(int(u.get("group_size", 0)) for u in units)
-        # Adjust per-unit composition with multiplier, enforce floors per unit type
-        adjusted_units = []
-        for u in units:
-            base_g = int(u.get("group_size", 0))
-            adj_g = int(round(base_g * mul)) if base_g > 0 else 0
-            if base_g > 0 and adj_g <= 0:
-                adj_g = 1
-            adj_g = _min_required_for_unit(u["unit_code"], adj_g, base_g)
-            adjusted_units.append({"unit_code": u["unit_code"], "base_group": base_g, "adj_group": adj_g})
-
-        # Check if we have enough troops for adjusted combination
-        can_raid = True
-        for au in adjusted_units:
-            uc = str(au["unit_code"])  # may be 'tX' or legacy 'uNN'
-            uc_local = u_to_t(uc) or uc  # normalize to local slot if given as uNN
-            key_u = t_to_u(tribe_id, uc_local)
-            need = int(au["adj_group"])
-            have = int(troops_info.get(key_u, troops_info.get(uc, 0)))
-            if need > have:
-                can_raid = False
-                logging.info(f"Not enough {resolve_unit_name(tribe_id, uc_local)} (need {need}, have {have}) for distance {distance:.1f}. Skipping.")
-                add_skip("insufficient_troops")
-                break
-        if not can_raid:
+        range_idxs = compiled.indexes_for_distance(distance)
+        range_idx = planned_ranges.get(coords, range_idxs[0] if range_idxs else -1)
+        if range_idx < 0:
+            logging.info(f"No unit combination defined for distance {distance:.1f}. Skipping.")
+            add_skip("no_unit_combo")
+            continue
+        # Requirement vector with multiplier and per-unit floors; one comparison against the bank
+        need = compiled.adjusted(range_idx, mul)
+        if not any(need):
+            logging.info(f"No unit combination defined for distance {distance:.1f}. Skipping.")
+            add_skip("no_unit_combo")
+            continue
+        short = shortfall(need, bank)
+        if short is not None:
+            logging.info(f"Not enough {resolve_unit_name(tribe_id, f't{short + 1}')} (need {need[short]}, have {bank[short]}) for distance {distance:.1f}. Skipping.")
+            add_skip("insufficient_troops")
             # Optionally promote to the next distance range, but ONLY if this target's
             # distance actually lies within that next range. Keeps ranges intact:
             # 0–10 stays Mercs-only; for <10 we never send Steppe.
@@ -432,51 +412,20 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
                 enable_promote = True
 
             promoted_used = False
-            if enable_promote and distance_ranges:
-                idx = get_range_index_for_distance(distance, distance_ranges)
-                if idx >= 0:
-                    for next_idx in range(idx + 1, len(distance_ranges)):
-                        next_range = distance_ranges[next_idx]
-                        try:
-                            nr_start = float(next_range.get('start', 0))
-                            nr_end = float(next_range.get('end', float('inf')))
-                        except Exception:
-                            nr_start, nr_end = 0.0, float('inf')
-                        if not (nr_start <= float(distance) < nr_end):
-                            continue  # target not in next range; do not promote for this target
-                        next_units = next_range.get('units') or []
-                        if not next_units:
-                            continue
-                        # Build adjusted units for the next range using the same multiplier
-                        next_adjusted = []
-                        for u in next_units:
-                            base_g = int(u.get('group_size', 0))
-                            adj_g = int(round(base_g * mul)) if base_g > 0 else 0
-                            if base_g > 0 and adj_g <= 0:
-                                adj_g = 1
-                            adj_g = _min_required_for_unit(u['unit_code'], adj_g, base_g)
-                            next_adjusted.append({"unit_code": u['unit_code'], "base_group": base_g, "adj_group": adj_g})
-                        # Check availability for promotion composition
-                        can_promote = True
-                        for au in next_adjusted:
-                            uc = str(au['unit_code'])
-                            uc_local = u_to_t(uc) or uc
-                            key_u = t_to_u(tribe_id, uc_local)
-                            need = int(au['adj_group'])
-                            have = int(troops_info.get(key_u, troops_info.get(uc, 0)))
-                            if need > have:
-                                can_promote = False
-                                break
-                        if can_promote:
-                            logging.info(f"[Promote] Current range insufficient → switching to next range {next_range.get('start')}-{next_range.get('end')} for distance {distance:.1f} (e.g., Steppe if defined).")
-                            adjusted_units = next_adjusted
-                            units = next_units
-                            promoted_used = True
-                            break
+            if enable_promote:
+                for next_idx in range_idxs:
+                    if next_idx <= range_idx or not compiled.ranges[next_idx].units:
+                        continue
+                    next_need = compiled.adjusted(next_idx, mul)
+                    if fits(next_need, bank):
+                        logging.info(f"[Promote] Current range insufficient → switching to next range {distance_ranges[next_idx].get('start')}-{distance_ranges[next_idx].get('end')} for distance {distance:.1f} (e.g., Steppe if defined).")
+                        range_idx, need = next_idx, next_need
+                        promoted_used = True
+                        break
             if not promoted_used:
                 insufficient_skips += 1
                 # Dynamic early-exit: if the remaining troop bank cannot satisfy any defined range, stop immediately
-                if early_exit_on_insufficient and not _can_satisfy_any_range_with_bank(troops_info):
+                if early_exit_on_insufficient and not compiled.any_satisfiable(bank):
                     logging.info("[Oasis] No viable unit combo with remaining troops; ending oasis loop early.")
                     break
                 # Respect configured cap to avoid long streaks of insufficient checks
@@ -485,23 +434,21 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
                     break
                 continue
 
+        base_need = compiled.ranges[range_idx].need
+        base_total = sum(base_need)
+
         # Validate oasis is raidable
         ok, why = is_valid_unoccupied_oasis(api, x, y, distance)
         if not ok:
             add_skip(f"invalid_oasis:{why}")
             continue
 
-        # Prepare raid setup with all units in the combination
-        raid_setup = {}
+        # Raid setup straight from the requirement vector (payload keys are this tribe's global uNN)
+        raid_setup = compiled.payload(need)
         logging.info(f"Using multiplier {mul:.2f} for oasis {key}")
-        for au in adjusted_units:
-            uc = str(au["unit_code"])  # plan code
-            uc_local = u_to_t(uc) or uc
-            # payload must be a global uNN for this tribe
-            upayload = t_to_u(tribe_id, uc_local)
-            raid_setup[upayload] = au["adj_group"]
-            unit_name = resolve_unit_name(tribe_id, uc_local)
-            logging.info(f"Adding {au['adj_group']} {unit_name} to raid (base {au['base_group']})")
+        for i, n in enumerate(need):
+            if n:
+                logging.info(f"Adding {n} {resolve_unit_name(tribe_id, f't{i + 1}')} to raid (base {base_need[i]})")
 
         logging.info(f"Launching raid on oasis at ({x}, {y})... Distance: {distance:.1f} tiles")
         try:
@@ -510,16 +457,16 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
             logging.error(f"❌ Failed to prepare raid to ({x}, {y}) — {e}")
             add_skip("send_failed")
             # Conservative: do not mutate local troop bank on failure
-            time.sleep(uniform(0.3, 0.8))
+            clock.sleep(uniform(0.3, 0.8))
             continue
         travel_time_sec = attack_info.get("travel_time_sec") if isinstance(attack_info, dict) else None
-        depart_epoch = time.time()
+        depart_epoch = clock.now()
         try:
             success = api.confirm_oasis_attack(attack_info, x, y, raid_setup, village_id)
         except Exception as e:
             logging.error(f"❌ Failed to send raid to ({x}, {y}) — {e}")
             add_skip("send_failed")
-            time.sleep(uniform(0.3, 0.8))
+            clock.sleep(uniform(0.3, 0.8))
             continue
 
         if success:
@@ -536,15 +483,10 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
                 pass
             # Log één pending entry voor deze raid zodat de report checker de multiplier kan bijstellen.
             # Omdat we hier een combinatie van units sturen, labelen we dit als 'mixed'.
-            adj_total = sum(int(a["adj_group"]) for a in adjusted_units)
+            adj_total = sum(need)
             if use_learning:
                 try:
-                    sent_units: dict[str, int] = {}
-                    for au in adjusted_units:
-                        uc = str(au["unit_code"])
-                        local_code = u_to_t(uc) or uc
-                        global_code = t_to_u(tribe_id, local_code)
-                        sent_units[global_code] = sent_units.get(global_code, 0) + int(au["adj_group"])
+                    sent_units = dict(raid_setup)
                     enqueue_pending_raid(
                         village_id=village_id,
                         target=key,
@@ -557,13 +499,7 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
                 except Exception as exc:
                     logging.debug(f"[Learning] Failed to queue rally tracker pending for {key}: {exc}")
             # Update available troops
-            for au in adjusted_units:
-                uc = au["unit_code"]
-                key_u = t_to_u(tribe_id, uc)
-                if key_u in troops_info:
-                    troops_info[key_u] = max(0, int(troops_info.get(key_u, 0)) - int(au["adj_group"]))
-                else:
-                    troops_info[uc] = max(0, int(troops_info.get(uc, 0)) - int(au["adj_group"]))
+            take(need, bank)
             sent_raids += 1
             if stop_after_first_success:
                 # In nearest-only mode, end the loop after the first successful send.
@@ -572,13 +508,13 @@ def run_raid_batch(api, raid_plan, faction, village_id, oases, hero_raiding=Fals
             logging.error(f"❌ Failed to send raid to ({x}, {y}) - Distance: {distance:.1f} tiles")
             add_skip("send_failed")
 
-        time.sleep(uniform(0.5, 1.2))
+        clock.sleep(uniform(0.5, 1.2))
 
     logging.info(f"\n✅ Finished sending {sent_raids} raids.")
     logging.info("Troops remaining:")
-    for unit_code, amount in troops_info.items():
-        if amount > 0 and unit_code != "uhero":
-            unit_name = resolve_unit_name(tribe_id, unit_code)
+    for i, amount in enumerate(bank):
+        if amount > 0:
+            unit_name = resolve_unit_name(tribe_id, f"t{i + 1}")
             logging.info(f"    {unit_name}: {amount} left")
             
     return sent_raids 
@@ -0,0 +1,146 @@
+"""Raid plans compiled to fixed-length troop vectors (one int per local slot t1..t10).
+
+The raider used to rebuild per-range requirement dicts and convert unit codes
+(t_to_u / u_to_t) for every target and every range. A ``CompiledPlan`` does that
+once per batch: each distance range becomes a 10-slot requirement vector, the
+troop bank becomes a 10-slot list, and feasibility/promotion checks are a single
+element-wise comparison. The bank list is updated in place after each send.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from core.unit_catalog import t_to_u, u_to_t
+
+SLOTS = 10
+
+
+def slot_of(unit_code) -> Optional[int]:
+    """0-based slot for 'tX' or 'uNN' codes, None when not a troop slot."""
+    tcode = u_to_t(str(unit_code))
+    if not tcode:
+        return None
+    n = int(tcode[1:])
+    return n - 1 if 1 <= n <= SLOTS else None
+
+
+def bank_vector(troops: dict, tribe_id: int) -> list[int]:
+    """Troop bank as a slot list; keys are this tribe's uNN codes (tX is accepted too)."""
+    bank = [0] * SLOTS
+    for code, amount in (troops or {}).items():
+        code = str(code)
+        if not isinstance(amount, int) or code == "uhero":
+            continue
+        slot = slot_of(code)
+        if slot is None:
+            continue
+        # Only this tribe's block (or local tX) maps onto the bank
+        if code.startswith("u") and t_to_u(tribe_id, f"t{slot + 1}") != code:
+            continue
+        bank[slot] += max(0, amount)
+    return bank
+
+
+def _min_required_for_unit(unit_code: str, group: int, base_group: int) -> int:
+    norm = u_to_t(unit_code) or unit_code
+    if norm == "t1" and group < 2:
+        target = max(2, base_group)
+        return target
+    return group
+
+
+def adjust_units(units, mul: float) -> list[dict]:
+    """Apply a learning multiplier to a range composition, enforcing per-unit floors."""
+    adjusted = []
+    for u in units or []:
+        base_g = int(u.get("group_size", 0))
+        adj_g = int(round(base_g * mul)) if base_g > 0 else 0
+        if base_g > 0 and adj_g <= 0:
+            adj_g = 1
+        adj_g = _min_required_for_unit(u["unit_code"], adj_g, base_g)
+        adjusted.append({"unit_code": u["unit_code"], "base_group": base_g, "adj_group": adj_g})
+    return adjusted
+
+
+def fits(need: Sequence[int], bank: Sequence[int]) -> bool:
+    return all(n <= b for n, b in zip(need, bank))
+
+
+def shortfall(need: Sequence[int], bank: Sequence[int]) -> Optional[int]:
+    """First slot where the bank is short, or None when it fits."""
+    for i, (n, b) in enumerate(zip(need, bank)):
+        if n > b:
+            return i
+    return None
+
+
+def take(need: Sequence[int], bank: list[int]) -> None:
+    """Subtract a sent composition from the bank in place (never below zero)."""
+    for i, n in enumerate(need):
+        if n:
+            bank[i] = max(0, bank[i] - n)
+
+
+@dataclass(slots=True)
+class CompiledRange:
+    start: float
+    end: float
+    units: list
+    need: tuple[int, ...]       # base group sizes per slot
+
+
+class CompiledPlan:
+    """Distance ranges of a raid plan as requirement vectors for one tribe."""
+
+    def __init__(self, distance_ranges: list, tribe_id: int) -> None:
+        self.tribe_id = int(tribe_id)
+        self.ranges: list[CompiledRange] = []
+        self._adjusted: dict[tuple[int, float], tuple[int, ...]] = {}
+        for dr in distance_ranges or []:
+            vec = [0] * SLOTS
+            try:
+                for u in dr.get("units") or []:
+                    gs = int(u.get("group_size", 0))
+                    slot = slot_of(u.get("unit_code"))
+                    if gs > 0 and slot is not None:
+                        vec[slot] += gs
+                start = float(dr.get("start", 0))
+                end = float(dr.get("end", float("inf")))
+            except Exception:
+                # Keep indexes aligned with distance_ranges; a broken range never matches
+                self.ranges.append(CompiledRange(float("inf"), float("inf"), [], (0,) * SLOTS))
+                continue
+            self.ranges.append(CompiledRange(start, end, list(dr.get("units") or []), tuple(vec)))
+
+    def indexes_for_distance(self, distance: float) -> list[int]:
+        """All ranges containing the distance: first is the default, later ones are promotions."""
+        d = float(distance)
+        return [i for i, r in enumerate(self.ranges) if r.start <= d < r.end]
+
+    def adjusted(self, idx: int, mul: float) -> tuple[int, ...]:
+        """Requirement vector of range `idx` after the learning multiplier (cached per batch)."""
+        key = (idx, round(float(mul), 4))
+        vec = self._adjusted.get(key)
+        if vec is None:
+            out = [0] * SLOTS
+            for au in adjust_units(self.ranges[idx].units, mul):
+                slot = slot_of(au["unit_code"])
+                if slot is not None:
+                    out[slot] += int(au["adj_group"])
+            vec = self._adjusted[key] = tuple(out)
+        return vec
+
+    def any_satisfiable(self, bank: Sequence[int]) -> bool:
+        return any(any(r.need) and fits(r.need, bank) for r in self.ranges)
+
+    def satisfiable_spans(self, bank: Sequence[int]) -> list[tuple[float, float]]:
+        return [(r.start, r.end) for r in self.ranges if r.start < r.end and fits(r.need, bank)]
+
+    def min_total(self) -> Optional[int]:
+        totals = [sum(r.need) for r in self.ranges if any(r.need)]
+        return min(totals) if totals else None
+
+    def payload(self, need: Sequence[int]) -> dict[str, int]:
+        """Slot vector back to the global uNN dict used by the rally point."""
+        return {t_to_u(self.tribe_id, f"t{i + 1}"): n for i, n in enumerate(need) if n}
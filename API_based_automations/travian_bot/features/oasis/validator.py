@@ -3,7 +3,7 @@ import logging
 import time
 from pathlib import Path
 from core.simple_cache import JsonKvCache
-from identity_handling.identity_helper import load_villages_from_identity
+from identity_handling.identity_helper import get_villages_for_server, load_villages_from_identity
 
 _OWN_ALLIANCE_CACHE: dict[str, tuple[float, str | None]] = {}
 
@@ -19,7 +19,7 @@ def _get_own_alliance_tag(api) -> str | None:
             return tag
 
     try:
-        villages = load_villages_from_identity() or []
+        villages = get_villages_for_server(key) or load_villages_from_identity() or []
         if not villages:
             _OWN_ALLIANCE_CACHE[key] = (now, None)
             return None
@@ -44,6 +44,10 @@ except Exception:
     class _Cfg: pass
     _cfg = _Cfg(); _cfg.OASIS_ANIMALS_CACHE_TTL_SEC = 600
 
+_ANIMALS_CACHE_PATH = Path("database/cache/oasis_animals_cache.json")
+_ANIMALS_CACHE_MAX_ENTRIES = 5000
+_ANIMALS_CACHE_WRITE_BEHIND_SEC = 5.0
+
 def is_valid_unoccupied_oasis(api, x, y, distance: float | None = None):
     """
     Checks if the oasis at (x, y) is unoccupied and has no animals.
@@ -60,7 +64,14 @@ def is_valid_unoccupied_oasis(api, x, y, distance: float | None = None):
     animals_cached = None
     if ttl > 0:
         try:
-            cache = JsonKvCache(Path("database/cache/oasis_animals_cache.json"))
+            # Process-wide instance: repeated validations are dict lookups; entries
+            # older than 3×TTL are dropped lazily and writes are batched.
+            cache = JsonKvCache.shared(
+                _ANIMALS_CACHE_PATH,
+                max_entries=int(getattr(_cfg, 'OASIS_ANIMALS_CACHE_MAX_ENTRIES', _ANIMALS_CACHE_MAX_ENTRIES) or 0),
+                ttl_sec=ttl * 3,
+                write_behind_sec=_ANIMALS_CACHE_WRITE_BEHIND_SEC,
+            )
             ent = cache.get(key)
             if ent:
                 ts = float(ent.get("ts", 0))
@@ -106,8 +117,6 @@ def is_valid_unoccupied_oasis(api, x, y, distance: float | None = None):
     try:
         if ttl > 0 and cache is not None:
             cache.set(key, {"animals": animals})
-            # Occasionally purge outdated entries
-            cache.purge_older_than(ttl * 3)
     except Exception:
         pass
     if animals and any(animals.values()):
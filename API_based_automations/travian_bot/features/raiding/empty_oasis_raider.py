@@ -1,5 +1,5 @@
 import logging
-import time
+from core import clock
 from identity_handling.identity_helper import load_villages_from_identity
 from core.database_helpers import load_latest_unoccupied_oases
 from core.unit_catalog import resolve_label_u
@@ -66,8 +66,8 @@ def run_empty_oasis_raids(api, server_url: str, multi_village: bool = True, prio
             continue
 
         if priority_only:
-            ls = LearningStore()
-            now = time.time()
+            ls = LearningStore.shared()
+            now = clock.now()
             has_priority = False
             for coords in oases.keys():
                 x_str, y_str = coords.split("_")
@@ -1,5 +1,7 @@
+import copy
 import json
 import os
+import threading
 from pathlib import Path
 
 from core.unit_catalog import FACTION_TO_TRIBE
@@ -7,12 +9,73 @@ from core.unit_catalog import FACTION_TO_TRIBE
 
 _IDENTITY_PATH = Path(__file__).resolve().parent.parent / "database" / "identity.json"
 
+# Parsed identity + lookup indexes, revalidated against the file's mtime/size so
+# callers in hot loops never re-read identity.json unless it actually changed.
+_CACHE_LOCK = threading.Lock()
+_CACHE: dict = {
+    "stamp": None,
+    "identity": {},
+    "villages": [],      # villages of the first (active) server, enriched
+    "by_id": {},         # str(village_id) -> village (all servers)
+    "by_coords": {},     # (x, y) -> village (all servers)
+    "by_server": {},     # server_name / server_url -> [villages]
+}
 
-def _load_identity_dict() -> dict:
+
+def _identity_cache() -> dict:
     path = _IDENTITY_PATH
-    if not path.exists():
+    try:
+        st = path.stat()
+    except FileNotFoundError:
         raise FileNotFoundError("identity.json not found; run identity setup first.")
-    return json.loads(path.read_text(encoding="utf-8"))
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _CACHE_LOCK:
+        if _CACHE["stamp"] == stamp:
+            return _CACHE
+
+        identity = json.loads(path.read_text(encoding="utf-8"))
+        travian_identity = identity.get("travian_identity") or {}
+        tribe_id = _resolve_tribe_id(travian_identity)
+        faction = travian_identity.get("faction")
+        # Keep the resolved tribe_id available for callers relying on the top-level dict
+        travian_identity["tribe_id"] = tribe_id
+
+        by_id: dict = {}
+        by_coords: dict = {}
+        by_server: dict = {}
+        servers = travian_identity.get("servers") or []
+        for server in servers:
+            villages = server.get("villages") or []
+            # Enrich each village dict so downstream code has consistent metadata
+            for village in villages:
+                village.setdefault("tribe_id", tribe_id)
+                if faction and not village.get("faction"):
+                    village["faction"] = faction
+                vid = village.get("village_id")
+                if vid is not None:
+                    by_id.setdefault(str(vid), village)
+                try:
+                    by_coords.setdefault((int(village.get("x")), int(village.get("y"))), village)
+                except Exception:
+                    pass
+            for name in (server.get("server_name"), server.get("server_url")):
+                if name:
+                    by_server.setdefault(str(name), villages)
+
+        _CACHE.update(
+            stamp=stamp,
+            identity=identity,
+            villages=(servers[0].get("villages") or []) if servers else [],
+            by_id=by_id,
+            by_coords=by_coords,
+            by_server=by_server,
+        )
+        return _CACHE
+
+
+def _load_identity_dict() -> dict:
+    """Parsed identity.json; a deep copy, like the other accessors, so the cache stays intact."""
+    return copy.deepcopy(_identity_cache()["identity"])
 
 
 def _resolve_tribe_id(travian_identity: dict) -> int:
@@ -44,30 +107,52 @@ def get_account_tribe_id() -> int:
 
 def load_villages_from_identity():
     """Load all villages with enriched tribe/faction metadata."""
-    identity = _load_identity_dict()
-
-    travian_identity = identity.get("travian_identity") or {}
-    servers = (travian_identity.get("servers") or [])
-    if not servers:
+    cache = _identity_cache()
+    travian_identity = cache["identity"].get("travian_identity") or {}
+    if not (travian_identity.get("servers") or []):
         raise Exception("❌ No servers found in identity!")
 
-    villages = servers[0].get("villages") or []
+    villages = cache["villages"]
     if not villages:
         raise Exception("❌ No villages found for the server!")
 
-    tribe_id = _resolve_tribe_id(travian_identity)
-    faction = travian_identity.get("faction")
+    # Hand out copies so callers cannot corrupt the shared cache
+    return [dict(v) for v in villages]
+
+
+def get_village_by_id(village_id) -> dict | None:
+    """O(1) lookup of a village (any server) by its id; None when unknown or identity missing."""
+    try:
+        village = _identity_cache()["by_id"].get(str(village_id))
+    except Exception:
+        return None
+    return dict(village) if village is not None else None
+
+
+def get_village_by_coords(x: int, y: int) -> dict | None:
+    """O(1) lookup of an own village by map coordinates."""
+    try:
+        village = _identity_cache()["by_coords"].get((int(x), int(y)))
+    except Exception:
+        return None
+    return dict(village) if village is not None else None
 
-    # Enrich each village dict so downstream code has consistent metadata
-    for village in villages:
-        village.setdefault("tribe_id", tribe_id)
-        if faction and not village.get("faction"):
-            village["faction"] = faction
 
-    # Keep the resolved tribe_id available for callers relying on the top-level dict
-    travian_identity["tribe_id"] = tribe_id
+def get_villages_for_server(server: str) -> list[dict]:
+    """Villages of the server identified by its server_name or server_url."""
+    try:
+        villages = _identity_cache()["by_server"].get(str(server)) or []
+    except Exception:
+        return []
+    return [dict(v) for v in villages]
+
+
+def is_known_village(village_id) -> bool:
+    try:
+        return str(village_id) in _identity_cache()["by_id"]
+    except Exception:
+        return False
 
-    return villages
 
 def choose_village_to_scan(villages):
     """Prompt user to pick a village to center the scan around."""
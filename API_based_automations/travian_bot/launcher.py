@@ -1,36 +1,50 @@
+import sys
+from core import feature_registry
+
+# --import-profile: time every import from here on (printed at the first menu prompt and on exit)
+if "--import-profile" in sys.argv[1:]:
+    sys.argv.remove("--import-profile")
+    feature_registry.enable_import_profile()
+
 import time
 import random
 import json
 import os
 import threading
 import logging
-import sys
+import atexit
 import shutil
-from identity_handling.login import login
-from core.travian_api import TravianAPI
-from core.database_helpers import load_latest_unoccupied_oases
-from oasis_raiding_from_scan_list_main import run_raid_planner
-from raid_list_main import run_one_farm_list_burst
-from features.raiding.empty_oasis_raider import run_empty_oasis_raids
-from features.farm_lists.farm_list_runner import run_farmlists_for_villages
-from features.raiding.reset_raid_plan import reset_saved_raid_plan
-from features.raiding.setup_interactive_plan import setup_interactive_raid_plan
-from identity_handling.identity_manager import handle_identity_management
-from identity_handling.identity_helper import load_villages_from_identity, get_account_tribe_id
-from features.hero.hero_operations import run_hero_operations as run_hero_ops, print_hero_status_summary
-from features.hero.hero_raiding_thread import run_hero_raiding_thread
-from features.hero.hero_adventure_thread import run_hero_adventure_thread
-from features.build.new_village_preset import run_new_village_preset_if_new
-from features.build.resource_balancer import PROFILE_CONFIG_PATH, run_resource_balancer_cycle
-from features.logistics.resource_router import run_resource_router_cycle
-from features.hero.hero_adventure import maybe_start_adventure
-from core.hero_manager import HeroManager
+from core import clock, cycle_schedule
 from datetime import datetime, timedelta, time as dtime
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
-from core.rally_tracker import get_pending_count, process_pending_returns
-from features.defense.attack_detector import run_attack_detector_thread
-from features.tasks.progressive_tasks import collect_rewards_for_all_villages, count_collectible_rewards
+
+# Features load on first use (core/feature_registry.py): a menu option only pays
+# for the modules it runs, and a missing optional module fails only when used.
+_feature = feature_registry.lazy
+login = _feature("login")
+TravianAPI = _feature("travian_api")
+run_raid_planner = _feature("run_raid_planner")
+run_one_farm_list_burst = _feature("run_one_farm_list_burst")
+run_empty_oasis_raids = _feature("run_empty_oasis_raids")
+run_farmlists_for_villages = _feature("run_farmlists_for_villages")
+reset_saved_raid_plan = _feature("reset_saved_raid_plan")
+load_villages_from_identity = _feature("load_villages_from_identity")
+get_account_tribe_id = _feature("get_account_tribe_id")
+run_hero_ops = _feature("run_hero_operations")
+print_hero_status_summary = _feature("print_hero_status_summary")
+run_hero_raiding_thread = _feature("run_hero_raiding_thread")
+run_hero_adventure_thread = _feature("run_hero_adventure_thread")
+run_new_village_preset_if_new = _feature("run_new_village_preset_if_new")
+run_resource_balancer_cycle = _feature("run_resource_balancer_cycle")
+run_resource_router_cycle = _feature("run_resource_router_cycle")
+maybe_start_adventure = _feature("maybe_start_adventure")
+HeroManager = _feature("hero_manager")
+get_pending_count = _feature("get_pending_count")
+process_pending_returns = _feature("process_pending_returns")
+run_attack_detector_thread = _feature("run_attack_detector_thread")
+collect_rewards_for_all_villages = _feature("collect_rewards_for_all_villages")
+count_collectible_rewards = _feature("count_collectible_rewards")
 
 # === CONFIG (centralized) ===
 try:
@@ -101,7 +115,7 @@ def _log_error(msg, exc=None):
 # --- Daily limiter helpers ---
 RUNTIME_TRACK_PATH = Path("database/runtime_track.json")
 
-def _today_str(): return datetime.now().strftime("%Y-%m-%d")
+def _today_str(): return cycle_schedule.today_str()
 
 def _load_runtime_state():
     import json
@@ -124,38 +138,16 @@ def _save_runtime_state(state):
         print(f"[Limiter] ⚠️ Could not save runtime state: {e}")
 
 def _minutes_until_tomorrow():
-    now = datetime.now()
-    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=5, microsecond=0)
-    return int((tomorrow - now).total_seconds() // 60)
+    return cycle_schedule.minutes_until_tomorrow()
 
 def _sleep_minutes(minutes):
     if minutes <= 0: return
     print(f"[Limiter] ⏸️ Sleeping {minutes} minutes...")
     _log_info(f"Sleeping {minutes} minutes...")
-    time.sleep(minutes*60)
+    clock.sleep(minutes*60)
 
 def _compute_limiter_params():
-    import random
-    base_total = max(0, int(getattr(settings, "DAILY_MAX_RUNTIME_MINUTES", 600)))
-    variance = float(getattr(settings, "DAILY_VARIANCE_PCT", 0.0))
-    if variance > 0:
-        delta = int(base_total * random.uniform(-variance, variance))
-    else:
-        delta = 0
-    total = max(0, base_total + delta)
-    blocks = max(1, int(getattr(settings, "DAILY_BLOCKS", 3)))
-    # Random block size if configured
-    bmin = int(getattr(settings, "BLOCK_SIZE_MIN", 0))
-    bmax = int(getattr(settings, "BLOCK_SIZE_MAX", 0))
-    if bmax > 0 and bmax >= bmin > 0:
-        block_size = random.randint(bmin, bmax)
-    else:
-        block_size = max(1, total // blocks)
-    # Random rest between blocks if configured
-    rmin = int(getattr(settings, "REST_MIN_MINUTES", 0))
-    rmax = int(getattr(settings, "REST_MAX_MINUTES", 0))
-    rest_between_blocks = (rmin, rmax) if (rmax >= rmin > 0) else (0, 0)
-    return total, blocks, block_size, rest_between_blocks
+    return cycle_schedule.compute_limiter_params(settings)
 
 
 def _load_json(path: Path, default):
@@ -165,6 +157,20 @@ def _load_json(path: Path, default):
         return default
 
 
+def _load_learning_data(learning_path: Path) -> dict:
+    """Read the learning store through LearningStore so the active backend (sqlite/json) is honoured."""
+    try:
+        from core.learning_store import LearningStore  # type: ignore
+        # Pending writes of the in-process store first, so the file view is current
+        LearningStore.flush_shared()
+        store = LearningStore(str(learning_path))
+        data = dict(store.data or {})
+        store.close()
+        return data
+    except Exception:
+        return _load_json(learning_path, {}) or {}
+
+
 def display_status_snapshot() -> None:
     base_dir = Path(__file__).resolve().parent
     learning_path = base_dir / "database/learning/raid_targets_stats.json"
@@ -172,7 +178,7 @@ def display_status_snapshot() -> None:
     runtime_path = base_dir / "database/runtime_next_oasis_due.json"
     hero_eta_path = base_dir / "database/hero_mission_eta.json"
 
-    learning_store = _load_json(learning_path, {}) or {}
+    learning_store = _load_learning_data(learning_path)
     pendings = _load_json(pendings_path, []) or []
     runtime_hint = _load_json(runtime_path, {}) or {}
     hero_eta = _load_json(hero_eta_path, {}) or {}
@@ -264,22 +270,11 @@ def _load_identity_servers() -> dict[str, list[dict]]:
     return mapping
 
 
-def _parse_coord_key(key: str) -> tuple[int, int] | None:
-    try:
-        key = key.strip()
-        if key.startswith('(') and key.endswith(')'):
-            key = key[1:-1]
-        x_str, y_str = [part.strip() for part in key.split(',')]
-        return int(x_str), int(y_str)
-    except Exception:
-        return None
-
-
 def display_raid_plan_stats() -> None:
     base_dir = Path(__file__).resolve().parent
     raid_plan_dir = base_dir / "database/raid_plans"
     learning_path = base_dir / "database/learning/raid_targets_stats.json"
-    learning_store = _load_json(learning_path, {}) or {}
+    learning_store = _load_learning_data(learning_path)
     servers = _load_identity_servers()
 
     plan_files = sorted(raid_plan_dir.glob("raid_plan_village_*.json"))
@@ -292,6 +287,8 @@ def display_raid_plan_stats() -> None:
 
     print("\n===== RAID PLAN STATS =====")
     now = time.time()
+    from core.spatial_index import SpatialIndex
+    target_index = SpatialIndex.from_coord_keys(learning_store.keys())
 
     for path in plan_files:
         try:
@@ -321,16 +318,8 @@ def display_raid_plan_stats() -> None:
         }
         details = []
 
-        for coord_key, entry in learning_store.items():
-            coord = _parse_coord_key(coord_key)
-            if coord is None:
-                continue
-            dx = abs(coord[0] - vx)
-            dy = abs(coord[1] - vy)
-            distance = (dx ** 2 + dy ** 2) ** 0.5
-            if distance > max_dist:
-                continue
-
+        for _dist, _x, _y, coord_key in target_index.within_radius(vx, vy, max_dist):
+            entry = learning_store[coord_key]
             attempts = int(entry.get("attempts", 0) or 0)
             successes = int(entry.get("successes", 0) or 0)
             failures = int(entry.get("failures", attempts - successes))
@@ -459,6 +448,10 @@ def reset_environment() -> None:
     try:
         learning_dir.mkdir(parents=True, exist_ok=True)
         _write_json(learning_dir / "raid_targets_stats.json", {})
+        for suffix in (".sqlite3", ".sqlite3-wal", ".sqlite3-shm"):
+            db_file = learning_dir / f"raid_targets_stats{suffix}"
+            if db_file.exists():
+                db_file.unlink()
         _write_json(learning_dir / "pending_rally.json", [])
         print("[Reset] Cleared learning store")
     except Exception as exc:
@@ -487,30 +480,13 @@ def reset_environment() -> None:
     )
 
 def _parse_quiet_windows() -> list[tuple[dtime,dtime]]:
-    out = []
     try:
-        wins = getattr(settings, "QUIET_WINDOWS", []) or []
-        for w in wins:
-            try:
-                a,b = [p.strip() for p in str(w).split('-')]
-                h1,m1 = [int(x) for x in a.split(':')]
-                h2,m2 = [int(x) for x in b.split(':')]
-                out.append((dtime(h1,m1), dtime(h2,m2)))
-            except Exception:
-                continue
+        return cycle_schedule.parse_quiet_windows(getattr(settings, "QUIET_WINDOWS", []) or [])
     except Exception:
-        pass
-    return out
+        return []
 
 def _in_quiet_window(now: datetime, windows: list[tuple[dtime,dtime]]) -> timedelta | None:
-    for (s,e) in windows:
-        start = now.replace(hour=s.hour, minute=s.minute, second=0, microsecond=0)
-        end = now.replace(hour=e.hour, minute=e.minute, second=0, microsecond=0)
-        if end <= start:
-            end += timedelta(days=1)
-        if start <= now < end:
-            return end - now
-    return None
+    return cycle_schedule.in_quiet_window(now, windows)
 
 def view_identity():
     """Display the current identity information."""
@@ -748,8 +724,7 @@ def tools_menu(api: TravianAPI):
                     print("ℹ️ Learning is disabled; no multipliers to show.")
                 else:
                     from core.learning_store import LearningStore  # type: ignore
-                    ls = LearningStore()
-                    data = getattr(ls, 'data', {}) or {}
+                    data = LearningStore.shared().snapshot() or {}
                     if not data:
                         print("No learned multipliers yet.")
                     else:
@@ -776,6 +751,11 @@ def tools_menu(api: TravianAPI):
 
 def resource_balancer_menu(api: TravianAPI):
     """Toggle and run the resource field balancer."""
+    try:
+        PROFILE_CONFIG_PATH = feature_registry.load("resource_balancer_profile_path")
+    except Exception as exc:
+        print(f"❌ Resource balancer not available: {exc}")
+        return
     while True:
         enabled = bool(getattr(settings, "RESOURCE_FIELD_BALANCER_ENABLE", False))
         include_grain = bool(getattr(settings, "RESOURCE_FIELD_BALANCER_INCLUDE_GRAIN", True))
@@ -979,7 +959,8 @@ def run_map_scan(api: TravianAPI):
     print("[1] Full scan for unoccupied oases")
     print("[2] Quick scan (small radius)")
     print("[3] View latest scan results")
-    print("[4] Back to main menu")
+    print("[4] Incremental rescan (refresh expired tiles only)")
+    print("[5] Back to main menu")
     
     choice = input("\nSelect an option: ").strip()
     
@@ -1019,6 +1000,11 @@ def run_map_scan(api: TravianAPI):
         except (ValueError, IndexError):
             print("❌ Invalid village selection.")
     elif choice == "4":
+        from features.map_scanning.scan_map import scan_map_for_oases
+        print("\n🔍 Starting incremental map rescan...")
+        scan_map_for_oases(api, incremental=True)
+        print("✅ Map rescan complete!")
+    elif choice == "5":
         return
     else:
         print("❌ Invalid choice.")
@@ -1062,6 +1048,10 @@ def main():
 
     print("\n" + "="*40)
 
+    if feature_registry.import_profile_enabled():
+        feature_registry.print_import_profile("cold start to menu")
+        atexit.register(feature_registry.print_import_profile, "features loaded after the menu")
+
     choice = input("\n👉 Select an option: ").strip()
 
     if choice == "13":
@@ -1189,7 +1179,7 @@ def main():
         # Initialize activity tracking session
         try:
             from core.metrics import activity_init
-            activity_init(time.time())
+            activity_init(clock.now())
         except Exception:
             pass
 
@@ -1297,19 +1287,9 @@ def main():
         
         while True:
             try:
-                quiet_windows = _parse_quiet_windows()
-                quiet_remaining = _in_quiet_window(datetime.now(), quiet_windows) if quiet_windows else None
-                if quiet_remaining:
-                    jitter_min = float(getattr(settings, "QUIET_WINDOW_RESUME_JITTER_MIN", 60.0))
-                    jitter_max = float(getattr(settings, "QUIET_WINDOW_RESUME_JITTER_MAX", 240.0))
-                    if jitter_max < jitter_min:
-                        jitter_max = jitter_min
-                    try:
-                        extra = random.uniform(jitter_min, jitter_max) if jitter_max > 0 else 0.0
-                    except Exception:
-                        extra = 0.0
-                    wait_seconds = max(0.0, quiet_remaining.total_seconds() + extra)
-                    resume_at = datetime.now() + quiet_remaining + timedelta(seconds=extra)
+                wait_seconds = cycle_schedule.quiet_wait_seconds(settings)
+                if wait_seconds is not None:
+                    resume_at = clock.datetime_now() + timedelta(seconds=wait_seconds)
                     mins = int(wait_seconds // 60)
                     secs = int(wait_seconds % 60)
                     msg = (
@@ -1318,15 +1298,24 @@ def main():
                     )
                     print(msg)
                     _log_info(msg)
-                    time.sleep(wait_seconds)
+                    clock.sleep(wait_seconds)
                     continue
 
                 _log_info("Loop tick")
-                print(f"\n[Main] Starting cycle at {time.strftime('%H:%M:%S')}")
+                print(f"\n[Main] Starting cycle at {clock.strftime('%H:%M:%S')}")
                 _log_info("Cycle started.")
-                cycle_start_ts = time.time()
+                cycle_start_ts = clock.now()
+                # Fresh page cache per cycle (dorf1 etc. are fetched once per village)
+                try:
+                    api.begin_page_cycle()
+                except Exception:
+                    pass
+                # Per-phase timing (phase ends where the next one starts)
+                from core import cycle_profiler
+                prof = cycle_profiler.start_cycle()
 
                 # Cycle status: unread reports and task rewards available
+                prof.phase("status")
                 try:
                     unread = 0
                     try:
@@ -1366,6 +1355,7 @@ def main():
 
                 # --- Place your farming/oasis logic here (existing repo code) ---
                 # Optional: auto-run new village preset if explicitly toggled in YAML
+                prof.phase("new_village_preset")
                 try:
                     if bool(getattr(settings, 'NEW_VILLAGE_PRESET_ENABLE', False)):
                         # Run preset only upon detection of a newly founded village (once per id)
@@ -1373,6 +1363,7 @@ def main():
                 except Exception as _p_e:
                     _log_warn(f"New village preset run failed: {_p_e}")
                 # Try to start a hero adventure if conditions allow (low-latency)
+                prof.phase("adventure")
                 try:
                     if bool(getattr(settings, 'HERO_ADVENTURE_ENABLE', True)):
                         started = maybe_start_adventure(api)
@@ -1382,6 +1373,7 @@ def main():
                     _log_warn(f"Hero adventure attempt failed: {_adv_e}")
 
                 # Collect progressive task rewards (per village)
+                prof.phase("progressive_tasks")
                 try:
                     if bool(getattr(settings, 'PROGRESSIVE_TASKS_ENABLE', True)):
                         import random as _rnd, time as _t
@@ -1394,6 +1386,7 @@ def main():
                     _log_warn(f"Progressive tasks collection failed: {_tasks_e}")
 
                 # Small human-like pause before starting planner
+                prof.phase("pre_action_pause")
                 try:
                     import random, time as _t
                     from config.config import settings as _cfg
@@ -1447,16 +1440,21 @@ def main():
                 learning_enabled = bool(getattr(settings, 'LEARNING_ENABLE', True))
 
                 if empty_oasis_enabled and learning_enabled:
+                    prof.phase("priority_oasis_raids")
                     run_empty_oasis_raids(api, server_url, multi_village=True, priority_only=True)
                 if fl_enabled:
                     # first-cycle skip honored if configured
                     if not (first_cycle and skip_farm_lists_first_run):
+                        prof.phase("farm_lists")
                         run_farmlists_for_villages(api, server_url, multi_village=True)
                 if empty_oasis_enabled:
+                    prof.phase("oasis_raids")
                     run_empty_oasis_raids(api, server_url, multi_village=True)
+                prof.stop()
                 first_cycle = False
 
                 if bool(getattr(settings, "RESOURCE_FIELD_BALANCER_ENABLE", False)):
+                    prof.phase("balancer")
                     try:
                         include_grain = bool(getattr(settings, "RESOURCE_FIELD_BALANCER_INCLUDE_GRAIN", True))
                         results = run_resource_balancer_cycle(api, include_crop=include_grain)
@@ -1470,6 +1468,7 @@ def main():
                         _log_warn(f"Resource balancer failed: {_bal_e}")
 
                 if bool(getattr(settings, "RESOURCE_ROUTER_ENABLE", False)):
+                    prof.phase("router")
                     try:
                         transfers = run_resource_router_cycle(api)
                         if transfers:
@@ -1480,6 +1479,7 @@ def main():
                         _log_warn(f"Resource router failed: {_router_e}")
 
                 # Hero summary + record to metrics
+                prof.phase("hero_summary")
                 _log_info("Fetching hero status summary…")
                 hero_manager = HeroManager(api)
                 status = hero_manager.fetch_hero_status()
@@ -1501,6 +1501,7 @@ def main():
                     _log_warn("Could not fetch hero status summary.")
 
                 # Rally tracker – sequential pass (avoid simultaneous activity)
+                prof.phase("rally_tracker")
                 try:
                     from config.config import settings as _cfg
                     learning_on = bool(getattr(_cfg, 'LEARNING_ENABLE', True))
@@ -1529,12 +1530,29 @@ def main():
                 except Exception as _e:
                     _log_warn(f"RallyTracker pass failed: {_e}")
 
+                # Report ingestion – only reports above the stored high-water id are fetched
+                prof.phase("reports")
+                try:
+                    from core import report_store
+                    if report_store.enabled():
+                        stored = report_store.ingest(api)
+                        if stored:
+                            hwm = report_store.get_store().high_water()
+                            print(f"[Main] 📑 Reports: stored {stored} new (high-water id {hwm})")
+                            _log_info(f"Report ingestion stored {stored} new report(s).")
+                except Exception as _e:
+                    _log_warn(f"Report ingestion failed: {_e}")
+                try:
+                    prof.finish()
+                except Exception:
+                    pass
+
                 # Cycle report (metrics snapshot)
                 try:
                     from core.metrics import snapshot_and_reset, activity_record_window, render_activity_lines
                     # Record this cycle's active window (exclude waiting time)
                     try:
-                        activity_record_window(cycle_start_ts, time.time())
+                        activity_record_window(cycle_start_ts, clock.now())
                     except Exception:
                         pass
                     snap = snapshot_and_reset()
@@ -1563,40 +1581,38 @@ def main():
                             print(line)
                     except Exception:
                         pass
+                    # Request volume / latency (network vs humanizer sleep)
+                    try:
+                        from core import request_stats
+                        for line in request_stats.render_summary_lines():
+                            print(line)
+                        request_stats.flush()
+                    except Exception:
+                        pass
+                    # Where the cycle time goes, per phase
+                    try:
+                        for line in cycle_profiler.render_phase_lines():
+                            print(line)
+                    except Exception:
+                        pass
                     print()
                 except Exception:
                     pass
 
                 # === Limiter accounting ===
-                elapsed_minutes = max(1, int((time.time() - cycle_start_ts)//60))
+                elapsed_minutes = max(1, int((clock.now() - cycle_start_ts)//60))
                 if limiter_enabled:
-                    if runtime_state["date"] != _today_str():
-                        runtime_state = {"date": _today_str(), "minutes_used": 0, "total_allowed": int(total_allowed), "block_size": int(block_size)}
-                    before = runtime_state["minutes_used"]
-                    runtime_state["minutes_used"] = before + elapsed_minutes
+                    step = cycle_schedule.limiter_account(runtime_state, elapsed_minutes, total_allowed, blocks, block_size, rest_between_blocks)
+                    runtime_state = step.state
                     _save_runtime_state(runtime_state)
 
-                    prev_block = before // block_size
-                    new_block = runtime_state["minutes_used"] // block_size
                     # pick random rest between blocks if configured
-                    if new_block > prev_block and new_block < blocks:
-                        rest_min, rest_max = 0, 0
-                        try:
-                            rest_min, rest_max = rest_between_blocks
-                        except Exception:
-                            pass
-                        rest_len = 0
-                        if rest_max >= rest_min and rest_max > 0:
-                            import random as _rnd
-                            rest_len = int(_rnd.randint(int(rest_min), int(rest_max)))
-                        elif isinstance(rest_between_blocks, int) and rest_between_blocks > 0:
-                            rest_len = int(rest_between_blocks)
-                        if rest_len > 0:
-                            print(f"[Limiter] ✅ Block {prev_block+1} completed ({runtime_state['minutes_used']} / {total_allowed} min).")
-                            _log_info(f"Block {prev_block+1} completed.")
-                            _sleep_minutes(rest_len)
-
-                    if runtime_state["minutes_used"] >= total_allowed:
+                    if step.rest_minutes > 0:
+                        print(f"[Limiter] ✅ Block {step.block_done} completed ({runtime_state['minutes_used']} / {total_allowed} min).")
+                        _log_info(f"Block {step.block_done} completed.")
+                        _sleep_minutes(step.rest_minutes)
+
+                    if step.cap_reached:
                         mins_to_tomorrow = _minutes_until_tomorrow()
                         print(f"[Limiter] 🛑 Daily cap reached ({runtime_state['minutes_used']} / {total_allowed} min).")
                         _log_warn("Daily cap reached.")
@@ -1608,38 +1624,19 @@ def main():
                             _save_runtime_state(runtime_state)
 
                 # === Cycle wait ===
-                jitter = random.randint(-settings.JITTER_MINUTES, settings.JITTER_MINUTES)
-                total_wait_minutes = settings.WAIT_BETWEEN_CYCLES_MINUTES + jitter
-                # Occasional coffee break for human-like idle time
-                try:
-                    import random as _rnd
-                    if _rnd.random() < float(getattr(settings, 'OP_COFFEE_BREAK_PROB', 0.1)):
-                        extra = _rnd.randint(int(getattr(settings, 'OP_COFFEE_BREAK_MIN_MINUTES', 2)), int(getattr(settings, 'OP_COFFEE_BREAK_MAX_MINUTES', 6)))
-                        total_wait_minutes += extra
-                        print(f"[Humanizer] ☕ Taking a short break (+{extra} min)")
-                except Exception:
-                    pass
+                total_wait_minutes, extra = cycle_schedule.cycle_wait_minutes(settings)
+                if extra:
+                    print(f"[Humanizer] ☕ Taking a short break (+{extra} min)")
 
-                # Event-driven wait: if next oasis due is earlier than base cycle wait, prefer waking up earlier
+                # Event-driven wait: sleep until the earliest known deadline (oasis due,
+                # rally return, hero return, build queue); the cycle wait is the fallback tick
                 base_wait_sec = max(0, int(total_wait_minutes) * 60)
-                event_wait_sec = None
                 try:
-                    from pathlib import Path as _P
-                    import json as _json
-                    p = _P("database/runtime_next_oasis_due.json")
-                    if p.exists():
-                        j = _json.loads(p.read_text(encoding='utf-8')) or {}
-                        next_epoch = int(j.get('next_due_epoch', 0))
-                        if next_epoch > 0:
-                            event_wait_sec = max(0, next_epoch - int(time.time()))
+                    from core import event_scheduler
+                    wait_total, next_ev = event_scheduler.plan_wait(base_wait_sec)
                 except Exception:
-                    event_wait_sec = None
-
-                use_event = bool(getattr(settings, 'OASIS_EVENT_DRIVEN_WAIT_ENABLE', True))
-                wait_total = base_wait_sec
-                if use_event and isinstance(event_wait_sec, int) and event_wait_sec > 0:
-                    # Wake up earlier if the next oasis becomes due sooner than the base cycle
-                    wait_total = min(base_wait_sec, max(15, event_wait_sec))
+                    event_scheduler = None
+                    wait_total, next_ev = base_wait_sec, None
 
                 # Announce wait with optional event-driven hint
                 # Use global console lock to avoid interleaving with other threads' prints
@@ -1647,9 +1644,8 @@ def main():
                     from core.console import print_line as _print_line
                 except Exception:
                     _print_line = None
-                if use_event and isinstance(event_wait_sec, int) and event_wait_sec > 0:
-                    mm, ss = divmod(max(0, event_wait_sec), 60)
-                    msg = f"[Main] Cycle complete. Waiting {max(0, wait_total//60)} minute(s)... (event-driven: next oasis in {mm:02d}:{ss:02d})"
+                if next_ev is not None:
+                    msg = f"[Main] Cycle complete. Waiting {max(0, wait_total//60)} minute(s)... (event-driven: {event_scheduler.describe(next_ev)})"
                 else:
                     msg = f"[Main] Cycle complete. Waiting {max(0, wait_total//60)} minute(s)..."
                 if _print_line:
@@ -1658,20 +1654,13 @@ def main():
                     print(msg, flush=True)
                 _log_info(f"Cycle complete. Waiting {max(0, wait_total//60)} minute(s).")
 
-                # Progress bar countdown for next cycle (and show next oasis ETA when available)
-                start_ts = time.time()
-                def _read_next_oasis_eta() -> int | None:
-                    try:
-                        import json as _json
-                        from pathlib import Path as _P
-                        p = _P("database/runtime_next_oasis_due.json")
-                        if not p.exists():
-                            return None
-                        j = _json.loads(p.read_text(encoding='utf-8'))
-                        eta = int(j.get("next_due_epoch", 0) - time.time())
-                        return eta if eta > 0 else None
-                    except Exception:
-                        return None
+                # Progress bar countdown for next cycle (and show the next event ETA when available)
+                start_ts = clock.now()
+                try:
+                    poll_sec = max(1.0, float(getattr(settings, 'SCHEDULER_POLL_SEC', 10.0)))
+                except Exception:
+                    poll_sec = 10.0
+                last_poll = start_ts
 
                 def _render_bar(prefix: str, remain: int, total: int) -> str:
                     total = max(total, 1)
@@ -1693,15 +1682,28 @@ def main():
                 newline_fallback_every = 10  # seconds
                 last_newline = 0
                 while True:
-                    elapsed = int(time.time() - start_ts)
+                    now_ts = clock.now()
+                    # Subsystems (hero thread, rally tracker) may register an earlier deadline meanwhile
+                    if event_scheduler is not None and now_ts - last_poll >= poll_sec:
+                        last_poll = now_ts
+                        try:
+                            remain_now = max(0, int(start_ts + wait_total - now_ts))
+                            sooner, ev = event_scheduler.plan_wait(remain_now, now_ts)
+                            if ev is not None and sooner < remain_now:
+                                wait_total -= remain_now - sooner
+                                next_ev = ev
+                                _log_info(f"Woken earlier by scheduler: {event_scheduler.describe(ev, now_ts)}.")
+                        except Exception:
+                            pass
+                    elapsed = int(now_ts - start_ts)
                     remain = max(0, wait_total - elapsed)
                     if remain <= 0:
                         break
-                    oasis_eta = _read_next_oasis_eta()
-                    if oasis_eta is not None:
-                        # Show oasis ETA alongside cycle countdown (minimum displayed)
+                    event_eta = int(next_ev[0] - now_ts) if next_ev is not None else 0
+                    if event_eta > 0:
+                        # Show event ETA alongside cycle countdown
                         line = _render_bar("Next cycle", remain, wait_total)
-                        line2 = _render_bar("Next oasis", oasis_eta, max(oasis_eta, 1))
+                        line2 = _render_bar(f"Next {next_ev[1]}", event_eta, max(event_eta, 1))
                         out = line + " | " + line2
                     else:
                         out = _render_bar("Next cycle", remain, wait_total)
@@ -1721,7 +1723,7 @@ def main():
                         if (elapsed - last_newline) >= newline_fallback_every:
                             last_newline = elapsed
                             _log_info(out)
-                    time.sleep(1)
+                    clock.sleep(1)
                 if is_tty and last_line:
                     try:
                         from core.console import end_status as _end_status
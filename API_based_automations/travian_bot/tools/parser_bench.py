@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""Offline regression + throughput bench for the HTML parsers.
+
+Runs every hot parser against the anonymized fixtures in tools/fixtures/parsers,
+checks the output against expected.json and reports ops/sec and peak memory per
+call. With a saved baseline it exits non-zero when a parser got slower than the
+allowed margin, so parser changes can be measured without touching a server.
+
+    python tools/parser_bench.py                    # check + report
+    python tools/parser_bench.py --save-baseline    # store ops/sec on this machine
+    python tools/parser_bench.py --margin 0.15      # fail on >15% slowdown vs baseline
+    python tools/parser_bench.py --record           # rewrite expected.json (after review!)
+    python tools/parser_bench.py -k tile            # only cases containing "tile"
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = ROOT / "tools" / "fixtures" / "parsers"
+EXPECTED_PATH = FIXTURES / "expected.json"
+DEFAULT_BASELINE = ROOT / "logs" / "parser_bench_baseline.json"
+SERVER_URL = "https://fixture.invalid"
+
+sys.path.insert(0, str(ROOT))
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class _ReplayResponse:
+    def __init__(self, text: str, status_code: int = 200) -> None:
+        self.text = text
+        self.status_code = status_code
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class _ReplaySession:
+    """Minimal stand-in for requests.Session that serves one fixture for every GET/POST."""
+
+    def __init__(self, text: str) -> None:
+        self._response = _ReplayResponse(text)
+        self.headers: dict = {}
+        self.cookies: dict = {}
+
+    def get(self, url, **kwargs):
+        return self._response
+
+    def post(self, url, **kwargs):
+        return self._response
+
+    def request(self, method, url, **kwargs):
+        return self._response
+
+
+def _api(text: str):
+    from core.travian_api import TravianAPI
+    api = TravianAPI(_ReplaySession(text), SERVER_URL)
+    # Measure the parse, not page-cache hits
+    api._page_cache_enable = False
+    return api
+
+
+def _normalize(value: Any) -> Any:
+    """JSON-comparable form of a parser result (dataclasses, tuples, nested)."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _normalize(dataclasses.asdict(value))
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+# --- cases: name -> factory returning a zero-arg callable ----------------
+
+def _case_analyze_tile(fixture: str, reference: bool = False):
+    def factory():
+        from analysis.tile_analysis import analyze_tile, analyze_tile_reference
+        fn = analyze_tile_reference if reference else analyze_tile
+        html = _fixture(fixture)
+        return lambda: fn(html, (12, -7))
+    return factory
+
+
+def _case_parse_tile_html(fixture: str):
+    def factory():
+        from core.full_map_scanner import parse_tile_html
+        html = _fixture(fixture)
+        return lambda: parse_tile_html(html)
+    return factory
+
+
+def _case_troops():
+    api = _api(_fixture("dorf1_troops.html"))
+    return api.get_troops_in_village
+
+
+def _case_adventures(fixture: str):
+    def factory():
+        api = _api(_fixture(fixture))
+        return api.list_hero_adventures
+    return factory
+
+
+def _case_duration():
+    api = _api("")
+    response = _ReplayResponse(_fixture("rally_confirm.html"))
+    return lambda: api._extract_duration_seconds(response)
+
+
+def _case_rally_returns():
+    from core.rally_tracker import _fetch_rally_returns
+    api = _api(_fixture("rally_overview_returns.html"))
+    return lambda: _fetch_rally_returns(api, 1001)
+
+
+def _case_resource_bar():
+    from bs4 import BeautifulSoup
+    from features.build.resource_balancer import _parse_resource_bar
+    html = _fixture("dorf1_resources.html")
+    return lambda: _parse_resource_bar(BeautifulSoup(html, "html.parser"))
+
+
+def _case_snapshot_resource_bar():
+    from bs4 import BeautifulSoup
+    from core.village_snapshot import parse_resource_bar
+    html = _fixture("dorf1_resources.html")
+    return lambda: parse_resource_bar(BeautifulSoup(html, "html.parser"))
+
+
+def _case_market(fixture: str):
+    def factory():
+        from bs4 import BeautifulSoup
+        from features.logistics.resource_router import _parse_market_data
+        html = _fixture(fixture)
+        return lambda: _parse_market_data(html, BeautifulSoup(html, "html.parser"))
+    return factory
+
+
+CASES: dict[str, Callable[[], Callable[[], Any]]] = {
+    "analyze_tile/unoccupied_oasis": _case_analyze_tile("tile_unoccupied_oasis.html"),
+    "analyze_tile/occupied_oasis": _case_analyze_tile("tile_occupied_oasis.html"),
+    "analyze_tile/natar_village": _case_analyze_tile("tile_natar_village.html"),
+    "analyze_tile/empty_valley": _case_analyze_tile("tile_empty_valley.html"),
+    "analyze_tile_reference/unoccupied_oasis": _case_analyze_tile("tile_unoccupied_oasis.html", reference=True),
+    "analyze_tile_reference/empty_valley": _case_analyze_tile("tile_empty_valley.html", reference=True),
+    "parse_tile_html/unoccupied_oasis": _case_parse_tile_html("tile_unoccupied_oasis.html"),
+    "parse_tile_html/natar_village": _case_parse_tile_html("tile_natar_village.html"),
+    "get_troops_in_village": _case_troops,
+    "list_hero_adventures/forms": _case_adventures("hero_adventures_forms.html"),
+    "list_hero_adventures/react": _case_adventures("hero_adventures_react.html"),
+    "_extract_duration_seconds": _case_duration,
+    "rally_tracker._parse_return_table": _case_rally_returns,
+    "resource_balancer._parse_resource_bar": _case_resource_bar,
+    "village_snapshot.parse_resource_bar": _case_snapshot_resource_bar,
+    "resource_router._parse_market_data/html": _case_market("marketplace.html"),
+    "resource_router._parse_market_data/json": _case_market("marketplace_react.html"),
+}
+
+
+def _measure(fn: Callable[[], Any], min_time: float, repeat: int) -> tuple[float, float]:
+    """Best-of-`repeat` ops/sec (each round runs >= min_time) and peak KiB per call."""
+    best = 0.0
+    for _ in range(max(1, repeat)):
+        n = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time or n == 0:
+            fn()
+            n += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, n / elapsed)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        _cur, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1024.0
+
+
+def _load_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8")) or {}
+    except Exception:
+        return {}
+
+
+def _write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False, sort_keys=True) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Offline parser regression + throughput bench")
+    ap.add_argument("-k", dest="filter", default=None, help="Only run cases whose name contains this text")
+    ap.add_argument("--min-time", type=float, default=0.3, help="Seconds per timing round (default 0.3)")
+    ap.add_argument("--repeat", type=int, default=3, help="Timing rounds per case; best is kept (default 3)")
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline ops/sec file")
+    ap.add_argument("--save-baseline", action="store_true", help="Write measured ops/sec to the baseline file")
+    ap.add_argument("--margin", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    ap.add_argument("--record", action="store_true", help="Rewrite expected.json from current outputs")
+    ap.add_argument("--json", dest="json_out", type=Path, default=None, help="Also write results as JSON")
+    args = ap.parse_args(argv)
+
+    baseline_path = args.baseline.resolve()
+    json_out = args.json_out.resolve() if args.json_out else None
+    expected = _load_json(EXPECTED_PATH)
+    baseline = _load_json(baseline_path)
+
+    # Parsers may dump debug pages under ./logs; keep those out of the working tree
+    os.chdir(tempfile.mkdtemp(prefix="parser_bench_"))
+
+    results: dict[str, dict] = {}
+    recorded: dict[str, Any] = dict(expected)
+    failures = 0
+    print(f"{'case':<44} {'ops/sec':>10} {'peak KiB':>9} {'vs base':>8}  status")
+    for name, factory in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        try:
+            fn = factory()
+            output = _normalize(fn())
+        except Exception as e:
+            print(f"{name:<44} {'-':>10} {'-':>9} {'-':>8}  skipped ({type(e).__name__}: {e})")
+            results[name] = {"status": "skipped", "error": f"{type(e).__name__}: {e}"}
+            continue
+
+        status = "ok"
+        if args.record:
+            recorded[name] = output
+            status = "recorded"
+        elif name not in expected:
+            status = "no expected output"
+        elif expected[name] != output:
+            status = "OUTPUT MISMATCH"
+            failures += 1
+
+        ops, peak_kib = _measure(fn, args.min_time, args.repeat)
+        ratio_txt = "-"
+        base_ops = (baseline.get(name) or {}).get("ops_per_sec") if isinstance(baseline.get(name), dict) else None
+        if base_ops:
+            ratio = ops / float(base_ops)
+            ratio_txt = f"{ratio:.2f}x"
+            if not args.save_baseline and ratio < (1.0 - args.margin) and status == "ok":
+                status = f"SLOWER than baseline (>{args.margin:.0%})"
+                failures += 1
+        print(f"{name:<44} {ops:>10.1f} {peak_kib:>9.1f} {ratio_txt:>8}  {status}")
+        results[name] = {"status": status, "ops_per_sec": round(ops, 2), "peak_kib": round(peak_kib, 2)}
+
+    if args.record:
+        _write_json(EXPECTED_PATH, recorded)
+        print(f"📝 Expected outputs written to {EXPECTED_PATH}")
+    if args.save_baseline:
+        merged = dict(baseline)
+        merged.update({k: {"ops_per_sec": v["ops_per_sec"]} for k, v in results.items() if "ops_per_sec" in v})
+        _write_json(baseline_path, merged)
+        print(f"💾 Baseline written to {baseline_path}")
+    if json_out:
+        _write_json(json_out, results)
+    if failures:
+        print(f"❌ {failures} case(s) failed")
+        return 1
+    print("✅ All parser cases passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""Local stand-in game server for offline end-to-end benchmarks.
+
+Serves anonymized, recorded page templates (tools/fixtures/replay) for the
+endpoints TravianAPI talks to, backed by a small in-memory state model: one or
+more villages with a troop bank, a deterministic map of valleys and oases, troop
+movements and reports. Sends through the rally point take troops out of the
+bank; they come back (and a report appears) once the simulated travel time has
+passed, scaled by --time-scale. Movements follow core.clock, so a replay under a
+VirtualClock (tools/timewarp.py) lands and returns raids in virtual time.
+
+    python tools/replay_server.py --port 8765                 # serve until Ctrl+C
+    python tools/replay_server.py --bench raid_batch          # run_raid_batch against localhost
+    python tools/replay_server.py --bench scan --radius 15    # scan_map_area over a 31×31 square
+    python tools/replay_server.py --bench all --json out.json
+
+Served endpoints:
+    GET  /dorf1.php[?newdid=]            village list + troops (+ version assets for X-Version)
+    POST /api/v1/map/tile-details        {"html": ...} for a valley or an (empty/guarded) oasis
+    POST /api/v1/graphql                 ownPlayer villages / farmLists
+    GET  /build.php?gid=16&tt=2          rally point send form
+    POST /build.php?gid=16&tt=2          prepare (returns token + checksum) and confirm (302 → tt=1)
+    GET  /build.php?gid=16&tt=1          troop movements incl. returns with bounty
+    GET  /report[?s=..&page=N] /report?id=..    report overview (10 per page) and details
+    GET  /api/v1/hero/dataForHUD         static hero HUD json
+
+The launcher's Full Auto mode logs in through the public lobby first, so it is
+not wired to this server; the benches drive the same entry points it calls.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import secrets
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+from typing import Any, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = ROOT / "tools" / "fixtures" / "replay"
+VERSION = "228.2"
+REPORTS_PER_PAGE = 10                   # overview rows per ?page=N, like the game
+
+sys.path.insert(0, str(ROOT))
+
+from core import clock  # noqa: E402  (needs ROOT on sys.path)
+
+# (unit class, singular label for img alt, plural label for td.desc), as on the game's tile page
+ANIMALS = [
+    ("u31", "Rat", "Rats"), ("u32", "Spider", "Spiders"), ("u33", "Snake", "Snakes"), ("u34", "Bat", "Bats"),
+    ("u35", "Wild Boar", "Wild Boars"), ("u36", "Wolf", "Wolves"), ("u37", "Bear", "Bears"),
+    ("u38", "Crocodile", "Crocodiles"), ("u39", "Tiger", "Tigers"), ("u40", "Elephant", "Elephants"),
+]
+
+_TEMPLATES: dict[str, Template] = {}
+
+
+def _render(name: str, **values: Any) -> str:
+    tpl = _TEMPLATES.get(name)
+    if tpl is None:
+        tpl = _TEMPLATES[name] = Template((FIXTURES / name).read_text(encoding="utf-8"))
+    return tpl.substitute(**values)
+
+
+def _num(n: int) -> str:
+    """Numbers the way the game prints them (Unicode minus for negatives)."""
+    return f"&#x2212;{abs(int(n))}" if int(n) < 0 else str(int(n))
+
+
+def _hms(seconds: float) -> str:
+    s = max(0, int(seconds))
+    return f"{s // 3600}:{(s // 60) % 60:02d}:{s % 60:02d}"
+
+
+class ReplayState:
+    """Game state behind the replay server; every method is safe to call from handler threads."""
+
+    def __init__(self, tribe_id: int = 3, troops: Optional[dict[str, int]] = None, seed: int = 1,
+                 oasis_share: float = 0.2, animal_share: float = 0.4, time_scale: float = 1.0,
+                 home: tuple[int, int] = (0, 0), village_id: int = 1001) -> None:
+        from core.unit_catalog import t_to_u
+        self.tribe_id = int(tribe_id)
+        self.seed = int(seed)
+        self.oasis_share = float(oasis_share)
+        self.animal_share = float(animal_share)
+        self.time_scale = max(1e-6, float(time_scale))
+        self.lock = threading.Lock()
+        self.requests: Counter = Counter()
+        bank = [0] * 10
+        for code, n in (troops or {"t1": 500}).items():
+            bank[int(str(code).lstrip("tu")) - 1] += int(n)
+        self.villages: dict[int, dict] = {
+            int(village_id): {"id": int(village_id), "name": "Home", "x": home[0], "y": home[1], "troops": bank},
+        }
+        self.active = int(village_id)
+        self.unit_codes = [t_to_u(self.tribe_id, f"t{i}") for i in range(1, 11)]
+        self.movements: list[dict] = []
+        self.reports: dict[int, dict] = {}
+        self._next_report = 6_400_001
+        self._tokens: dict[str, dict] = {}
+
+    # --- map -----------------------------------------------------------------
+
+    def tile_kind(self, x: int, y: int) -> str:
+        """'valley', 'oasis' or 'oasis_animals'; fixed per (seed, x, y)."""
+        if any((v["x"], v["y"]) == (x, y) for v in self.villages.values()):
+            return "valley"
+        rng = random.Random(f"{self.seed}:{x}:{y}")
+        if rng.random() >= self.oasis_share:
+            return "valley"
+        return "oasis_animals" if rng.random() < self.animal_share else "oasis"
+
+    def animals(self, x: int, y: int) -> list[tuple[str, str, str, int]]:
+        if self.tile_kind(x, y) != "oasis_animals":
+            return []
+        rng = random.Random(f"{self.seed}:animals:{x}:{y}")
+        return [(code, name, plural, rng.randint(1, 25))
+                for code, name, plural in rng.sample(ANIMALS[:7], k=rng.randint(1, 3))]
+
+    def oases(self, cx: int, cy: int, radius: float, animals: bool = False) -> list[tuple[int, int]]:
+        r = int(math.ceil(radius))
+        kinds = ("oasis", "oasis_animals") if animals else ("oasis",)
+        return [(x, y) for x in range(cx - r, cx + r + 1) for y in range(cy - r, cy + r + 1)
+                if math.hypot(x - cx, y - cy) <= radius and self.tile_kind(x, y) in kinds]
+
+    def tile_html(self, x: int, y: int) -> str:
+        kind = self.tile_kind(x, y)
+        if kind == "valley":
+            return _render("tile_valley.html", x=_num(x), y=_num(y))
+        rows = [
+            f'        <tr><td class="ico"><a href="#"><img class="unit {code}" src="/img/x.gif" alt="{name}"></a></td>'
+            f'<td class="val">&#x202d;{n}&#x202c;</td><td class="desc">{plural}</td></tr>'
+            for code, name, plural, n in self.animals(x, y)
+        ] or ['        <tr><td class="none" colspan="3">none</td></tr>']
+        map_id = (200 - y) * 401 + (x + 201)
+        return _render("tile_oasis.html", x=_num(x), y=_num(y), map_id=map_id, animals="\n".join(rows))
+
+    # --- troops and movements ------------------------------------------------
+
+    def _travel_seconds(self, village: dict, x: int, y: int, units: list[int]) -> float:
+        from core.unit_catalog import unit_speed
+        speeds = [unit_speed(self.tribe_id, f"t{i + 1}") for i, n in enumerate(units) if n]
+        slowest = min([s for s in speeds if s] or [6.0])
+        distance = max(0.5, math.hypot(x - village["x"], y - village["y"]))
+        return distance / slowest * 3600.0
+
+    def _capacity(self, units: list[int]) -> int:
+        from core.combat_stats import UNIT_STATS
+        table = UNIT_STATS.get(self.tribe_id) or {}
+        return sum(n * int((table.get(f"t{i + 1}") or (0, 0, 0, False, 0, 0))[4]) for i, n in enumerate(units))
+
+    def prepare(self, x: int, y: int, units: list[int]) -> dict:
+        with self.lock:
+            village = self.villages[self.active]
+            token = secrets.token_hex(16)
+            seconds = self._travel_seconds(village, x, y, units)
+            self._tokens[token] = {"village": self.active, "x": x, "y": y, "units": list(units), "seconds": seconds}
+            return {"token": token, "checksum": hashlib.sha1(token.encode()).hexdigest()[:6], "seconds": seconds}
+
+    def confirm(self, token: str, checksum: str, units: list[int]) -> Optional[str]:
+        """Start the movement; None on success, otherwise the error text shown on the page."""
+        with self.lock:
+            pending = self._tokens.pop(token, None)
+            if pending is None or hashlib.sha1(token.encode()).hexdigest()[:6] != checksum:
+                return "Invalid or expired action token."
+            if units != pending["units"]:
+                return "Troop selection changed; prepare again."
+            bank = self.villages[pending["village"]]["troops"]
+            if any(n > have for n, have in zip(units, bank)):
+                return "Not enough troops available."
+            for i, n in enumerate(units):
+                bank[i] -= n
+            now = clock.now()
+            travel = pending["seconds"] / self.time_scale
+            self.movements.append({
+                "village": pending["village"], "x": pending["x"], "y": pending["y"], "units": list(units),
+                "depart": now, "arrive": now + travel, "return_at": now + 2 * travel, "report": None,
+            })
+            return None
+
+    def settle(self, now: Optional[float] = None) -> None:
+        """Land arrived raids (report + bounty) and put returned troops back into the bank."""
+        now = clock.now() if now is None else now
+        with self.lock:
+            keep = []
+            for mv in self.movements:
+                if mv["report"] is None and mv["arrive"] <= now:
+                    self._land(mv)
+                if mv["return_at"] <= now:
+                    bank = self.villages[mv["village"]]["troops"]
+                    for i, n in enumerate(mv["units"]):
+                        bank[i] += n
+                    continue
+                keep.append(mv)
+            self.movements = keep
+
+    def _land(self, mv: dict) -> None:
+        capacity = self._capacity(mv["units"])
+        rng = random.Random(f"{self.seed}:bounty:{mv['x']}:{mv['y']}:{mv['depart']}")
+        loot = rng.randint(0, capacity) if capacity else 0
+        shares = [rng.random() for _ in range(4)]
+        bounty = [int(loot * s / (sum(shares) or 1)) for s in shares]
+        mv["bounty"], mv["capacity"] = bounty, capacity
+        num = self._next_report
+        self._next_report += 1
+        mv["report"] = num
+        self.reports[num] = {
+            "num": num, "rid": f"{num}|{hashlib.sha1(str(num).encode()).hexdigest()[:8]}",
+            "village": mv["village"], "x": mv["x"], "y": mv["y"], "units": list(mv["units"]),
+            "bounty": bounty, "capacity": capacity, "time": time.strftime("%d.%m.%y, %H:%M:%S", time.localtime(mv["arrive"])),
+        }
+
+    def seed_reports(self, count: int, radius: float = 10.0) -> None:
+        """Add `count` finished raids with reports (for report ingestion benches)."""
+        village = self.villages[self.active]
+        targets = self.oases(village["x"], village["y"], radius) or [(village["x"] + 1, village["y"])]
+        now = clock.now()
+        with self.lock:
+            for i in range(int(count)):
+                x, y = targets[i % len(targets)]
+                units = [5] + [0] * 9
+                self._land({"village": self.active, "x": x, "y": y, "units": units, "depart": now - 60 + i, "arrive": now - 30})
+
+    # --- pages ---------------------------------------------------------------
+
+    def _unit_cells(self, units: list[int]) -> tuple[str, str]:
+        icons = "".join(f'<td class="uniticon"><img class="unit {self.unit_codes[i]}" src="/img/x.gif"></td>' for i in range(10))
+        counts = "".join(f'<td class="unit{" none" if n == 0 else ""}">{n}</td>' for n in units)
+        return icons, counts
+
+    def dorf1(self) -> str:
+        with self.lock:
+            villages = "\n".join(
+                f'<li class="{"active" if vid == self.active else ""}"><a href="?newdid={vid}">{v["name"]}</a>'
+                f'<span class="coordinatesGrid">({_num(v["x"])}|{_num(v["y"])})</span></li>'
+                for vid, v in self.villages.items()
+            )
+            bank = self.villages[self.active]["troops"]
+            troops = "\n".join(
+                f'      <tr><td class="ico"><a href="/build.php?id=39&amp;tt=1"><img class="unit {self.unit_codes[i]}" src="/img/x.gif"></a></td>'
+                f'<td class="num">{n}</td><td class="un">{self.unit_codes[i]}</td></tr>'
+                for i, n in enumerate(bank) if n > 0
+            )
+        return _render("dorf1.html", version=VERSION, villages=villages, troops=troops)
+
+    def rally_send(self) -> str:
+        with self.lock:
+            bank = self.villages[self.active]["troops"]
+            inputs = "\n".join(
+                f'    <tr><td><input class="text" type="text" name="troop[t{i + 1}]" value=""></td><td>{n}</td></tr>'
+                for i, n in enumerate(bank)
+            )
+        return _render("rally_send.html", inputs=inputs)
+
+    def rally_confirm(self, x: int, y: int, units: list[int]) -> str:
+        prep = self.prepare(x, y, units)
+        icons, counts = self._unit_cells(units)
+        return _render("rally_confirm.html", x=_num(x), y=_num(y), token=prep["token"], checksum=prep["checksum"],
+                       icons=icons, counts=counts, seconds=int(prep["seconds"]), hms=_hms(prep["seconds"]))
+
+    def rally_overview(self) -> str:
+        self.settle()
+        now = clock.now()
+        parts = []
+        with self.lock:
+            for mv in self.movements:
+                if mv["village"] != self.active:
+                    continue
+                village = self.villages[mv["village"]]
+                returning = mv["report"] is not None
+                icons, counts = self._unit_cells(mv["units"])
+                bounty = mv.get("bounty") or [0, 0, 0, 0]
+                loot, capacity = sum(bounty), mv.get("capacity") or self._capacity(mv["units"])
+                left = ((mv["return_at"] if returning else mv["arrive"]) - now) * self.time_scale
+                parts.append(_render(
+                    "rally_movement.html", css="inReturn" if returning else "outRaid",
+                    hx=_num(village["x"]), hy=_num(village["y"]), home=village["name"],
+                    x=_num(mv["x"]), y=_num(mv["y"]), headline="Return from" if returning else "Raid against",
+                    icons=icons, counts=counts, loot=loot, capacity=capacity,
+                    carry="full" if capacity and loot >= capacity else ("empty" if loot == 0 else "half"),
+                    bounty="\n".join(f'<div class="inlineIcon resources"><i class="r{i + 1}Big"></i><span class="value">{v}</span></div>'
+                                   for i, v in enumerate(bounty)),
+                    seconds=int(max(0.0, left)), hms=_hms(left),
+                ))
+        return _render("rally_overview.html", now=int(now), clock=time.strftime("%H:%M:%S", time.localtime(now)),
+                       movements="\n".join(parts))
+
+    def report_list(self, page: int = 1) -> str:
+        self.settle()
+        with self.lock:
+            newest_first = sorted(self.reports.values(), key=lambda r: -r["num"])
+            start = (max(1, page) - 1) * REPORTS_PER_PAGE
+            rows = "\n".join(
+                f'    <tr><td class="sel"></td><td class="sub"><a href="?id={r["rid"]}&amp;s=1">Home raids Unoccupied oasis '
+                f'({_num(r["x"])}|{_num(r["y"])})</a></td><td class="dat">{r["time"]}</td></tr>'
+                for r in newest_first[start:start + REPORTS_PER_PAGE]
+            )
+        return _render("report_list.html", rows=rows)
+
+    def report_detail(self, rid: str) -> Optional[str]:
+        try:
+            num = int(str(rid).split("|", 1)[0])
+        except ValueError:
+            return None
+        with self.lock:
+            r = self.reports.get(num)
+            if r is None:
+                return None
+            village = self.villages[r["village"]]
+            icons, sent = self._unit_cells(r["units"])
+            _, lost = self._unit_cells([0] * 10)
+        loot = sum(r["bounty"])
+        return _render(
+            "report_detail.html", home=village["name"], time=r["time"], icons=icons, sent=sent, lost=lost,
+            bounty=" ".join(f'<span class="value">{v}</span>' for v in r["bounty"]),
+            carry="full" if r["capacity"] and loot >= r["capacity"] else "half", loot=loot, capacity=r["capacity"],
+            x=_num(r["x"]), y=_num(r["y"]),
+        )
+
+    def graphql(self) -> dict:
+        with self.lock:
+            villages = [{"id": vid, "sortIndex": i, "name": v["name"], "tribeId": self.tribe_id, "hasHarbour": False,
+                         "x": v["x"], "y": v["y"]} for i, (vid, v) in enumerate(self.villages.items())]
+            return {"data": {"ownPlayer": {"currentVillageId": self.active, "villages": villages, "farmLists": []}}}
+
+    def sent_total(self) -> int:
+        with self.lock:
+            return sum(sum(mv["units"]) for mv in self.movements)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ReplayServer/1.0"
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    @property
+    def state(self) -> ReplayState:
+        return self.server.state  # type: ignore[attr-defined]
+
+    def log_message(self, format, *args) -> None:  # noqa: A002 - silence per-request logging
+        pass
+
+    def _send(self, status: int, body: str = "", content_type: str = "text/html; charset=utf-8",
+              headers: Optional[dict] = None) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, payload: Any) -> None:
+        self._send(200, json.dumps(payload), "application/json")
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _route(self) -> tuple[str, dict[str, str]]:
+        parts = urllib.parse.urlsplit(self.path)
+        query = {k: v[0] for k, v in urllib.parse.parse_qs(parts.query).items()}
+        self.state.requests[f"{self.command} {parts.path}"] += 1
+        return parts.path, query
+
+    def do_GET(self) -> None:
+        path, q = self._route()
+        st = self.state
+        if path in ("/dorf1.php", "/dorf2.php", "/"):
+            if "newdid" in q:
+                try:
+                    if int(q["newdid"]) in st.villages:
+                        st.active = int(q["newdid"])
+                except ValueError:
+                    pass
+            st.settle()
+            return self._send(200, st.dorf1())
+        if path == "/build.php" and q.get("gid") == "16":
+            return self._send(200, st.rally_overview() if q.get("tt") == "1" else st.rally_send())
+        if path == "/report":
+            if "id" in q:
+                html = st.report_detail(q["id"])
+                return self._send(200, html) if html else self._send(404, "<p class=\"error\">Report not found</p>")
+            try:
+                page = int(q.get("page", 1))
+            except ValueError:
+                page = 1
+            return self._send(200, st.report_list(page))
+        if path == "/api/v1/hero/dataForHUD":
+            return self._json({"level": 10, "health": 100, "status": "home", "fightingStrength": 1500})
+        return self._send(404, "<h1>Not Found</h1>")
+
+    def do_POST(self) -> None:
+        path, q = self._route()
+        st = self.state
+        raw = self._body()
+        if path in ("/api/v1/map/tile-details", "/api/v1/map/position"):
+            try:
+                payload = json.loads(raw or b"{}")
+                x, y = int(payload["x"]), int(payload["y"])
+            except Exception:
+                return self._send(400, json.dumps({"error": "bad coordinates"}), "application/json")
+            return self._json({"html": st.tile_html(x, y)})
+        if path == "/api/v1/graphql":
+            return self._json(st.graphql())
+        if path == "/build.php" and q.get("gid") == "16":
+            form = {k: v[0] for k, v in urllib.parse.parse_qs(raw.decode("utf-8"), keep_blank_values=True).items()}
+            try:
+                x, y = int(form.get("x", "")), int(form.get("y", ""))
+            except ValueError:
+                return self._send(200, '<p class="error">Enter valid coordinates.</p>')
+            if "checksum" in form:
+                units = [int(form.get(f"troops[0][t{i}]") or 0) for i in range(1, 11)]
+                error = st.confirm(form.get("action", ""), form.get("checksum", ""), units)
+                if error:
+                    return self._send(200, f'<div class="error">{error}</div>')
+                return self._send(302, "", headers={"Location": "/build.php?gid=16&tt=1"})
+            units = [int(form.get(f"troop[t{i}]") or 0) for i in range(1, 11)]
+            if not any(units):
+                return self._send(200, '<p class="error">No troops selected.</p>')
+            return self._send(200, st.rally_confirm(x, y, units))
+        return self._send(404, "<h1>Not Found</h1>")
+
+
+class ReplayServer:
+    """ThreadingHTTPServer around a ReplayState, runnable in a background thread."""
+
+    def __init__(self, state: Optional[ReplayState] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.state = state or ReplayState()
+        self.httpd = ThreadingHTTPServer((host, int(port)), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# --- benches --------------------------------------------------------------
+
+def make_api(url: str):
+    """TravianAPI on a plain requests.Session against the replay server, humanizer off."""
+    import requests
+    from core.travian_api import TravianAPI
+    api = TravianAPI(requests.Session(), url)
+    api.set_humanizer(False)
+    return api
+
+
+def _result(name: str, elapsed: float, server: ReplayServer, **extra: Any) -> dict:
+    from core import request_stats
+    served = sum(server.state.requests.values())
+    out = {"bench": name, "seconds": round(elapsed, 3), "requests": served,
+           "requests_per_sec": round(served / elapsed, 1) if elapsed > 0 else None}
+    out.update(extra)
+    out["request_stats"] = request_stats.render_summary_lines()
+    return out
+
+
+def raid_inputs(state: ReplayState, radius: float, max_targets: int) -> tuple[int, str, dict, dict]:
+    """(village id, faction, oases, raid plan) for run_raid_batch on the replay map."""
+    village_id, village = next(iter(state.villages.items()))
+    targets = state.oases(village["x"], village["y"], radius, animals=True)
+    targets.sort(key=lambda c: math.hypot(c[0] - village["x"], c[1] - village["y"]))
+    # Without identity.json run_raid_batch falls back to the distances stored with the
+    # scan, so every target carries one (the home tile has none and is never raided)
+    oases = {f"{village['x']}_{village['y']}": {"type": "village"}}
+    oases.update({f"{x}_{y}": {"type": "oasis", "distance": round(math.hypot(x - village["x"], y - village["y"]), 1)}
+                  for x, y in targets[: max(1, int(max_targets))]})
+    plan = {"max_raid_distance": radius,
+            "distance_ranges": [{"start": 0, "end": radius + 1, "units": [{"unit_code": "t1", "group_size": 5}]}]}
+    faction = {1: "Romans", 2: "Teutons", 3: "Gauls", 4: "Huns", 5: "Egyptians"}.get(state.tribe_id, "Gauls")
+    return village_id, faction, oases, plan
+
+
+def bench_raid_batch(server: ReplayServer, radius: float, max_targets: int) -> dict:
+    from features.oasis.raider import run_raid_batch
+    st = server.state
+    village_id, faction, oases, plan = raid_inputs(st, radius, max_targets)
+    village = st.villages[village_id]
+    before = sum(village["troops"])
+    api = make_api(server.url)
+    st.requests.clear()
+    t0 = time.perf_counter()
+    sent = run_raid_batch(api, plan, faction, village_id, oases)
+    elapsed = time.perf_counter() - t0
+    return _result("raid_batch", elapsed, server, raids_sent=sent, targets=len(oases) - 1,
+                   troops_before=before, troops_after=sum(village["troops"]), troops_out=st.sent_total(),
+                   raids_per_sec=round(sent / elapsed, 2) if elapsed > 0 else None)
+
+
+def bench_scan(server: ReplayServer, radius: float) -> dict:
+    from core.full_map_scanner import scan_map_area
+    village = next(iter(server.state.villages.values()))
+    r = int(radius)
+    api = make_api(server.url)
+    server.state.requests.clear()
+    t0 = time.perf_counter()
+    tiles = scan_map_area(api, village["x"] - r, village["x"] + r, village["y"] - r, village["y"] + r)
+    elapsed = time.perf_counter() - t0
+    return _result("scan", elapsed, server, tiles=len(tiles),
+                   tiles_per_sec=round(len(tiles) / elapsed, 1) if elapsed > 0 else None)
+
+
+def bench_reports(server: ReplayServer, count: int) -> dict:
+    from core import report_store
+    server.state.seed_reports(count)
+    api = make_api(server.url)
+    server.state.requests.clear()
+    t0 = time.perf_counter()
+    stored = report_store.ingest(api, max_items=count, max_fetch=count)
+    elapsed = time.perf_counter() - t0
+    return _result("reports", elapsed, server, reports_stored=stored,
+                   reports_per_sec=round(stored / elapsed, 1) if elapsed > 0 else None)
+
+
+def _parse_troops(spec: str) -> dict[str, int]:
+    """'t1=500,t4=40' → {'t1': 500, 't4': 40}."""
+    out: dict[str, int] = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            code, n = part.split("=", 1)
+            out[code.strip()] = int(n)
+    return out
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Local replay game server + offline end-to-end benches")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765, help="Port to serve on (benches pick a free one)")
+    ap.add_argument("--tribe", type=int, default=3, help="Tribe id of the replay account (default 3 = Gauls)")
+    ap.add_argument("--troops", default="t1=500", help="Starting troop bank, e.g. 't1=500,t4=40'")
+    ap.add_argument("--seed", type=int, default=1, help="Map seed (oasis layout and animals)")
+    ap.add_argument("--time-scale", type=float, default=1.0, help="Game seconds per real second for movements")
+    ap.add_argument("--bench", choices=["raid_batch", "scan", "reports", "all"], default=None)
+    ap.add_argument("--radius", type=float, default=10.0, help="Raid/scan radius in fields (default 10)")
+    ap.add_argument("--max-targets", type=int, default=10, help="Oases handed to run_raid_batch (default 10)")
+    ap.add_argument("--reports", type=int, default=50, help="Reports seeded for the reports bench (default 50)")
+    ap.add_argument("--json", dest="json_out", type=Path, default=None, help="Also write results as JSON")
+    args = ap.parse_args(argv)
+
+    state = ReplayState(tribe_id=args.tribe, troops=_parse_troops(args.troops), seed=args.seed,
+                        time_scale=args.time_scale)
+    if not args.bench:
+        server = ReplayServer(state, args.host, args.port)
+        print(f"Replay server on {server.url} (Ctrl+C to stop)")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+        return 0
+
+    json_out = args.json_out.resolve() if args.json_out else None
+    # The bot writes learning/cache/report files relative to cwd; keep them out of the working tree
+    os.chdir(tempfile.mkdtemp(prefix="replay_bench_"))
+    from core import request_stats
+    server = ReplayServer(state, args.host, 0).start()
+    results = []
+    try:
+        for name in (["scan", "raid_batch", "reports"] if args.bench == "all" else [args.bench]):
+            request_stats.reset()
+            if name == "raid_batch":
+                res = bench_raid_batch(server, args.radius, args.max_targets)
+            elif name == "scan":
+                res = bench_scan(server, args.radius)
+            else:
+                res = bench_reports(server, args.reports)
+            results.append(res)
+            extra = ", ".join(f"{k}={v}" for k, v in res.items() if k not in ("bench", "request_stats"))
+            print(f"[{name}] {extra}")
+            for line in res["request_stats"]:
+                print(f"    {line}")
+    finally:
+        server.stop()
+    if json_out:
+        json_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
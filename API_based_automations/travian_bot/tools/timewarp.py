@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Time-warp replay: days of Full Auto scheduling in seconds.
+
+Installs a VirtualClock (core.clock) and drives the Full Auto pacing loop
+against the local replay server (tools/replay_server.py): quiet windows, the
+daily limiter, rally-return processing, report ingestion, the oasis raider and
+the event-driven wait between cycles. Every sleep advances virtual time
+instantly, raids land and return in virtual time, and the run ends with raids
+per hour, idle time and deadline misses.
+
+    python tools/timewarp.py                                  # 24h with the pacing from config
+    python tools/timewarp.py --hours 72 --quiet 01:00-07:00   # add a quiet window
+    python tools/timewarp.py --limiter --wait-minutes 5 --jitter-minutes 2
+    python tools/timewarp.py --json logs/timewarp.json
+
+A raid counts as a deadline miss when it leaves more than --miss-grace seconds
+after its target became due (LearningStore due index: interval, jitter, pauses
+after losses). A wake-up counts as late when a cycle starts more than the grace
+after the scheduler event it waited for (quiet windows and limiter rests).
+Helper threads (hero, adventures, attack detector) are not started.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+
+class _Overlay:
+    """Settings with command-line overrides on top."""
+
+    def __init__(self, base: Any, **overrides: Any) -> None:
+        self._base = base
+        self._overrides = {k: v for k, v in overrides.items() if v is not None}
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._overrides:
+            return self._overrides[name]
+        return getattr(self._base, name)
+
+
+class _Stats:
+    def __init__(self, start: float, hours: float) -> None:
+        self.start = start
+        self.raids_by_hour = [0] * max(1, int(-(-hours // 1)))
+        self.cycles = 0
+        self.active = 0.0
+        self.idle_wait = 0.0
+        self.idle_quiet = 0.0
+        self.idle_limiter = 0.0
+        self.lateness: list[float] = []
+        self.wakeups = 0
+        self.late_wakeups: list[float] = []
+
+    def add_raids(self, at: float, n: int) -> None:
+        if n:
+            idx = min(len(self.raids_by_hour) - 1, max(0, int((at - self.start) // 3600)))
+            self.raids_by_hour[idx] += n
+
+
+def _sleep(clk, seconds: float, end: float) -> float:
+    """Sleep on the virtual clock, never past the end of the run; returns the virtual seconds slept."""
+    seconds = max(0.0, min(float(seconds), end - clk.now()))
+    clk.sleep(seconds)
+    return seconds
+
+
+def run(args: argparse.Namespace) -> dict:
+    from core import clock, cycle_schedule, event_scheduler
+    from core.learning_store import LearningStore
+    from replay_server import ReplayServer, ReplayState, make_api, raid_inputs
+
+    try:
+        from config.config import settings as base_cfg
+    except Exception:
+        base_cfg = object()
+    cfg = _Overlay(
+        base_cfg,
+        WAIT_BETWEEN_CYCLES_MINUTES=args.wait_minutes,
+        JITTER_MINUTES=args.jitter_minutes,
+        QUIET_WINDOWS=args.quiet or None,
+        OP_COFFEE_BREAK_PROB=0.0 if args.no_coffee else None,
+    )
+    limiter_enabled = bool(args.limiter) or bool(getattr(cfg, "ENABLE_CYCLE_LIMITER", False))
+    random.seed(args.rng_seed)
+
+    start = (datetime.strptime(args.start, "%Y-%m-%d %H:%M") if args.start
+             else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)).timestamp()
+    end = start + args.hours * 3600.0
+    clk = clock.VirtualClock(start)
+    clock.set_clock(clk)
+
+    state = ReplayState(tribe_id=args.tribe, troops=args.troops, seed=args.seed)
+    server = ReplayServer(state).start()
+    stats = _Stats(start, args.hours)
+    t_real = time.perf_counter()
+    try:
+        api = make_api(server.url)
+        if args.humanizer:
+            api.set_humanizer(True)
+        village_id, faction, oases, plan = raid_inputs(state, args.radius, args.max_targets)
+        keys = [f"({k.replace('_', ',')})" for k in list(oases)[1:]]
+        store = LearningStore.shared()
+
+        from core.rally_tracker import process_pending_returns
+        from core import report_store
+        from features.oasis.raider import run_raid_batch
+
+        total_allowed, blocks, block_size, rest_between_blocks = cycle_schedule.compute_limiter_params(cfg)
+        runtime_state = {"date": cycle_schedule.today_str(), "minutes_used": 0}
+        waited_for: Optional[tuple[float, str]] = None
+
+        while clk.now() < end:
+            quiet = cycle_schedule.quiet_wait_seconds(cfg)
+            if quiet is not None:
+                stats.idle_quiet += _sleep(clk, quiet, end)
+                continue
+            if clk.now() >= end:
+                break
+
+            cycle_start = clk.now()
+            stats.cycles += 1
+            if waited_for is not None:
+                stats.wakeups += 1
+                late = cycle_start - waited_for[0]
+                if late > args.miss_grace:
+                    stats.late_wakeups.append(late)
+                waited_for = None
+
+            due_before = {k: store.get_due_at(k) for k in keys}
+            api.begin_page_cycle()
+            try:
+                process_pending_returns(api)
+            except Exception as exc:
+                print(f"[timewarp] rally tracker failed: {exc}")
+            if report_store.enabled():
+                try:
+                    report_store.ingest(api)
+                except Exception as exc:
+                    print(f"[timewarp] report ingestion failed: {exc}")
+            sent = run_raid_batch(api, plan, faction, village_id, oases)
+            stats.add_raids(cycle_start, sent)
+            for k in keys:
+                last = store.get_last_sent(k)
+                due = due_before.get(k)
+                if last and float(last) >= cycle_start and due is not None:
+                    stats.lateness.append(max(0.0, float(last) - float(due)))
+            stats.active += clk.now() - cycle_start
+
+            if limiter_enabled:
+                elapsed_minutes = max(1, int((clk.now() - cycle_start) // 60))
+                step = cycle_schedule.limiter_account(runtime_state, elapsed_minutes, total_allowed, blocks,
+                                                      block_size, rest_between_blocks)
+                runtime_state = step.state
+                if step.rest_minutes > 0:
+                    stats.idle_limiter += _sleep(clk, step.rest_minutes * 60, end)
+                if step.cap_reached:
+                    stats.idle_limiter += _sleep(clk, cycle_schedule.minutes_until_tomorrow() * 60, end)
+                    runtime_state = {"date": cycle_schedule.today_str(), "minutes_used": 0}
+
+            total_wait_minutes, _extra = cycle_schedule.cycle_wait_minutes(cfg)
+            wait_total, next_ev = event_scheduler.plan_wait(max(0, int(total_wait_minutes) * 60))
+            if next_ev is not None:
+                waited_for = next_ev
+            stats.idle_wait += _sleep(clk, wait_total, end)
+    finally:
+        server.stop()
+        LearningStore.flush_shared()
+        clock.set_clock(None)
+
+    real = time.perf_counter() - t_real
+    simulated = max(1.0, min(clk.now(), end) - start)
+    hours = simulated / 3600.0
+    raids = sum(stats.raids_by_hour)
+    late = [x for x in stats.lateness if x > args.miss_grace]
+    idle = stats.idle_wait + stats.idle_quiet + stats.idle_limiter
+    return {
+        "simulated_hours": round(hours, 2),
+        "real_seconds": round(real, 2),
+        "speedup": round(simulated / real, 1) if real > 0 else None,
+        "cycles": stats.cycles,
+        "raids": raids,
+        "raids_per_hour": round(raids / hours, 2),
+        "raids_by_hour": stats.raids_by_hour,
+        "active_hours": round(stats.active / 3600.0, 2),
+        "idle_hours": round(idle / 3600.0, 2),
+        "idle_pct": round(100.0 * idle / simulated, 1),
+        "idle_breakdown_hours": {
+            "cycle_wait": round(stats.idle_wait / 3600.0, 2),
+            "quiet_windows": round(stats.idle_quiet / 3600.0, 2),
+            "limiter": round(stats.idle_limiter / 3600.0, 2),
+        },
+        "deadline_checks": len(stats.lateness),
+        "deadline_misses": len(late),
+        "mean_lateness_sec": round(sum(stats.lateness) / len(stats.lateness), 1) if stats.lateness else 0.0,
+        "max_lateness_sec": round(max(stats.lateness), 1) if stats.lateness else 0.0,
+        "event_wakeups": stats.wakeups,
+        "late_wakeups": len(stats.late_wakeups),
+        "requests": sum(state.requests.values()),
+    }
+
+
+def _print(res: dict) -> None:
+    print(f"\n===== TIME-WARP ({res['simulated_hours']} h in {res['real_seconds']} s, x{res['speedup']}) =====")
+    print(f"Cycles: {res['cycles']} | raids: {res['raids']} ({res['raids_per_hour']}/h) | requests: {res['requests']}")
+    print("Raids per hour: " + " ".join(f"{h:02d}:{n}" for h, n in enumerate(res["raids_by_hour"])))
+    b = res["idle_breakdown_hours"]
+    print(f"Idle: {res['idle_hours']} h ({res['idle_pct']}%) — cycle waits {b['cycle_wait']} h, "
+          f"quiet windows {b['quiet_windows']} h, limiter {b['limiter']} h; active {res['active_hours']} h")
+    print(f"Deadline misses: {res['deadline_misses']}/{res['deadline_checks']} raids "
+          f"(mean late {res['mean_lateness_sec']}s, max {res['max_lateness_sec']}s); "
+          f"late wake-ups {res['late_wakeups']}/{res['event_wakeups']}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from replay_server import _parse_troops
+
+    ap = argparse.ArgumentParser(description="Replay Full Auto scheduling on a virtual clock")
+    ap.add_argument("--hours", type=float, default=24.0, help="Virtual hours to simulate (default 24)")
+    ap.add_argument("--start", default=None, help="Virtual start 'YYYY-MM-DD HH:MM' (default: today 00:00)")
+    ap.add_argument("--wait-minutes", type=int, default=None, help="Override WAIT_BETWEEN_CYCLES_MINUTES")
+    ap.add_argument("--jitter-minutes", type=int, default=None, help="Override JITTER_MINUTES")
+    ap.add_argument("--quiet", action="append", default=[], help="Quiet window 'HH:MM-HH:MM' (repeatable; replaces QUIET_WINDOWS)")
+    ap.add_argument("--limiter", action="store_true", help="Apply the daily limiter even if ENABLE_CYCLE_LIMITER is off")
+    ap.add_argument("--no-coffee", action="store_true", help="Disable random coffee breaks")
+    ap.add_argument("--humanizer", action="store_true", help="Keep the request humanizer on (its sleeps count as active time)")
+    ap.add_argument("--miss-grace", type=float, default=60.0, help="Seconds after due before a raid counts as a miss (default 60)")
+    ap.add_argument("--tribe", type=int, default=3)
+    ap.add_argument("--troops", default="t1=500", help="Starting troop bank, e.g. 't1=500,t4=40'")
+    ap.add_argument("--seed", type=int, default=1, help="Map seed of the replay server")
+    ap.add_argument("--rng-seed", type=int, default=1, help="Seed for jitter/coffee/limiter randomness")
+    ap.add_argument("--radius", type=float, default=10.0)
+    ap.add_argument("--max-targets", type=int, default=10)
+    ap.add_argument("--json", dest="json_out", type=Path, default=None, help="Also write results as JSON")
+    args = ap.parse_args(argv)
+    args.troops = _parse_troops(args.troops)
+
+    json_out = args.json_out.resolve() if args.json_out else None
+    # Learning store, caches and reports are written relative to cwd; keep them out of the tree
+    os.chdir(tempfile.mkdtemp(prefix="timewarp_"))
+    res = run(args)
+    _print(res)
+    if json_out:
+        json_out.write_text(json.dumps(res, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())